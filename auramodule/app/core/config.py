@@ -17,14 +17,47 @@ class Settings(BaseSettings):
     http_port: int = 8001
     discovery_port: int = 5353
     whisper_model: str = "base"
+    whisper_device: str = "auto"
+    whisper_compute_type: str = "auto"
+    whisper_adaptive: bool = True
+    whisper_ladder: str = ""
+    stt_queue_size: int = 16
+    stt_batch_latency_ms: int = 150
+    vad_backend: str = "energy"
+    vad_aggressiveness: int = 2
+    vad_pre_roll_seconds: float = 0.3
+    vad_end_of_utterance_seconds: float = 0.8
     ollama_url: str = "http://localhost:11434"
     ollama_model: str = "qwen2.5:7b"
+    ollama_keep_alive: str = "30m"
+    ollama_warm_up: bool = True
+    analysis_cache_size: int = 512
+    analysis_cache_ttl_seconds: float = 3600.0
+    analysis_cache_path: str = ""
+    fast_extraction_enabled: bool = True
+    llm_max_concurrency: int = 1
+    llm_coalesce_max: int = 4
+    llm_coalesce_max_chars: int = 1500
     face_confidence_threshold: float = 0.4
     heartbeat_interval: int = 40
     backend_timeout: float = 10.0
     backend_retry_delay: float = 5.0
     backend_max_retries: int = 10
+    outbox_path: str = "aura_outbox.db"
+    outbox_max_events: int = 10000
+    outbox_batch_size: int = 50
+    outbox_flush_interval: float = 5.0
+    outbox_max_backoff: float = 300.0
     websocket_timeout: float = 300.0
+    ws_send_queue_size: int = 64
+    ws_send_timeout: float = 5.0
+    ws_max_lag_seconds: float = 15.0
+    watchdog_enabled: bool = True
+    watchdog_interval: float = 0.25
+    watchdog_stall_threshold: float = 0.5
+    watchdog_log_interval: float = 300.0
+    debug_token: str = ""
+    startup_retry_after: float = 5.0
     demo_mode: bool = False
     auto_face_recognition_enabled: bool = False
     auto_face_recognition_interval: int = 30
@@ -13,11 +13,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.services.camera import camera_service
+from app.services.face_recognition import get_face_app, INSIGHTFACE_AVAILABLE
+from app.services.whisper_registry import FASTER_WHISPER_AVAILABLE
+from app.services.readiness import (
+    readiness,
+    COMPONENT_BACKEND,
+    COMPONENT_CAMERA,
+    COMPONENT_FACE,
+    COMPONENT_LLM,
+    COMPONENT_SPEECH,
+    STATE_READY,
+)
 from app.services.discovery import discovery_service
 from app.services.backend_client import init_backend_client, get_backend_client
 from app.services.microphone import continuous_mic
 from app.services.conversation import summarize_conversation
-from app.ws_server import start_server, shutdown_streams, _get_local_ip
+from app.services.stt_executor import stt_executor
+from app.services.llm_client import ollama_client
+from app.services.loop_watchdog import loop_watchdog
+from app.ws_server import start_server, shutdown_streams, _get_local_ip, publish_transcript, publish_partial
 from app.core.config import settings
 
 
@@ -167,29 +181,6 @@ def check_ollama():
         return False
 
 
-#------This Function checks InsightFace model-------
-def check_models():
-    print_section("ML Models")
-    
-    print(f"  {BLUE}›{RESET} Checking InsightFace/buffalo_l...")
-    
-    try:
-        import insightface
-        from insightface.app import FaceAnalysis
-        
-        app = FaceAnalysis(name="buffalo_l", providers=["CPUExecutionProvider"])
-        app.prepare(ctx_id=0, det_size=(640, 640))
-        print_status("●", "buffalo_l face recognition model ready")
-        
-    except ImportError:
-        print_status("●", "InsightFace not installed", YELLOW)
-        print(f"  {YELLOW}!{RESET} Will be downloaded on first use (face recognition)")
-        
-    except Exception as e:
-        print_status("●", f"Model not ready: {e}", YELLOW)
-        print(f"  {YELLOW}!{RESET} Will be downloaded on first use")
-
-
 #------This Function checks git for updates-------
 def check_for_updates():
     try:
@@ -263,15 +254,97 @@ def update_monitor():
             pass
 
 
+#------This Function starts the camera and reports whether it opened-------
+def start_camera() -> bool:
+    camera_service.start()
+    return camera_service.is_running
+
+
+#------This Function loads the face recognition model-------
+def load_face_model() -> bool:
+    logger = logging.getLogger(__name__)
+    try:
+        get_face_app()
+    except Exception:
+        logger.error(
+            "[AURA] Install optional face/audio deps with: "
+            "python -m pip install -r requirements.optional.txt"
+        )
+        raise
+    return True
+
+
+#------This Function starts continuous listening and reports whether Whisper loaded-------
+def start_microphone(continuous_microphone) -> bool:
+    continuous_microphone.start()
+    return continuous_microphone.transcription_ready
+
+
+#------This Function checks Ollama and warms up the model-------
+async def prepare_llm() -> bool:
+    ollama_ok = await asyncio.to_thread(check_ollama)
+    if ollama_ok and settings.ollama_warm_up:
+        await ollama_client.warm_up()
+    return ollama_ok
+
+
+#------This Function registers with the backend and starts the heartbeat-------
+async def connect_backend(backend_client, local_ip: str) -> bool:
+    logger = logging.getLogger(__name__)
+    logger.info(f"[AURA] Registering with backend at {settings.backend_url}...")
+    registered = await backend_client.register(local_ip, settings.http_port)
+    if not registered:
+        logger.warning("[AURA] Failed to register with backend")
+        print_status("●", "Failed to register with backend", YELLOW)
+        print(f"  {YELLOW}!{RESET} Module will continue running but some features may not work")
+        return False
+
+    await backend_client.start_heartbeat()
+    print_status("●", f"Heartbeat task started (every {settings.heartbeat_interval}s)")
+    return True
+
+
+#------This Function loads devices and models concurrently once the server is answering-------
+async def load_components(backend_client, local_ip: str, continuous_microphone):
+    loaders = [
+        readiness.run(COMPONENT_BACKEND, connect_backend, backend_client, local_ip),
+        readiness.run(COMPONENT_CAMERA, start_camera),
+        readiness.run(COMPONENT_LLM, prepare_llm),
+    ]
+
+    if INSIGHTFACE_AVAILABLE:
+        loaders.append(readiness.run(COMPONENT_FACE, load_face_model))
+    else:
+        readiness.mark_disabled(COMPONENT_FACE, "insightface not installed")
+
+    if FASTER_WHISPER_AVAILABLE:
+        loaders.append(readiness.run(COMPONENT_SPEECH, start_microphone, continuous_microphone))
+    else:
+        readiness.mark_disabled(COMPONENT_SPEECH, "faster-whisper not installed")
+        loaders.append(asyncio.to_thread(continuous_microphone.start))
+
+    await asyncio.gather(*loaders)
+
+    status = readiness.get_status()
+    print_status(
+        "●",
+        f"Startup complete in {status['startup_seconds']}s ({status['status']})",
+        GREEN if status["status"] == "ready" else YELLOW,
+    )
+    for name, component in status["components"].items():
+        print_status(
+            "●",
+            f"{name}: {component['state']} ({component.get('seconds', 0)}s)",
+            GREEN if component["state"] == STATE_READY else YELLOW,
+        )
+
+
 #------This Function handles the Main Application----------
 async def main():
     show_banner()
     
     print(f"{CYAN}Initializing system checks...{RESET}\n")
     
-    ollama_ok = check_ollama()
-    check_models()
-    
     if not settings.validate_required_settings():
         logger = logging.getLogger(__name__)
         logger.error("[AURA] Configuration validation failed. Please check your .env file.")
@@ -299,7 +372,7 @@ async def main():
     print(f"{BLUE}{BOLD}════════════════════════════════════{RESET}")
     
     print_status("●", "Environment")
-    print_status("●" if ollama_ok else "●", "Ollama + Models", GREEN if ollama_ok else YELLOW)
+    print_status("●", "Ollama + Models (loading in background)", YELLOW)
     print_status("●", "Update Monitor (background)")
     
     setup_logging()
@@ -315,57 +388,31 @@ async def main():
     print_status("●", f"Backend: {settings.backend_url}")
     print_status("●", f"Demo mode: {settings.demo_mode}")
     print()
-    
-    logger.info("[AURA] Pre-loading machine learning models...")
-    logger.info("[AURA] This may take a few minutes on first run (downloading models)...")
-    print()
-
-    try:
-        from app.services.face_recognition import get_face_app
-
-        logger.info("[AURA] Loading face recognition model (buffalo_l)...")
-        get_face_app()
-        print_status("●", "Face recognition model ready")
-    except Exception as e:
-        logger.error(f"[AURA] Failed to load face recognition model: {e}")
-        logger.error(
-            "[AURA] Install optional face/audio deps with: "
-            "python -m pip install -r requirements.optional.txt"
-        )
-        if settings.demo_mode:
-            logger.warning("[AURA] Continuing in demo mode without face recognition")
-        else:
-            logger.warning("[AURA] Continuing with face recognition disabled")
-            logger.warning(
-                "[AURA] Set DEMO_MODE=true if you want full demo-mode behavior"
-            )
 
-    
-    backend_client = init_backend_client(settings.patient_uid)
+    readiness.register(COMPONENT_BACKEND, COMPONENT_CAMERA, COMPONENT_FACE, COMPONENT_SPEECH, COMPONENT_LLM)
 
+    server_runner = await start_server()
     local_ip = _get_local_ip()
+    print_status("●", f"Unified HTTP+WS server running on 0.0.0.0:{settings.http_port}")
+    print_status("●", f"Video stream available at: http://{local_ip}:{settings.http_port}/video_feed")
 
-    logger.info(f"[AURA] Registering with backend at {settings.backend_url}...")
-    print_status("●", f"Registering with backend at {settings.backend_url}...")
-    registered = await backend_client.register(local_ip, settings.http_port)
-    
-    if not registered:
-        logger.warning("[AURA] Failed to register with backend")
-        print_status("●", "Failed to register with backend", YELLOW)
-        print(f"  {YELLOW}!{RESET} Module will continue running but some features may not work")
-    else:
-        await backend_client.start_heartbeat()
-        print_status("●", f"Heartbeat task started (every {settings.heartbeat_interval}s)")
+    if settings.watchdog_enabled:
+        loop_watchdog.start()
+        print_status("●", f"Event-loop watchdog on (stall threshold {settings.watchdog_stall_threshold * 1000:.0f}ms)")
 
-    camera_service.start()
-    print_status("●", "Camera started (always-on mode)")
+    backend_client = init_backend_client(settings.patient_uid)
+    await backend_client.start_outbox()
+
+    discovery_service.start()
+    print_status("●", "mDNS discovery broadcasting")
 
-    async def on_summarize(transcripts):
+    async def on_summarize(transcripts, through_seq=None):
         logger.info(f"[AURA] Summarization triggered with {len(transcripts)} transcripts")
         try:
             summary = await summarize_conversation(
                 transcripts=transcripts,
                 patient_uid=settings.patient_uid,
+                through_seq=through_seq,
             )
             if summary:
                 logger.info(f"[AURA] Summary generated: {summary[:80]}...")
@@ -378,17 +425,13 @@ async def main():
     continuous_microphone = ContinuousMicrophone(
         on_summarize=on_summarize,
         event_loop=asyncio.get_running_loop(),
+        on_transcript=publish_transcript,
+        on_partial=publish_partial,
     )
-    continuous_microphone.start()
-    print_status("●", "Continuous microphone started (10-minute summarization)")
-
-    discovery_service.start()
-    print_status("●", "mDNS discovery broadcasting")
 
-    
-    server_runner = await start_server()
-    print_status("●", f"Unified HTTP+WS server running on 0.0.0.0:{settings.http_port}")
-    print_status("●", f"Video stream available at: http://{local_ip}:{settings.http_port}/video_feed")
+    logger.info("[AURA] Loading camera, models and backend connection in the background...")
+    startup_task = asyncio.create_task(load_components(backend_client, local_ip, continuous_microphone))
+    print_status("●", f"Models loading in background (progress at http://{local_ip}:{settings.http_port}/health)")
 
     
     stop = asyncio.Event()
@@ -402,28 +445,42 @@ async def main():
         loop.add_signal_handler(sig, signal_handler)
 
     print(f"\n{BLUE}{BOLD}════════════════════════════════════{RESET}")
-    print_status("●", "Module ready. Waiting for connections...")
+    print_status("●", "Module serving. Waiting for connections...")
     print(f"{BLUE}{BOLD}════════════════════════════════════{RESET}\n")
     
     await stop.wait()
 
     print("\n" + YELLOW + "Shutting down..." + RESET)
 
+    if not startup_task.done():
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
+
+    await backend_client.stop_outbox()
+
     await backend_client.stop_heartbeat()
 
+    await loop_watchdog.stop()
+
     await shutdown_streams()
 
     camera_service.stop()
 
     continuous_microphone.stop()
 
+    stt_executor.stop()
+
+    await ollama_client.close()
+
     discovery_service.stop()
 
     await server_runner.cleanup()
     
     print_status("●", "Goodbye")
 
-
 if __name__ == "__main__":
     monitor_thread = threading.Thread(target=update_monitor, daemon=True)
     monitor_thread.start()
@@ -0,0 +1,204 @@
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+FILLER_WORDS = {"um", "uh", "erm", "er", "hmm", "mm", "ah", "oh"}
+
+PUNCTUATION = re.compile(r"[^\w\s\[\]]+")
+
+
+#------This Function normalises a transcript so trivial variations share a cache key----------
+def normalise_transcript(text: str) -> str:
+    words = PUNCTUATION.sub(" ", text.lower()).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+#------This Function returns a short fingerprint of a prompt template----------
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+#------This Class handles the LRU + TTL cache of extraction results----------
+class AnalysisCache:
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries or settings.analysis_cache_size
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.analysis_cache_ttl_seconds
+        self.path = settings.analysis_cache_path if path is None else path
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AnalysisCache")
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def make_key(self, transcript: str, prompt: str, model: str) -> str:
+        material = f"{prompt_version(prompt)}|{model}|{normalise_transcript(transcript)}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _open_db(self) -> Optional[sqlite3.Connection]:
+        if not self.path or self._db_failed:
+            return None
+        if self._db is None:
+            try:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis_cache "
+                    "(key TEXT PRIMARY KEY, stored_at REAL, result TEXT)"
+                )
+                self._db.execute(
+                    "DELETE FROM analysis_cache WHERE stored_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+                self._db.commit()
+                logger.info(f"[CACHE] Persisting analysis results to {self.path}")
+            except sqlite3.Error as e:
+                logger.warning(f"[CACHE] Disk cache disabled: {e}")
+                self._db = None
+                self._db_failed = True
+        return self._db
+
+    def _disk_enabled(self) -> bool:
+        return bool(self.path) and not self._db_failed
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        result = self._get_from_memory(key, now)
+        if result is not None:
+            return result
+        return self._finish_lookup(key, self._load_from_disk(key, now))
+
+    async def fetch(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        result = self._get_from_memory(key, now)
+        if result is not None:
+            return result
+        entry = None
+        if self._disk_enabled():
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._load_from_disk, key, now
+            )
+        return self._finish_lookup(key, entry)
+
+    def _get_from_memory(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._counters["expired"] += 1
+                entry = None
+
+            if entry:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return copy.deepcopy(entry[1])
+            return None
+
+    def _finish_lookup(
+        self, key: str, entry: Optional[Tuple[float, Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if entry:
+                self._remember(key, entry)
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return copy.deepcopy(entry[1])
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        entry = (time.time(), copy.deepcopy(result))
+        with self._lock:
+            self._remember(key, entry)
+            self._counters["stores"] += 1
+        if self._disk_enabled():
+            self._executor.submit(self._persist, key, entry)
+
+    def _persist(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        with self._db_lock:
+            db = self._open_db()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?)",
+                    (key, entry[0], json.dumps(entry[1])),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[CACHE] Could not persist entry: {e}")
+
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _load_from_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._db_lock:
+            db = self._open_db()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT stored_at, result FROM analysis_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"[CACHE] Disk lookup failed: {e}")
+                return None
+        if row is None or now - row[0] > self.ttl_seconds:
+            return None
+        return row[0], json.loads(row[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        with self._db_lock:
+            db = self._open_db()
+            if db is not None:
+                db.execute("DELETE FROM analysis_cache")
+                db.commit()
+
+    def get_stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self._disk_enabled(),
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,277 @@
+
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from app.services.audio_ring import PcmRingBuffer, RingReader
+from app.services.readiness import readiness, COMPONENT_SPEECH
+
+logger = logging.getLogger(__name__)
+
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+    logger.warning("[CAPTURE] PyAudio not available - audio capture will run in demo mode only")
+
+
+DROP_OLDEST = "drop_oldest"
+LATEST_ONLY = "latest_only"
+
+REOPEN_BACKOFF_SECONDS = 1.0
+
+MAX_REOPEN_BACKOFF_SECONDS = 30.0
+
+
+#------This Class handles one consumer's cursor into the shared capture----------
+class AudioSubscription:
+
+    def __init__(self, engine: "AudioCaptureEngine", name: str, policy: str, reader: RingReader):
+        self.name = name
+        self.policy = policy
+        self.reader = reader
+        self.closed = False
+        self._engine = engine
+
+    @property
+    def is_active(self) -> bool:
+        return not self.closed and self._engine.is_capturing
+
+    @property
+    def dropped_samples(self) -> int:
+        return self.reader.dropped_samples
+
+    def read(self, timeout: float = 1.0) -> List[np.ndarray]:
+        views = self.read_views(timeout=timeout)
+        if not views:
+            return []
+        if len(views) == 1:
+            return [views[0].copy()]
+        return [np.concatenate(views)]
+
+    def read_views(
+        self, max_samples: Optional[int] = None, timeout: float = 1.0
+    ) -> Tuple[np.ndarray, ...]:
+        if self.closed:
+            return ()
+        if self.policy == LATEST_ONLY:
+            self.reader.skip_to_latest(self._engine.CHUNK)
+        return self.reader.read_views(max_samples=max_samples, timeout=timeout)
+
+    def close(self):
+        if not self.closed:
+            self._engine.unsubscribe(self)
+
+
+#------This Class handles the single shared microphone capture----------
+class AudioCaptureEngine:
+
+    RATE = 16000
+    CHANNELS = 1
+    CHUNK = 1024
+    BUFFER_SECONDS = 30
+
+    def __init__(self):
+        self._audio = None
+        self._stream = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._lifecycle_lock = threading.Lock()
+        self._ring = PcmRingBuffer(int(self.BUFFER_SECONDS * self.RATE))
+        self._subscriptions: List[AudioSubscription] = []
+        self._error_count = 0
+        self._max_consecutive_errors = 10
+        self._stop_requested = threading.Event()
+        self._reopening = False
+        self.reopen_attempts = 0
+        self.reopens = 0
+
+    @property
+    def is_capturing(self) -> bool:
+        return self._running
+
+    def subscribe(self, name: str, policy: str = DROP_OLDEST) -> Optional[AudioSubscription]:
+        with self._lifecycle_lock:
+            if not self._running:
+                self._cleanup_audio()
+                if not self._open_stream():
+                    return None
+
+            reader = self._ring.create_reader(name)
+            subscription = AudioSubscription(self, name, policy, reader)
+            self._subscriptions.append(subscription)
+
+            logger.info(
+                f"[CAPTURE] Subscriber '{name}' attached ({len(self._subscriptions)} total)"
+            )
+            return subscription
+
+    def unsubscribe(self, subscription: AudioSubscription):
+        with self._lifecycle_lock:
+            subscription.closed = True
+            self._ring.remove_reader(subscription.reader)
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            remaining = len(self._subscriptions)
+
+            logger.info(
+                f"[CAPTURE] Subscriber '{subscription.name}' detached ({remaining} remaining)"
+            )
+
+            if remaining == 0 and self._running:
+                self._stop_capture()
+
+    def _open_device(self) -> bool:
+        if not PYAUDIO_AVAILABLE:
+            logger.error("[CAPTURE] Cannot open microphone - PyAudio not installed")
+            return False
+
+        try:
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=self.CHANNELS,
+                rate=self.RATE,
+                input=True,
+                frames_per_buffer=self.CHUNK,
+            )
+            logger.info(
+                f"[CAPTURE] Audio stream opened: {self.RATE}Hz, "
+                f"{self.CHANNELS} channel(s), {self.CHUNK} chunk size"
+            )
+        except OSError as e:
+            logger.error(f"[CAPTURE] Failed to open audio stream: {e}")
+            self._cleanup_audio()
+            return False
+        except Exception as e:
+            logger.error(f"[CAPTURE] Unexpected error opening audio: {type(e).__name__}: {e}")
+            self._cleanup_audio()
+            return False
+        return True
+
+    def _open_stream(self) -> bool:
+        if not self._open_device():
+            return False
+
+        self._error_count = 0
+        self._stop_requested.clear()
+        self._running = True
+        self._ring.reopen()
+        self._thread = threading.Thread(
+            target=self._capture_loop, daemon=True, name="AudioCapture"
+        )
+        self._thread.start()
+        return True
+
+    def _stop_capture(self):
+        self._running = False
+        self._stop_requested.set()
+        self._ring.close()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=3)
+            if self._thread.is_alive():
+                logger.warning("[CAPTURE] Capture thread did not stop gracefully")
+        self._thread = None
+
+        self._cleanup_audio()
+        logger.info("[CAPTURE] Audio capture stopped")
+
+    def _cleanup_audio(self):
+        if self._stream:
+            try:
+                if self._stream.is_active():
+                    self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.warning(f"[CAPTURE] Error closing stream: {e}")
+            self._stream = None
+
+        if self._audio:
+            try:
+                self._audio.terminate()
+            except Exception as e:
+                logger.warning(f"[CAPTURE] Error terminating audio: {e}")
+            self._audio = None
+
+    def _capture_loop(self):
+        logger.info("[CAPTURE] Capture loop started")
+
+        while self._running:
+            try:
+                data = self._stream.read(self.CHUNK, exception_on_overflow=False)
+            except Exception as e:
+                self._error_count += 1
+                logger.warning(f"[CAPTURE] Error reading audio stream: {type(e).__name__}: {e}")
+
+                if self._error_count >= self._max_consecutive_errors:
+                    logger.error(
+                        f"[CAPTURE] Too many consecutive errors ({self._error_count}), reopening microphone"
+                    )
+                    if not self._reopen_device():
+                        break
+                    continue
+                time.sleep(0.1)
+                continue
+
+            self._error_count = 0
+            self._ring.write(np.frombuffer(data, dtype=np.int16))
+
+        self._running = False
+        self._ring.close()
+        logger.info("[CAPTURE] Capture loop ended")
+
+    def _reopen_device(self) -> bool:
+        self._reopening = True
+        readiness.mark_failed(COMPONENT_SPEECH, "microphone stopped delivering audio, reopening")
+        delay = REOPEN_BACKOFF_SECONDS
+        try:
+            while self._running:
+                self._cleanup_audio()
+                if self._stop_requested.wait(delay):
+                    return False
+                self.reopen_attempts += 1
+                if self._open_device():
+                    self._error_count = 0
+                    self.reopens += 1
+                    readiness.mark_ready(COMPONENT_SPEECH, "microphone reopened after read errors")
+                    logger.info("[CAPTURE] Microphone reopened")
+                    return True
+                delay = min(delay * 2, MAX_REOPEN_BACKOFF_SECONDS)
+                logger.warning(f"[CAPTURE] Microphone reopen failed, retrying in {delay:.1f}s")
+            return False
+        finally:
+            self._reopening = False
+
+    def get_level(self) -> float:
+        latest = self._ring.copy_latest(self.CHUNK)
+        if latest.size == 0:
+            return 0.0
+        return float(np.abs(latest.astype(np.int32)).mean())
+
+    def get_stats(self) -> dict:
+        ring_stats = self._ring.get_stats()
+        policies = {sub.name: sub.policy for sub in self._subscriptions}
+        subscribers = [
+            {**reader_stats, "policy": policies.get(reader_stats["name"], DROP_OLDEST)}
+            for reader_stats in ring_stats["readers"]
+        ]
+
+        return {
+            "capturing": self._running and not self._reopening,
+            "reopening": self._reopening,
+            "reopen_attempts": self.reopen_attempts,
+            "reopens": self.reopens,
+            "sample_rate": self.RATE,
+            "chunk_size": self.CHUNK,
+            "captured_seconds": ring_stats["written_samples"] / self.RATE,
+            "buffer_seconds": ring_stats["capacity_samples"] / self.RATE,
+            "subscribers": subscribers,
+        }
+
+
+
+audio_capture = AudioCaptureEngine()
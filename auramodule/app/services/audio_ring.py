@@ -0,0 +1,157 @@
+
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+#------This Class handles a reader cursor into the PCM ring buffer----------
+class RingReader:
+
+    def __init__(self, ring: "PcmRingBuffer", name: str, position: int):
+        self.name = name
+        self.position = position
+        self.dropped_samples = 0
+        self._ring = ring
+
+    @property
+    def lag_samples(self) -> int:
+        return self._ring.write_position - self.position
+
+    def available(self) -> int:
+        return self._ring._available_for(self)
+
+    def read_views(
+        self, max_samples: Optional[int] = None, timeout: float = 0.0
+    ) -> Tuple[np.ndarray, ...]:
+        return self._ring._read_views_for(self, max_samples, timeout)
+
+    def skip_to_latest(self, keep_samples: int = 0):
+        self._ring._skip_to_latest(self, keep_samples)
+
+
+#------This Class handles the preallocated int16 ring buffer for captured audio----------
+class PcmRingBuffer:
+
+    def __init__(self, capacity_samples: int):
+        if capacity_samples <= 0:
+            raise ValueError("capacity_samples must be positive")
+        self.capacity = capacity_samples
+        self._data = np.zeros(capacity_samples, dtype=np.int16)
+        self._write_position = 0
+        self._condition = threading.Condition()
+        self._readers: List[RingReader] = []
+        self._closed = False
+
+    @property
+    def write_position(self) -> int:
+        return self._write_position
+
+    def create_reader(self, name: str) -> RingReader:
+        with self._condition:
+            reader = RingReader(self, name, self._write_position)
+            self._readers.append(reader)
+        return reader
+
+    def remove_reader(self, reader: RingReader):
+        with self._condition:
+            if reader in self._readers:
+                self._readers.remove(reader)
+
+    def readers(self) -> List[RingReader]:
+        with self._condition:
+            return list(self._readers)
+
+    def write(self, samples: np.ndarray):
+        count = samples.size
+        if count == 0:
+            return
+
+        with self._condition:
+            if count >= self.capacity:
+                tail = samples[-self.capacity:]
+                self._write_position += count
+                start = self._write_position % self.capacity
+                self._data[start:] = tail[:self.capacity - start]
+                self._data[:start] = tail[self.capacity - start:]
+            else:
+                start = self._write_position % self.capacity
+                first_part = min(count, self.capacity - start)
+                self._data[start:start + first_part] = samples[:first_part]
+                if first_part < count:
+                    self._data[:count - first_part] = samples[first_part:]
+                self._write_position += count
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self):
+        with self._condition:
+            self._closed = False
+
+    def _clamp_overflow(self, reader: RingReader):
+        oldest_position = self._write_position - self.capacity
+        if reader.position < oldest_position:
+            reader.dropped_samples += oldest_position - reader.position
+            reader.position = oldest_position
+
+    def _available_for(self, reader: RingReader) -> int:
+        with self._condition:
+            self._clamp_overflow(reader)
+            return self._write_position - reader.position
+
+    def _read_views_for(
+        self, reader: RingReader, max_samples: Optional[int], timeout: float
+    ) -> Tuple[np.ndarray, ...]:
+        with self._condition:
+            if reader.position >= self._write_position and timeout > 0 and not self._closed:
+                self._condition.wait(timeout)
+
+            self._clamp_overflow(reader)
+            count = self._write_position - reader.position
+            if max_samples is not None:
+                count = min(count, max_samples)
+            if count <= 0:
+                return ()
+
+            start = reader.position % self.capacity
+            reader.position += count
+
+        end = start + count
+        if end <= self.capacity:
+            return (self._data[start:end],)
+        return (self._data[start:], self._data[:end - self.capacity])
+
+    def _skip_to_latest(self, reader: RingReader, keep_samples: int):
+        with self._condition:
+            target = max(reader.position, self._write_position - keep_samples)
+            reader.dropped_samples += target - reader.position
+            reader.position = target
+
+    def copy_latest(self, count: int) -> np.ndarray:
+        with self._condition:
+            count = min(count, self._write_position, self.capacity)
+            if count <= 0:
+                return np.zeros(0, dtype=np.int16)
+            end = self._write_position % self.capacity
+            start = end - count
+            if start >= 0:
+                return self._data[start:end].copy()
+            return np.concatenate((self._data[start:], self._data[:end]))
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                "capacity_samples": self.capacity,
+                "written_samples": self._write_position,
+                "readers": [
+                    {
+                        "name": reader.name,
+                        "lag_samples": self._write_position - reader.position,
+                        "dropped_samples": reader.dropped_samples,
+                    }
+                    for reader in self._readers
+                ],
+            }
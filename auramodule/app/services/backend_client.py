@@ -1,15 +1,44 @@
 
 import asyncio
+import gzip
+import json
 import logging
 import httpx
 import platform
 import time
-from typing import Optional, Callable, Any
+from collections import deque
+from typing import Optional, Callable, Any, Deque, Dict, List
 from app.core.config import settings
+from app.services.event_outbox import EventOutbox
+from app.services.metrics import metrics
+from app.services.stt_executor import summarise_latency
 
 logger = logging.getLogger(__name__)
 
 
+BACKEND_REQUESTS = metrics.counter("aura_backend_requests_total", "Backend calls by call and outcome", ["call", "outcome"])
+
+OUTBOX_BACKLOG = metrics.gauge("aura_outbox_backlog", "Events waiting in the durable outbox")
+
+OUTBOX_FLUSH_SECONDS = metrics.histogram("aura_outbox_flush_seconds", "Time to send one outbox batch")
+
+
+#------This Function counts the outcome of one backend call----------
+def _record_call(call: str, response: Optional[httpx.Response] = None, error: Optional[Exception] = None):
+    if error is not None:
+        if isinstance(error, httpx.ConnectError):
+            outcome = "unreachable"
+        elif isinstance(error, httpx.TimeoutException):
+            outcome = "timeout"
+        else:
+            outcome = "error"
+    elif response is not None and response.status_code < 400:
+        outcome = "ok"
+    else:
+        outcome = f"http_{response.status_code // 100}xx" if response is not None else "error"
+    BACKEND_REQUESTS.labels(call, outcome).inc()
+
+
 #------This Class handles the Backend Client----------
 class BackendClient:
 
@@ -24,6 +53,22 @@ class BackendClient:
         self._retry_count: int = 3
         self._on_reconnect_callback: Optional[Callable[[], Any]] = None
         self._is_reconnecting: bool = False
+        self.outbox = EventOutbox()
+        OUTBOX_BACKLOG.set_function(self.outbox.backlog)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_wake: Optional[asyncio.Event] = None
+        self._flush_failures: int = 0
+        self._bulk_supported: bool = True
+        self._last_flush_time: Optional[float] = None
+        self._flush_seconds: Deque[float] = deque(maxlen=200)
+        self._outbox_counters = {
+            "flushed": 0,
+            "duplicates": 0,
+            "rejected": 0,
+            "failed_flushes": 0,
+            "bytes_raw": 0,
+            "bytes_sent": 0,
+        }
 
     def _auth_headers(self) -> dict:
         token = (settings.backend_auth_token or "").strip()
@@ -85,6 +130,7 @@ class BackendClient:
                     },
                     headers=self._auth_headers(),
                 )
+                _record_call("register", response)
 
                 if response.status_code == 200:
                     logger.info(
@@ -109,17 +155,20 @@ class BackendClient:
                         f"Backend returned {response.status_code}: {response.text}"
                     )
 
-            except httpx.ConnectError:
+            except httpx.ConnectError as e:
+                _record_call("register", error=e)
                 logger.warning(
                     f"Cannot reach backend at {settings.backend_url} "
                     f"(attempt {attempt + 1}/{max_retries})"
                 )
-            except httpx.TimeoutException:
+            except httpx.TimeoutException as e:
+                _record_call("register", error=e)
                 logger.warning(
                     f"Timeout connecting to backend "
                     f"(attempt {attempt + 1}/{max_retries})"
                 )
             except Exception as e:
+                _record_call("register", error=e)
                 logger.error(f"Registration error: {type(e).__name__}: {e}")
 
             if attempt < max_retries - 1:
@@ -161,11 +210,15 @@ class BackendClient:
                 if success:
                     self._heartbeat_failures = 0
                     self._last_heartbeat_time = time.time()
+                    if self._flush_failures:
+                        self._request_flush(force=True)
                     
                     
                     if self._is_reconnecting:
                         self._is_reconnecting = False
                         logger.info("[HEARTBEAT] Backend connection recovered")
+                        self._bulk_supported = True
+                        self._request_flush(force=True)
                         if self._on_reconnect_callback:
                             try:
                                 await self._on_reconnect_callback()
@@ -197,6 +250,7 @@ class BackendClient:
                 json={"patient_uid": self.patient_uid},
                 headers=self._auth_headers(),
             )
+            _record_call("heartbeat", response)
 
             if response.status_code == 200:
                 logger.debug("Heartbeat sent successfully")
@@ -212,13 +266,16 @@ class BackendClient:
                 logger.warning(f"Heartbeat failed: {response.status_code}")
                 return False
 
-        except httpx.ConnectError:
+        except httpx.ConnectError as e:
+            _record_call("heartbeat", error=e)
             logger.warning(f"Cannot connect to backend at {settings.backend_url}")
             return False
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
+            _record_call("heartbeat", error=e)
             logger.warning("Heartbeat timeout")
             return False
         except Exception as e:
+            _record_call("heartbeat", error=e)
             logger.error(f"Heartbeat error: {type(e).__name__}: {e}")
             return False
 
@@ -243,51 +300,205 @@ class BackendClient:
             logger.error("[HEARTBEAT] Re-registration failed, will retry on next heartbeat")
 
     async def log_event(self, event_type: str, data: dict) -> bool:
-        """Log an event to the backend with retry and exponential backoff."""
-        max_retries = 3
-        base_delay = 1.0
-        max_delay = 10.0
-        
-        for attempt in range(max_retries):
+        try:
+            key = await self.outbox.run(self.outbox.append, event_type, data)
+        except Exception as e:
+            logger.error(f"[OUTBOX] Could not queue {event_type}: {type(e).__name__}: {e}")
+            return False
+        logger.debug(f"[OUTBOX] Queued {event_type} ({key[:8]})")
+        if self.outbox.backlog() >= settings.outbox_batch_size:
+            self._request_flush()
+        return True
+
+    def _request_flush(self, force: bool = False):
+        if force:
+            self._flush_failures = 0
+        if self._flush_wake and (force or self._flush_failures == 0):
+            self._flush_wake.set()
+
+    async def start_outbox(self):
+        if self._flush_task:
+            return
+        self._flush_wake = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        backlog = self.outbox.backlog()
+        if backlog:
+            logger.info(f"[OUTBOX] Replaying {backlog} event(s) left from a previous run")
+            self._flush_wake.set()
+
+    async def stop_outbox(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await asyncio.wait_for(self.flush_outbox(), timeout=settings.backend_timeout)
+        except Exception as e:
+            logger.debug(f"[OUTBOX] Final flush skipped: {type(e).__name__}: {e}")
+        backlog = self.outbox.backlog()
+        if backlog:
+            logger.info(f"[OUTBOX] {backlog} event(s) kept on disk for the next run")
+        await self.outbox.run(self.outbox.close)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                if self._flush_failures:
+                    delay = min(
+                        settings.outbox_flush_interval * (2 ** self._flush_failures),
+                        settings.outbox_max_backoff,
+                    )
+                else:
+                    delay = settings.outbox_flush_interval
+                try:
+                    await asyncio.wait_for(self._flush_wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_wake.clear()
+
+                if not self.outbox.backlog():
+                    continue
+                if await self.flush_outbox():
+                    self._flush_failures = 0
+                else:
+                    self._flush_failures += 1
+                    self._outbox_counters["failed_flushes"] += 1
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._flush_failures += 1
+                logger.error(f"[OUTBOX] Flush loop error: {type(e).__name__}: {e}")
+
+    async def flush_outbox(self) -> bool:
+        while True:
+            batch = await self.outbox.run(self.outbox.peek, settings.outbox_batch_size)
+            if not batch:
+                return True
+
+            started_at = time.perf_counter()
+            if self._bulk_supported:
+                acked = await self._send_batch(batch)
+            else:
+                acked = await self._send_one_by_one(batch)
+            self._flush_seconds.append(time.perf_counter() - started_at)
+            OUTBOX_FLUSH_SECONDS.observe(time.perf_counter() - started_at)
+
+            if acked is None:
+                await self.outbox.run(self.outbox.mark_attempted, [event["id"] for event in batch])
+                return False
+            await self.outbox.run(self.outbox.ack, acked)
+            self._last_flush_time = time.time()
+            if len(acked) < len(batch):
+                await self.outbox.run(
+                    self.outbox.mark_attempted,
+                    [event["id"] for event in batch if event["id"] not in acked],
+                )
+                return False
+            if len(batch) < settings.outbox_batch_size:
+                return True
+
+    async def _send_batch(self, batch: List[Dict[str, Any]]) -> Optional[List[int]]:
+        body = json.dumps({
+            "patient_uid": self.patient_uid,
+            "events": [
+                {
+                    "idempotency_key": event["idempotency_key"],
+                    "event_type": event["event_type"],
+                    "data": event["data"],
+                    "occurred_at": event["created_at"],
+                }
+                for event in batch
+            ],
+        }).encode("utf-8")
+        compressed = gzip.compress(body, compresslevel=6)
+
+        try:
+            client = await self._get_client()
+            response = await client.post(
+                self._endpoint("/aura/log_events", "/aura/device/log_events"),
+                content=compressed,
+                headers={
+                    **self._auth_headers(),
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "gzip",
+                },
+            )
+        except (httpx.ConnectError, httpx.TimeoutException) as e:
+            _record_call("log_events", error=e)
+            logger.warning(f"[OUTBOX] Backend unreachable, {len(batch)} event(s) stay queued: {type(e).__name__}")
+            return None
+        except Exception as e:
+            _record_call("log_events", error=e)
+            logger.error(f"[OUTBOX] Batch send error: {type(e).__name__}: {e}")
+            return None
+        _record_call("log_events", response)
+
+        if response.status_code == 404 and '"Not Found"' in response.text:
+            logger.warning("[OUTBOX] Backend has no bulk endpoint, sending events one by one")
+            self._bulk_supported = False
+            return await self._send_one_by_one(batch)
+        if response.status_code != 200:
+            logger.warning(f"[OUTBOX] Batch rejected with {response.status_code}: {response.text[:200]}")
+            return None
+
+        self._outbox_counters["bytes_raw"] += len(body)
+        self._outbox_counters["bytes_sent"] += len(compressed)
+        by_key = {event["idempotency_key"]: event["id"] for event in batch}
+        acked = []
+        for result in response.json().get("results", []):
+            event_id = by_key.get(result.get("idempotency_key"))
+            status = result.get("status")
+            if event_id is None or status not in ("stored", "duplicate", "rejected"):
+                continue
+            if status == "stored":
+                self._outbox_counters["flushed"] += 1
+            elif status == "duplicate":
+                self._outbox_counters["duplicates"] += 1
+            else:
+                self._outbox_counters["rejected"] += 1
+                logger.warning(f"[OUTBOX] Backend rejected event {result.get('idempotency_key', '')[:8]}: {result.get('detail')}")
+            acked.append(event_id)
+        return acked
+
+    async def _send_one_by_one(self, batch: List[Dict[str, Any]]) -> Optional[List[int]]:
+        acked = []
+        for event in batch:
             try:
                 client = await self._get_client()
                 response = await client.post(
                     self._endpoint("/aura/log_event", "/aura/device/log_event"),
                     json={
                         "patient_uid": self.patient_uid,
-                        "event_type": event_type,
-                        "data": data,
+                        "event_type": event["event_type"],
+                        "data": event["data"],
+                        "idempotency_key": event["idempotency_key"],
                     },
                     headers=self._auth_headers(),
                 )
-
-                if response.status_code == 200:
-                    logger.debug(f"Event logged: {event_type}")
-                    return True
-                elif response.status_code in (401, 403):
-                    logger.warning(f"Auth error logging event: {response.status_code}")
-                    return False
-                elif response.status_code >= 500:
-                    logger.warning(f"Server error logging event: {response.status_code}")
-                else:
-                    logger.warning(f"Failed to log event: {response.status_code}")
-                    return False
-
-            except httpx.ConnectError as e:
-                logger.warning(f"Cannot connect to backend for event logging (attempt {attempt + 1}/{max_retries}): {e}")
-            except httpx.TimeoutException as e:
-                logger.warning(f"Timeout logging event (attempt {attempt + 1}/{max_retries}): {e}")
+            except (httpx.ConnectError, httpx.TimeoutException) as e:
+                _record_call("log_event", error=e)
+                logger.warning(f"[OUTBOX] Backend unreachable while replaying events: {type(e).__name__}")
+                break
             except Exception as e:
-                logger.error(f"Error logging event: {type(e).__name__}: {e}")
-                return False
-            
-            if attempt < max_retries - 1:
-                delay = min(base_delay * (2 ** attempt), max_delay)
-                logger.info(f"Retrying log_event in {delay:.1f}s (attempt {attempt + 2}/{max_retries})...")
-                await asyncio.sleep(delay)
-        
-        logger.error(f"Failed to log event after {max_retries} attempts: {event_type}")
-        return False
+                _record_call("log_event", error=e)
+                logger.error(f"[OUTBOX] Event send error: {type(e).__name__}: {e}")
+                break
+            _record_call("log_event", response)
+
+            if response.status_code == 200:
+                self._outbox_counters["flushed"] += 1
+            elif response.status_code in (400, 422):
+                self._outbox_counters["rejected"] += 1
+                logger.warning(f"[OUTBOX] Backend rejected {event['event_type']}: {response.text[:200]}")
+            else:
+                logger.warning(f"[OUTBOX] Failed to log event: {response.status_code}")
+                break
+            acked.append(event["id"])
+        return acked if acked else None
 
     def get_status(self) -> dict:
         return {
@@ -296,6 +507,14 @@ class BackendClient:
             "last_heartbeat": self._last_heartbeat_time,
             "heartbeat_failures": self._heartbeat_failures,
             "is_reconnecting": self._is_reconnecting,
+            "outbox": {
+                **self.outbox.get_stats(),
+                **self._outbox_counters,
+                "bulk_supported": self._bulk_supported,
+                "flush_failures": self._flush_failures,
+                "last_flush": self._last_flush_time,
+                "flush_latency_ms": summarise_latency(self._flush_seconds),
+            },
         }
 
 
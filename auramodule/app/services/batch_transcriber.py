@@ -0,0 +1,171 @@
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.speech import SAMPLE_RATE, get_whisper_model, transcribe_waveform_sync, validate_waveform
+from app.services.stt_executor import stt_executor, record_decode, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+
+MAX_CLIP_SECONDS = 30.0
+
+
+#------This Function lays utterances end to end and records their clip boundaries----------
+def concatenate_utterances(waveforms: List[np.ndarray]) -> Tuple[np.ndarray, List[dict]]:
+    audio = np.concatenate(waveforms).astype(np.float32, copy=False)
+    clips = []
+    offset = 0
+    for waveform in waveforms:
+        clips.append({
+            "start": offset / SAMPLE_RATE,
+            "end": (offset + waveform.size) / SAMPLE_RATE,
+        })
+        offset += waveform.size
+    return audio, clips
+
+
+#------This Function maps batched segments back to the utterance they came from----------
+def assign_segments(segments: List, clips: List[dict]) -> List[str]:
+    clip_starts = [clip["start"] for clip in clips]
+    parts: List[List[str]] = [[] for _ in clips]
+    for segment in segments:
+        text = segment.text.strip()
+        if not text:
+            continue
+        index = bisect.bisect_right(clip_starts, segment.start + 1e-3) - 1
+        parts[max(0, min(index, len(clips) - 1))].append(text)
+    return [" ".join(texts) for texts in parts]
+
+
+#------This Class handles batched Whisper decoding of queued utterances----------
+class BatchTranscriber:
+
+    MAX_BATCH_SIZE = 8
+
+    def __init__(self, latency_budget_ms: Optional[int] = None, beam_size: int = 5):
+        self.latency_budget = (
+            settings.stt_batch_latency_ms if latency_budget_ms is None else latency_budget_ms
+        ) / 1000.0
+        self.beam_size = beam_size
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.batches_run = 0
+        self.utterances_batched = 0
+        self.sequential_fallbacks = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+
+    def transcribe_batch_sync(self, waveforms: List[np.ndarray]) -> List[str]:
+        results = [""] * len(waveforms)
+        batch_indices = []
+        for index, waveform in enumerate(waveforms):
+            is_valid, error = validate_waveform(waveform)
+            if not is_valid:
+                logger.warning(f"[BATCH-STT] Skipping utterance {index}: {error}")
+            elif waveform.size > MAX_CLIP_SECONDS * SAMPLE_RATE:
+                results[index] = transcribe_waveform_sync(waveform, self.beam_size)
+            else:
+                batch_indices.append(index)
+
+        if len(batch_indices) == 1:
+            index = batch_indices[0]
+            results[index] = transcribe_waveform_sync(waveforms[index], self.beam_size)
+        elif batch_indices:
+            texts = self._decode_batch([waveforms[index] for index in batch_indices])
+            for index, text in zip(batch_indices, texts):
+                results[index] = text
+        return results
+
+    def _decode_batch(self, waveforms: List[np.ndarray]) -> List[str]:
+        audio, clips = concatenate_utterances(waveforms)
+        start_time = time.time()
+        try:
+            model = get_whisper_model()
+            segments, _ = model.transcribe_batched(
+                audio,
+                language="en",
+                beam_size=self.beam_size,
+                clip_timestamps=clips,
+                batch_size=min(len(clips), self.MAX_BATCH_SIZE),
+            )
+            texts = assign_segments(segments, clips)
+        except Exception as e:
+            logger.warning(
+                f"[BATCH-STT] Batched decode failed ({type(e).__name__}: {e}), "
+                f"falling back to sequential"
+            )
+            self.sequential_fallbacks += 1
+            return [transcribe_waveform_sync(waveform, self.beam_size) for waveform in waveforms]
+
+        self.batches_run += 1
+        self.utterances_batched += len(waveforms)
+        self.last_batch_size = len(waveforms)
+        self.last_batch_seconds = time.time() - start_time
+        record_decode("batch", self.last_batch_seconds, audio.size / SAMPLE_RATE)
+        logger.info(
+            f"[BATCH-STT] Decoded {len(waveforms)} utterances "
+            f"({audio.size / SAMPLE_RATE:.1f}s audio) in {self.last_batch_seconds:.2f}s"
+        )
+        return texts
+
+    async def transcribe_many(
+        self, waveforms: List[np.ndarray], priority: int = PRIORITY_INTERACTIVE
+    ) -> List[str]:
+        if not waveforms:
+            return []
+        return await stt_executor.run(priority, self.transcribe_batch_sync, waveforms)
+
+    async def transcribe(self, waveform: np.ndarray) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((waveform, future))
+
+        if len(self._pending) >= self.MAX_BATCH_SIZE:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.latency_budget, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending = [(waveform, future) for waveform, future in self._pending if not future.done()]
+        self._pending = []
+        if pending:
+            asyncio.ensure_future(self._run_pending(pending))
+
+    async def _run_pending(self, pending: List[Tuple[np.ndarray, asyncio.Future]]):
+        try:
+            texts = await self.transcribe_many([waveform for waveform, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), text in zip(pending, texts):
+            if not future.done():
+                future.set_result(text)
+
+    def get_stats(self) -> dict:
+        return {
+            "latency_budget_ms": int(self.latency_budget * 1000),
+            "batches_run": self.batches_run,
+            "utterances_batched": self.utterances_batched,
+            "sequential_fallbacks": self.sequential_fallbacks,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_seconds": round(self.last_batch_seconds, 2),
+            "pending": len(self._pending),
+        }
+
+
+
+batch_transcriber = BatchTranscriber()
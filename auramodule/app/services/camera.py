@@ -1,5 +1,4 @@
 
-import cv2
 import logging
 import numpy as np
 import threading
@@ -7,10 +6,18 @@ import time
 import platform
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
+CAMERA_FPS = metrics.gauge("aura_camera_fps", "Frames per second delivered by the capture loop")
+
+CAMERA_FRAMES = metrics.counter("aura_camera_frames_total", "Frames captured")
+
+CAMERA_READ_ERRORS = metrics.counter("aura_camera_read_errors_total", "Failed camera reads")
+
+
 #------This Class handles the Camera Service----------
 class CameraService:
 
@@ -20,7 +27,7 @@ class CameraService:
     FRAME_DELAY = 0.033  
 
     def __init__(self):
-        self._cap: Optional[cv2.VideoCapture] = None
+        self._cap: Optional[Any] = None
         self._frame: Optional[np.ndarray] = None
         self._lock = threading.Lock()
         self._running = False
@@ -41,7 +48,7 @@ class CameraService:
         if settings.demo_mode:
             logger.info("[CAMERA] Running in demo mode - using simulated camera")
             self._running = True
-            self._thread = threading.Thread(target=self._demo_capture_loop, daemon=True)
+            self._thread = threading.Thread(target=self._demo_capture_loop, daemon=True, name="CameraCapture")
             self._thread.start()
             self._camera_info = {
                 "resolution": f"{self.DEFAULT_WIDTH}x{self.DEFAULT_HEIGHT}",
@@ -61,11 +68,13 @@ class CameraService:
         self._detect_camera_capabilities()
 
         self._running = True
-        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True, name="CameraCapture")
         self._thread.start()
         logger.info("[CAMERA] Capture thread started")
 
     def _open_camera(self) -> bool:
+        import cv2
+
         camera_index = settings.camera_index
         
         
@@ -109,6 +118,8 @@ class CameraService:
         return False
 
     def _detect_camera_capabilities(self):
+        import cv2
+
         if not self._cap or not self._cap.isOpened():
             return
 
@@ -162,6 +173,8 @@ class CameraService:
             }
 
     def _capture_loop(self):
+        import cv2
+
         logger.info("[CAMERA] Capture loop started")
         
         while self._running and self._cap is not None:
@@ -170,6 +183,7 @@ class CameraService:
                 
                 if not ret:
                     self._error_count += 1
+                    CAMERA_READ_ERRORS.inc()
                     if self._error_count >= self._max_consecutive_errors:
                         logger.error(
                             f"[CAMERA] Too many consecutive read errors ({self._error_count}), "
@@ -184,9 +198,11 @@ class CameraService:
                 
                 
                 self._frame_count += 1
+                CAMERA_FRAMES.inc()
                 current_time = time.time()
                 if current_time - self._last_fps_time >= 1.0:
                     self._fps = self._frame_count / (current_time - self._last_fps_time)
+                    CAMERA_FPS.set(self._fps)
                     self._frame_count = 0
                     self._last_fps_time = current_time
 
@@ -215,6 +231,8 @@ class CameraService:
             self._cap = None
 
     def _demo_capture_loop(self):
+        import cv2
+
         logger.info("[CAMERA] Demo capture loop started")
         
         
@@ -246,9 +264,11 @@ class CameraService:
 
                 
                 self._frame_count += 1
+                CAMERA_FRAMES.inc()
                 current_time = time.time()
                 if current_time - self._last_fps_time >= 1.0:
                     self._fps = self._frame_count / (current_time - self._last_fps_time)
+                    CAMERA_FPS.set(self._fps)
                     self._frame_count = 0
                     self._last_fps_time = current_time
 
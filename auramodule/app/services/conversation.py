@@ -3,9 +3,15 @@ import json
 import logging
 import httpx
 import asyncio
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from app.core.config import settings
+from app.services.analysis_cache import analysis_cache
+from app.services.backend_client import get_backend_client
+from app.services.fast_extractor import fast_extractor, TIER_LLM
+from app.services.llm_client import ollama_client, TokenCallback
+from app.services.llm_scheduler import llm_scheduler, PRIORITY_EXTRACTION, PRIORITY_SUMMARY
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +30,16 @@ Create a coherent paragraph (2-4 sentences) that captures:
 
 Keep it natural and readable, like a personal journal entry. Do not use bullet points or lists."""
 
+MERGE_SUMMARY_PROMPT = """You maintain a running journal summary of a patient's day for an assistive app.
+You are given the summary so far and newer notes from the same conversation.
+Rewrite them as one coherent paragraph (3-5 sentences) that keeps every important fact, name, plan and emotion from both, in chronological order.
+
+Keep it natural and readable, like a personal journal entry. Do not use bullet points or lists."""
+
+SUMMARY_BLOCK_CHARS = 2000
+
+SUMMARY_BLOCK_SECONDS = 120.0
+
 EXTRACTION_PROMPT = """You are an event extraction engine for an Alzheimer's patient assistive app called AURA. Analyze this conversation transcript and extract structured information.
 
 Current system time: {system_time}
@@ -39,6 +55,10 @@ Important: For datetime fields, use natural language expressions like "tomorrow
 
 If no items exist for a field, use an empty list. Always return valid JSON."""
 
+BATCH_EXTRACTION_SUFFIX = """
+
+You will receive {count} separate numbered transcripts. Analyze each one independently and return ONLY a JSON object of the form {{"results": [...]}} with exactly {count} objects in the same order, each with the fields described above."""
+
 
 def parse_datetime_from_text(text: str) -> Optional[datetime]:
     if not text:
@@ -84,56 +104,54 @@ async def call_ollama(
     content: str,
     timeout: float = OLLAMA_TIMEOUT,
     max_retries: int = 2,
+    num_predict: int = 1024,
+    on_token: Optional[TokenCallback] = None,
 ) -> tuple[Optional[Dict], Optional[str]]:
-    for attempt in range(max_retries + 1):
+    return await ollama_client.chat(
+        [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": content},
+        ],
+        options={
+            "temperature": 0.3,
+            "num_predict": num_predict,
+        },
+        response_format="json",
+        timeout=timeout,
+        max_retries=max_retries,
+        on_token=on_token,
+    )
+
+
+async def _extract_streaming(text: str, on_token: TokenCallback) -> tuple[Optional[Dict], Optional[str]]:
+    system_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    prompt_with_time = EXTRACTION_PROMPT.format(system_time=system_time)
+    return await call_ollama(prompt_with_time, text, on_token=on_token)
+
+
+async def _extract_batch(inputs: List[str]) -> List[tuple[Optional[Dict], Optional[str]]]:
+    system_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    prompt_with_time = EXTRACTION_PROMPT.format(system_time=system_time)
+    if len(inputs) == 1:
+        return [await call_ollama(prompt_with_time, inputs[0])]
+
+    numbered = "\n\n".join(f"Transcript {i + 1}:\n{text}" for i, text in enumerate(inputs))
+    data, error = await call_ollama(
+        prompt_with_time + BATCH_EXTRACTION_SUFFIX.format(count=len(inputs)),
+        numbered,
+        num_predict=1024 * len(inputs),
+    )
+    if not error and data:
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    f"{settings.ollama_url}/api/chat",
-                    json={
-                        "model": settings.ollama_model,
-                        "messages": [
-                            {"role": "system", "content": prompt},
-                            {"role": "user", "content": content},
-                        ],
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3,
-                            "num_predict": 1024,
-                        },
-                    },
-                )
+            results = json.loads(data.get("message", {}).get("content", "")).get("results")
+        except (json.JSONDecodeError, AttributeError):
+            results = None
+        if isinstance(results, list) and len(results) == len(inputs):
+            logger.info(f"[CONV] Extracted {len(inputs)} transcripts in one LLM call")
+            return [({"message": {"content": json.dumps(result)}}, None) for result in results]
 
-                if resp.status_code == 200:
-                    data = resp.json()
-                    return data, None
-                elif resp.status_code == 404:
-                    return None, f"Model '{settings.ollama_model}' not found in Ollama"
-                else:
-                    return None, f"Ollama returned status {resp.status_code}"
-
-        except httpx.ConnectError:
-            error_msg = f"Cannot connect to Ollama at {settings.ollama_url}"
-            if attempt < max_retries:
-                logger.warning(f"[CONV] {error_msg}, retrying...")
-                continue
-            return None, error_msg
-            
-        except httpx.TimeoutException:
-            error_msg = f"Ollama request timed out after {timeout}s"
-            if attempt < max_retries:
-                logger.warning(f"[CONV] {error_msg}, retrying...")
-                continue
-            return None, error_msg
-            
-        except json.JSONDecodeError as e:
-            return None, f"Invalid JSON from Ollama: {e}"
-            
-        except Exception as e:
-            return None, f"Ollama error: {type(e).__name__}: {e}"
-    
-    return None, "Max retries exceeded"
+    logger.warning("[CONV] Coalesced extraction unusable, analyzing transcripts one by one")
+    return [await call_ollama(prompt_with_time, text) for text in inputs]
 
 
 async def analyze_conversation(
@@ -141,6 +159,9 @@ async def analyze_conversation(
     speakers: List[Dict[str, Any]],
     patient_uid: str,
     auth_token: str = "",
+    priority: int = PRIORITY_EXTRACTION,
+    on_token: Optional[TokenCallback] = None,
+    store_journal: bool = True,
 ) -> Dict[str, Any]:
     
     is_valid, error = validate_transcript(transcript)
@@ -156,48 +177,63 @@ async def analyze_conversation(
     full_input = speaker_text + transcript if speaker_text else transcript
 
     
-    system_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    prompt_with_time = EXTRACTION_PROMPT.format(system_time=system_time)
-
-    logger.info(f"[CONV] Analyzing transcript ({len(transcript)} chars)...")
-    
-    
-    data, error = await call_ollama(prompt_with_time, full_input)
+    tier, extracted = (
+        fast_extractor.classify(transcript) if settings.fast_extraction_enabled else (TIER_LLM, None)
+    )
+    cache_key = analysis_cache.make_key(full_input, EXTRACTION_PROMPT, settings.ollama_model)
+    if extracted is None:
+        extracted = await analysis_cache.fetch(cache_key)
+
+    if tier != TIER_LLM:
+        logger.info(f"[CONV] Fast path ({tier}) handled transcript ({len(transcript)} chars)")
+    elif extracted is not None:
+        logger.info(f"[CONV] Reusing cached analysis for transcript ({len(transcript)} chars)")
+    else:
+        logger.info(f"[CONV] Analyzing transcript ({len(transcript)} chars)...")
+    
+    
+        if on_token:
+            data, error = await llm_scheduler.submit(priority, _extract_streaming, full_input, on_token)
+        else:
+            data, error = await llm_scheduler.submit_coalescing(
+                priority, "extraction", _extract_batch, full_input, len(full_input)
+            )
     
-    if error:
-        logger.warning(f"[CONV] Ollama error: {error}")
-        return _empty_result()
+        if error:
+            logger.warning(f"[CONV] Ollama error: {error}")
+            return _empty_result()
     
-    if not data:
-        logger.warning("[CONV] No response from Ollama")
-        return _empty_result()
+        if not data:
+            logger.warning("[CONV] No response from Ollama")
+            return _empty_result()
 
     
-    try:
-        content = data.get("message", {}).get("content", "")
-        if not content:
-            logger.warning("[CONV] Empty content from Ollama")
-            return _empty_result()
+        try:
+            content = data.get("message", {}).get("content", "")
+            if not content:
+                logger.warning("[CONV] Empty content from Ollama")
+                return _empty_result()
             
-        extracted = json.loads(content)
+            extracted = json.loads(content)
         
-    except json.JSONDecodeError as e:
-        logger.warning(f"[CONV] Failed to parse Ollama response as JSON: {e}")
+        except json.JSONDecodeError as e:
+            logger.warning(f"[CONV] Failed to parse Ollama response as JSON: {e}")
         
-        content = data.get("message", {}).get("content", "")
-        return {
-            **_empty_result(),
-            "summary": content[:200] if content else "Failed to analyze",
+            content = data.get("message", {}).get("content", "")
+            return {
+                **_empty_result(),
+                "summary": content[:200] if content else "Failed to analyze",
+            }
+    
+    
+        extracted = {
+            "events": extracted.get("events", []),
+            "key_info": extracted.get("key_info", []),
+            "reminders": extracted.get("reminders", []),
+            "mood": extracted.get("mood", ""),
+            "summary": extracted.get("summary", ""),
         }
-    
-    
-    extracted = {
-        "events": extracted.get("events", []),
-        "key_info": extracted.get("key_info", []),
-        "reminders": extracted.get("reminders", []),
-        "mood": extracted.get("mood", ""),
-        "summary": extracted.get("summary", ""),
-    }
+        analysis_cache.put(cache_key, extracted)
 
     
     for event in extracted.get("events", []):
@@ -219,7 +255,7 @@ async def analyze_conversation(
     )
 
     
-    if patient_uid:
+    if patient_uid and store_journal:
         try:
             await _store_journal(transcript, speakers, extracted, patient_uid, auth_token)
         except Exception as e:
@@ -307,6 +343,7 @@ async def summarize_conversation(
     transcripts: List[str],
     patient_uid: str,
     auth_token: str = "",
+    through_seq: Optional[int] = None,
 ) -> Optional[str]:
     if not transcripts:
         logger.warning("[CONV] No transcripts to summarize")
@@ -323,7 +360,7 @@ async def summarize_conversation(
     logger.info(f"[CONV] Summarizing {len(transcripts)} transcripts ({len(full_text)} chars)...")
     
     
-    summary, error = await _call_summarization_ollama(full_text)
+    summary, error, partial = await conversation_summarizer.finalize(transcripts, through_seq)
     
     if error:
         logger.warning(f"[CONV] Summarization failed: {error}")
@@ -341,6 +378,7 @@ async def summarize_conversation(
         transcript_count=len(transcripts),
         patient_uid=patient_uid,
         auth_token=auth_token,
+        partial=partial,
     )
     
     return summary
@@ -350,56 +388,26 @@ async def _call_summarization_ollama(
     text: str,
     timeout: float = 60.0,  
     max_retries: int = 2,
+    system_prompt: str = SUMMARIZATION_PROMPT,
+    instruction: str = "Please summarize this conversation:",
 ) -> tuple[Optional[str], Optional[str]]:
-    for attempt in range(max_retries + 1):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    f"{settings.ollama_url}/api/chat",
-                    json={
-                        "model": settings.ollama_model,
-                        "messages": [
-                            {"role": "system", "content": SUMMARIZATION_PROMPT},
-                            {"role": "user", "content": f"Please summarize this conversation:\n\n{text}"},
-                        ],
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3,
-                            "num_predict": 512,  
-                        },
-                    },
-                )
-
-                if resp.status_code == 200:
-                    data = resp.json()
-                    content = data.get("message", {}).get("content", "")
-                    return content.strip(), None
-                elif resp.status_code == 404:
-                    return None, f"Model '{settings.ollama_model}' not found in Ollama"
-                else:
-                    return None, f"Ollama returned status {resp.status_code}"
-
-        except httpx.ConnectError:
-            error_msg = f"Cannot connect to Ollama at {settings.ollama_url}"
-            if attempt < max_retries:
-                logger.warning(f"[CONV] {error_msg}, retrying...")
-                continue
-            return None, error_msg
-            
-        except httpx.TimeoutException:
-            error_msg = f"Ollama summarization timed out after {timeout}s"
-            if attempt < max_retries:
-                logger.warning(f"[CONV] {error_msg}, retrying...")
-                continue
-            return None, error_msg
-            
-        except json.JSONDecodeError as e:
-            return None, f"Invalid JSON from Ollama: {e}"
-            
-        except Exception as e:
-            return None, f"Ollama error: {type(e).__name__}: {e}"
-    
-    return None, "Max retries exceeded"
+    data, error = await llm_scheduler.submit(
+        PRIORITY_SUMMARY,
+        ollama_client.chat,
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"{instruction}\n\n{text}"},
+        ],
+        options={
+            "temperature": 0.3,
+            "num_predict": 512,  
+        },
+        timeout=timeout,
+        max_retries=max_retries,
+    )
+    if error:
+        return None, error
+    return data.get("message", {}).get("content", "").strip(), None
 
 
 async def _send_summary_to_backend(
@@ -407,7 +415,26 @@ async def _send_summary_to_backend(
     transcript_count: int,
     patient_uid: str,
     auth_token: str,
+    partial: bool = False,
 ) -> bool:
+    data = {
+        "summary": summary,
+        "transcript_count": transcript_count,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+    if partial:
+        data["partial"] = True
+    if not auth_token.strip():
+        try:
+            backend_client = get_backend_client()
+        except RuntimeError:
+            backend_client = None
+        if backend_client and backend_client.patient_uid == patient_uid:
+            queued = await backend_client.log_event("conversation_summary", data)
+            if queued:
+                logger.info("[CONV] Summary queued for the backend")
+            return queued
+
     try:
         token = auth_token.strip() if auth_token else (settings.backend_auth_token or "").strip()
         endpoint = "/aura/log_event" if token else "/aura/device/log_event"
@@ -422,11 +449,7 @@ async def _send_summary_to_backend(
                 json={
                     "patient_uid": patient_uid,
                     "event_type": "conversation_summary",
-                    "data": {
-                        "summary": summary,
-                        "transcript_count": transcript_count,
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                    },
+                    "data": data,
                 },
             )
 
@@ -449,3 +472,196 @@ async def _send_summary_to_backend(
     except Exception as e:
         logger.error(f"[CONV] Error sending summary: {type(e).__name__}: {e}")
         return False
+
+
+#------This Function splits numbered transcripts into blocks that fit one summarization prompt----------
+def _chunk_items(items: List[Tuple[int, str]], max_chars: int) -> List[Tuple[List[Tuple[int, str]], str]]:
+    blocks: List[Tuple[List[Tuple[int, str]], str]] = []
+    current: List[Tuple[int, str]] = []
+    current_chars = 0
+    for item in items:
+        if current and current_chars + len(item[1]) > max_chars:
+            blocks.append((current, " ".join(text[:max_chars] for _, text in current)))
+            current, current_chars = [], 0
+        current.append(item)
+        current_chars += len(item[1]) + 1
+    if current:
+        blocks.append((current, " ".join(text[:max_chars] for _, text in current)))
+    return blocks
+
+
+#------This Class handles rolling map-reduce summarization of the live conversation----------
+class IncrementalSummarizer:
+
+    def __init__(
+        self,
+        block_chars: int = SUMMARY_BLOCK_CHARS,
+        block_seconds: float = SUMMARY_BLOCK_SECONDS,
+    ):
+        self.block_chars = block_chars
+        self.block_seconds = block_seconds
+        self._pending: List[Tuple[int, str]] = []
+        self._pending_chars = 0
+        self._pending_since: Optional[float] = None
+        self._rolling_summary = ""
+        self._blocks_folded = 0
+        self._last_seq = 0
+        self._fed_seqs: List[int] = []
+        self._folded_through = 0
+        self._consumed_through = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.map_calls = 0
+        self.merge_calls = 0
+        self.failures = 0
+        self.full_fallbacks = 0
+        self.partial_summaries = 0
+        self.last_finalize_seconds = 0.0
+
+    def feed_threadsafe(self, text: str, loop: asyncio.AbstractEventLoop, seq: Optional[int] = None):
+        if loop and loop.is_running():
+            loop.call_soon_threadsafe(self.feed, text, seq)
+
+    def feed(self, text: str, seq: Optional[int] = None):
+        seq = self._last_seq + 1 if seq is None else seq
+        self._last_seq = max(self._last_seq, seq)
+        text = text.strip()
+        if not text or seq <= self._consumed_through:
+            return
+        if self._pending_since is None:
+            self._pending_since = time.time()
+        self._fed_seqs.append(seq)
+        self._pending.append((seq, text))
+        self._pending_chars += len(text) + 1
+
+        block_due = (
+            self._pending_chars >= self.block_chars
+            or time.time() - self._pending_since >= self.block_seconds
+        )
+        if block_due and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._fold_pending())
+
+    def _set_pending(self, items: List[Tuple[int, str]]):
+        self._pending = items
+        self._pending_chars = sum(len(text) + 1 for _, text in items)
+        if not items:
+            self._pending_since = None
+        elif self._pending_since is None:
+            self._pending_since = time.time()
+
+    def _take_pending(self, through: Optional[int] = None) -> List[Tuple[int, str]]:
+        taken = [item for item in self._pending if through is None or item[0] <= through]
+        self._set_pending([item for item in self._pending if through is not None and item[0] > through])
+        return taken
+
+    async def _fold_pending(self):
+        async with self._lock:
+            while self._pending:
+                blocks = _chunk_items(self._take_pending(), self.block_chars)
+                for index, (items, block) in enumerate(blocks):
+                    error = await self._fold_block(block)
+                    if error:
+                        logger.warning(f"[CONV] Rolling summary step failed: {error}")
+                        remaining = [item for later, _ in blocks[index:] for item in later]
+                        self._set_pending(remaining + self._pending)
+                        return
+                    self._folded_through = max(self._folded_through, items[-1][0])
+                if self._pending_chars < self.block_chars:
+                    return
+
+    async def _fold_block(self, block: str) -> Optional[str]:
+        mini_summary, error = await _call_summarization_ollama(
+            block, instruction="Please summarize this part of the conversation:"
+        )
+        self.map_calls += 1
+        if error or not mini_summary:
+            self.failures += 1
+            return error or "empty mini-summary"
+
+        if not self._rolling_summary:
+            self._rolling_summary = mini_summary
+            self._blocks_folded += 1
+            return None
+
+        merged, error = await _call_summarization_ollama(
+            f"Summary so far:\n{self._rolling_summary}\n\nNewer notes:\n{mini_summary}",
+            system_prompt=MERGE_SUMMARY_PROMPT,
+            instruction="Merge these into one updated summary:",
+        )
+        self.merge_calls += 1
+        if error or not merged:
+            self.failures += 1
+            return error or "empty merged summary"
+
+        self._rolling_summary = merged
+        self._blocks_folded += 1
+        return None
+
+    async def _fold_blocks(self, items: List[Tuple[int, str]]) -> List[str]:
+        errors = []
+        for _, block in _chunk_items(items, self.block_chars):
+            error = await self._fold_block(block)
+            if error:
+                errors.append(error)
+        return errors
+
+    async def finalize(
+        self, transcripts: List[str], through_seq: Optional[int] = None
+    ) -> tuple[Optional[str], Optional[str], bool]:
+        start_time = time.time()
+        async with self._lock:
+            through = self._last_seq if through_seq is None else through_seq
+            through = max(through, self._folded_through)
+            fed = [seq for seq in self._fed_seqs if self._consumed_through < seq <= through]
+            covered = bool(fed) and len(set(fed)) == through - self._consumed_through
+
+            items = self._take_pending(through)
+            errors = await self._fold_blocks(items) if covered else []
+            if not covered or errors:
+                if errors:
+                    logger.warning(
+                        f"[CONV] {len(errors)} rolling summary block(s) failed, "
+                        f"re-summarizing all {len(transcripts)} transcripts"
+                    )
+                else:
+                    logger.info("[CONV] Rolling summary is missing transcripts, summarizing them in full")
+                self.full_fallbacks += 1
+                self._rolling_summary = ""
+                self._blocks_folded = 0
+                errors = await self._fold_blocks(
+                    [(index, text.strip()) for index, text in enumerate(transcripts) if text.strip()]
+                )
+
+            summary = self._rolling_summary
+            self._rolling_summary = ""
+            self._blocks_folded = 0
+            self._consumed_through = self._folded_through = through
+            self._fed_seqs = [seq for seq in self._fed_seqs if seq > through]
+
+        self.last_finalize_seconds = time.time() - start_time
+        if not summary:
+            return None, errors[-1] if errors else "No summary generated", False
+        if errors:
+            self.partial_summaries += 1
+            logger.warning(f"[CONV] Summary is partial, {len(errors)} block(s) could not be summarized")
+        return summary, None, bool(errors)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending_transcripts": len(self._pending),
+            "summarized_through": self._consumed_through,
+            "pending_chars": self._pending_chars,
+            "blocks_folded": self._blocks_folded,
+            "rolling_summary_chars": len(self._rolling_summary),
+            "map_calls": self.map_calls,
+            "merge_calls": self.merge_calls,
+            "failures": self.failures,
+            "full_fallbacks": self.full_fallbacks,
+            "partial_summaries": self.partial_summaries,
+            "last_finalize_seconds": round(self.last_finalize_seconds, 2),
+        }
+
+
+
+conversation_summarizer = IncrementalSummarizer()
@@ -0,0 +1,145 @@
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+#------This Class handles the durable, bounded queue of events waiting for the backend----------
+class EventOutbox:
+
+    def __init__(self, path: Optional[str] = None, max_events: Optional[int] = None):
+        self.path = path or settings.outbox_path
+        self.max_events = max(1, max_events or settings.outbox_max_events)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EventOutbox")
+        self._db = self._open_db()
+        self._backlog = 0
+        self._oldest_created_at: Optional[float] = None
+        self._refresh_summary()
+        self._counters = {
+            "enqueued": 0,
+            "acked": 0,
+            "dropped_overflow": 0,
+        }
+
+    def _open_db(self) -> sqlite3.Connection:
+        try:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            logger.info(f"[OUTBOX] Persisting pending events to {self.path}")
+        except sqlite3.Error as e:
+            logger.warning(f"[OUTBOX] Cannot open {self.path} ({e}), events will only survive in memory")
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+            self.path = ":memory:"
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "idempotency_key TEXT UNIQUE, "
+            "event_type TEXT, "
+            "data TEXT, "
+            "created_at REAL, "
+            "attempts INTEGER DEFAULT 0)"
+        )
+        db.commit()
+        return db
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _refresh_summary(self):
+        self._backlog, self._oldest_created_at = self._db.execute(
+            "SELECT COUNT(*), MIN(created_at) FROM outbox"
+        ).fetchone()
+
+    def append(self, event_type: str, data: Dict[str, Any]) -> str:
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO outbox (idempotency_key, event_type, data, created_at) VALUES (?, ?, ?, ?)",
+                (key, event_type, json.dumps(data, default=str), time.time()),
+            )
+            overflow = self._count() - self.max_events
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM outbox WHERE id IN (SELECT id FROM outbox ORDER BY id LIMIT ?)",
+                    (overflow,),
+                )
+                self._counters["dropped_overflow"] += overflow
+                logger.warning(f"[OUTBOX] Backlog full, dropped {overflow} oldest event(s)")
+            self._db.commit()
+            self._refresh_summary()
+            self._counters["enqueued"] += 1
+        return key
+
+    def peek(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, idempotency_key, event_type, data, created_at, attempts "
+                "FROM outbox ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "idempotency_key": row[1],
+                "event_type": row[2],
+                "data": json.loads(row[3]),
+                "created_at": row[4],
+                "attempts": row[5],
+            }
+            for row in rows
+        ]
+
+    def ack(self, ids: List[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(event_id,) for event_id in ids])
+            self._db.commit()
+            self._refresh_summary()
+            self._counters["acked"] += len(ids)
+
+    def mark_attempted(self, ids: List[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET attempts = attempts + 1 WHERE id = ?",
+                [(event_id,) for event_id in ids],
+            )
+            self._db.commit()
+
+    def _count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def backlog(self) -> int:
+        return self._backlog
+
+    def oldest_age_seconds(self) -> Optional[float]:
+        if self._oldest_created_at is None:
+            return None
+        return round(time.time() - self._oldest_created_at, 1)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> dict:
+        return {
+            "path": self.path,
+            "backlog": self.backlog(),
+            "max_events": self.max_events,
+            "oldest_age_seconds": self.oldest_age_seconds(),
+            **self._counters,
+        }
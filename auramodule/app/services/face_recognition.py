@@ -1,37 +1,59 @@
 
+import importlib.util
 import logging
+import threading
 import numpy as np
 from typing import List, Dict, Optional, Any
 import httpx
 from app.core.config import settings
-import cv2
+from app.services.fast_extractor import fast_extractor
+from app.services.metrics import metrics
 import time
 
 logger = logging.getLogger(__name__)
 
-try:
-    from insightface.app import FaceAnalysis
-    INSIGHTFACE_AVAILABLE = True
-    _INSIGHTFACE_IMPORT_ERROR: Optional[str] = None
-except ImportError as e:
-    FaceAnalysis = Any  # type: ignore[assignment]
-    INSIGHTFACE_AVAILABLE = False
-    _INSIGHTFACE_IMPORT_ERROR = str(e)
+FACE_STAGE_SECONDS = metrics.histogram(
+    "aura_face_stage_seconds",
+    "Face recognition stage latency (detect_embed runs InsightFace detection and embedding together)",
+    ["stage"],
+)
+FACE_DETECT_SECONDS = FACE_STAGE_SECONDS.labels("detect_embed")
+FACE_FETCH_SECONDS = FACE_STAGE_SECONDS.labels("fetch_relatives")
+FACE_MATCH_SECONDS = FACE_STAGE_SECONDS.labels("match")
+FACE_TOTAL_SECONDS = FACE_STAGE_SECONDS.labels("total")
+FACES_DETECTED = metrics.counter("aura_faces_detected_total", "Faces found by the detector")
+
+INSIGHTFACE_AVAILABLE = importlib.util.find_spec("insightface") is not None
+_INSIGHTFACE_IMPORT_ERROR: Optional[str] = None
+if not INSIGHTFACE_AVAILABLE:
     logger.warning(
         "[FACE-REC] insightface unavailable - face recognition is disabled "
         "(install requirements.optional.txt to enable)"
     )
 
-_face_app: Optional[FaceAnalysis] = None
+_face_app: Optional[Any] = None
+_face_app_lock = threading.Lock()
 
 #------This Function initializes and returns the Face Analysis App----------
-def get_face_app() -> FaceAnalysis:
-    global _face_app
+def get_face_app() -> Any:
+    global _face_app, INSIGHTFACE_AVAILABLE, _INSIGHTFACE_IMPORT_ERROR
+    if _face_app is not None:
+        return _face_app
     if not INSIGHTFACE_AVAILABLE:
         reason = _INSIGHTFACE_IMPORT_ERROR or "insightface package not installed"
         raise RuntimeError(f"InsightFace unavailable: {reason}")
 
-    if _face_app is None:
+    with _face_app_lock:
+        if _face_app is not None:
+            return _face_app
+
+        try:
+            from insightface.app import FaceAnalysis
+        except ImportError as e:
+            INSIGHTFACE_AVAILABLE = False
+            _INSIGHTFACE_IMPORT_ERROR = str(e)
+            raise RuntimeError(f"InsightFace unavailable: {e}")
+
         logger.info("=" * 60)
         logger.info("[FACE-REC] Initializing InsightFace buffalo_l model...")
         logger.info("[FACE-REC] Note: First run will download ~400MB of model files")
@@ -90,6 +112,8 @@ def validate_image(frame: np.ndarray) -> tuple[bool, Optional[str]]:
 
 
 def detect_and_crop_faces(frame: np.ndarray) -> List[Dict]:
+    import cv2
+
     if not INSIGHTFACE_AVAILABLE:
         logger.warning("[FACE-REC] Face detection skipped - insightface unavailable")
         return []
@@ -109,6 +133,8 @@ def detect_and_crop_faces(frame: np.ndarray) -> List[Dict]:
         return []
     
     detect_time = time.time() - start_time
+    FACE_DETECT_SECONDS.observe(detect_time)
+    FACES_DETECTED.inc(len(faces))
     logger.debug(f"[FACE-REC] Detected {len(faces)} face(s) in {detect_time * 1000:.1f}ms")
 
     cropped_faces = []
@@ -235,6 +261,7 @@ async def identify_person(
     api_start = time.time()
     relatives_data, api_error = await fetch_relatives(patient_uid, auth_token)
     api_time = time.time() - api_start
+    FACE_FETCH_SECONDS.observe(api_time)
     
     if api_error:
         logger.warning(f"[FACE-REC] API error: {api_error}")
@@ -253,6 +280,7 @@ async def identify_person(
     logger.debug(
         f"[FACE-REC] Fetched {len(relatives_data)} relatives in {api_time * 1000:.1f}ms"
     )
+    fast_extractor.remember_people(relatives_data)
 
     if not relatives_data:
         
@@ -330,6 +358,7 @@ async def identify_person(
         ]
     
     compare_time = time.time() - compare_start
+    FACE_MATCH_SECONDS.observe(compare_time)
     logger.debug(f"[FACE-REC] Vectorized comparison done in {compare_time * 1000:.1f}ms")
 
     
@@ -394,6 +423,7 @@ async def identify_person(
             )
 
     total_time = time.time() - total_start
+    FACE_TOTAL_SECONDS.observe(total_time)
     logger.info(
         f"[FACE-REC] Recognition complete: {len(results)} face(s) processed in {total_time * 1000:.1f}ms"
     )
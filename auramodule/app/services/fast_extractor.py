@@ -0,0 +1,225 @@
+
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from app.services.analysis_cache import normalise_transcript
+
+logger = logging.getLogger(__name__)
+
+
+TIER_NOOP = "noop"
+TIER_SIMPLE = "simple"
+TIER_LLM = "llm"
+
+SIMPLE_MAX_WORDS = 25
+
+QUESTION_MAX_WORDS = 6
+
+NOOP_WORDS = {
+    "yes", "yeah", "yep", "yup", "no", "nope", "nah", "ok", "okay", "sure", "right",
+    "alright", "fine", "good", "great", "nice", "cool", "thanks", "thank", "you",
+    "hello", "hi", "hey", "bye", "goodbye", "goodnight", "morning", "night",
+    "see", "i", "m", "am", "got", "it", "that", "s", "sounds", "all", "mhm", "uh", "huh", "well",
+    "so", "and", "too", "very", "much", "lovely", "please", "sorry",
+}
+
+QUESTION_WORDS = ("what", "who", "where", "when", "why", "how", "is", "are", "do", "did", "can")
+
+MEDICATION_CUE = re.compile(
+    r"\b(pills?|tablets?|medicines?|medications?|meds|doses?|capsules?|insulin|inhalers?|"
+    r"drops|injections?|prescriptions?)\b"
+)
+
+KNOWN_MEDICATIONS = (
+    "donepezil", "aricept", "memantine", "namenda", "rivastigmine", "galantamine",
+    "metformin", "insulin", "lisinopril", "amlodipine", "atorvastatin", "simvastatin",
+    "levothyroxine", "aspirin", "warfarin", "metoprolol", "omeprazole", "paracetamol",
+    "ibuprofen", "vitamin d", "calcium",
+)
+
+MEDICATION_NAMES = re.compile(r"\b(" + "|".join(re.escape(name) for name in KNOWN_MEDICATIONS) + r")\b")
+
+WEEKDAYS = r"(monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+
+TIME_EXPRESSION = re.compile(
+    r"\b("
+    r"(?:at|by|around) \d{1,2}(?::\d{2}| \d{2})?(?: ?[ap] ?m)?(?: (?:tomorrow|today|tonight))?"
+    r"|\d{1,2}(?::\d{2}| \d{2})? ?[ap] ?m"
+    r"|(?:tomorrow|today|tonight)(?: (?:morning|afternoon|evening|night))?"
+    r"|this (?:morning|afternoon|evening)"
+    r"|(?:next|this|on) " + WEEKDAYS +
+    r"|next (?:week|month)"
+    r"|in (?:a|an|\d+) (?:minutes?|hours?|days?|weeks?)"
+    r"|after (?:breakfast|lunch|dinner)|before (?:breakfast|lunch|dinner|bed)"
+    r")\b"
+)
+
+REMINDER_CUE = re.compile(r"\b(remind me|don t forget|do not forget|remember to|need to|have to|must)\b")
+
+EVENT_CUE = re.compile(
+    r"\b(appointment|doctor|dentist|clinic|hospital|checkup|visit|visiting|coming over|"
+    r"coming to see|meeting|lunch with|dinner with|birthday|party)\b"
+)
+
+NOT_ACTIONABLE_CUE = re.compile(
+    r"\b(took|taken|already|had|did|didn t|done|don t|doesn t|won t|can t|stop|stopped|"
+    r"quit|refuse|refused|no more|enough|instead of)\b"
+)
+
+PERSON_PLACE_CUE = re.compile(
+    r"\b(who|whom|whose|where|wife|husband|mother|mom|mum|father|dad|son|daughter|brother|"
+    r"sister|family|children|kids|grandson|granddaughter|friend|home|house|room|here|there)\b"
+)
+
+SENTENCE_BREAK = re.compile(r"(?<!\bDr)(?<!\bMr)(?<!\bMrs)(?<!\bMs)(?<!\bSt)[.!?]\s+[A-Z]")
+
+ESCALATION_CUE = re.compile(
+    r"\b(not|never|cancel|cancelled|moved|instead|but|unless|maybe|if|because|"
+    r"fell|fall|hurt|pain|dizzy|lost|scared|help|emergency)\b"
+)
+
+
+#------This Function finds time phrases, merging adjacent ones like "tomorrow at 3pm"----------
+def find_time_phrases(normalised: str) -> List[str]:
+    phrases: List[List[int]] = []
+    for match in TIME_EXPRESSION.finditer(normalised):
+        if phrases and match.start() - phrases[-1][1] <= 1:
+            phrases[-1][1] = match.end()
+        else:
+            phrases.append([match.start(), match.end()])
+    return [_tidy_time(normalised[start:end]) for start, end in phrases]
+
+
+#------This Function restores clock notation lost in normalisation, e.g. "3 30 p m" -> "3:30 pm"----------
+def _tidy_time(phrase: str) -> str:
+    phrase = re.sub(r"\b([ap]) m\b", r"\1m", phrase)
+    return re.sub(r"\b(\d{1,2}) (\d{2})\b", r"\1:\2", phrase)
+
+
+#------This Class handles deterministic extraction before escalating to the LLM----------
+class FastExtractor:
+
+    def __init__(self):
+        self._people: Dict[str, Dict[str, str]] = {}
+        self._people_pattern: Optional[re.Pattern] = None
+        self._lock = threading.Lock()
+        self._counters = {TIER_NOOP: 0, TIER_SIMPLE: 0, TIER_LLM: 0}
+
+    def remember_people(self, relatives: Iterable[Dict[str, Any]]):
+        people = {}
+        for relative in relatives:
+            name = (relative.get("name") or "").strip()
+            key = normalise_transcript(name)
+            if key:
+                people[key] = {
+                    "name": name,
+                    "relationship": relative.get("relationship", "") or "",
+                }
+        if not people:
+            return
+        with self._lock:
+            self._people = people
+            self._people_pattern = re.compile(
+                r"\b(" + "|".join(re.escape(key) for key in sorted(people, key=len, reverse=True)) + r")\b"
+            )
+        logger.debug(f"[FAST] Gallery updated with {len(people)} names")
+
+    def find_people(self, normalised: str) -> List[Dict[str, str]]:
+        with self._lock:
+            pattern, people = self._people_pattern, self._people
+        if pattern is None:
+            return []
+        found = []
+        for match in pattern.findall(normalised):
+            person = people[match]
+            if person not in found:
+                found.append(person)
+        return found
+
+    def classify(self, transcript: str) -> tuple[str, Optional[Dict[str, Any]]]:
+        normalised = normalise_transcript(transcript)
+        words = normalised.split()
+
+        if not words or all(word in NOOP_WORDS for word in words):
+            return self._count(TIER_NOOP), self._result("")
+
+        medications = sorted(set(MEDICATION_NAMES.findall(normalised)))
+        has_medication = bool(medications or MEDICATION_CUE.search(normalised))
+        times = find_time_phrases(normalised)
+        people = self.find_people(normalised)
+        is_reminder = bool(REMINDER_CUE.search(normalised))
+        is_event = bool(EVENT_CUE.search(normalised))
+
+        if (
+            transcript.strip().endswith("?")
+            and len(words) <= QUESTION_MAX_WORDS
+            and words[0] in QUESTION_WORDS
+            and not (has_medication or times or people or is_reminder or is_event)
+            and not PERSON_PLACE_CUE.search(normalised)
+        ):
+            return self._count(TIER_NOOP), self._result("")
+
+        if (
+            len(words) > SIMPLE_MAX_WORDS
+            or len(times) != 1
+            or ESCALATION_CUE.search(normalised)
+            or NOT_ACTIONABLE_CUE.search(REMINDER_CUE.sub(" ", normalised))
+            or "?" in transcript
+            or SENTENCE_BREAK.search(transcript.strip())
+        ):
+            return self._count(TIER_LLM), None
+
+        when = times[0]
+        person = people[0]["name"] if people else None
+        result = self._result(transcript.strip()[:200])
+
+        if has_medication:
+            label = ", ".join(medications) if medications else "medication"
+            result["reminders"].append({"description": f"Take {label}", "datetime": when})
+        elif is_reminder:
+            result["reminders"].append({"description": transcript.strip(), "datetime": when})
+        elif is_event:
+            result["events"].append({
+                "description": transcript.strip(),
+                "datetime": when,
+                "person": person,
+                "type": "appointment",
+            })
+        else:
+            return self._count(TIER_LLM), None
+
+        for found in people:
+            result["key_info"].append({
+                "fact": f"{found['name']} ({found['relationship'] or 'known person'}) was mentioned",
+                "person": found["name"],
+            })
+        return self._count(TIER_SIMPLE), result
+
+    def _result(self, summary: str) -> Dict[str, Any]:
+        return {
+            "events": [],
+            "key_info": [],
+            "reminders": [],
+            "mood": "neutral",
+            "summary": summary,
+        }
+
+    def _count(self, tier: str) -> str:
+        self._counters[tier] += 1
+        return tier
+
+    def get_stats(self) -> dict:
+        total = sum(self._counters.values())
+        avoided = self._counters[TIER_NOOP] + self._counters[TIER_SIMPLE]
+        return {
+            "classified": total,
+            **self._counters,
+            "llm_calls_avoided": avoided,
+            "avoided_rate": round(avoided / total, 3) if total else 0.0,
+            "gallery_names": len(self._people),
+        }
+
+
+
+fast_extractor = FastExtractor()
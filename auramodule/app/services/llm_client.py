@@ -0,0 +1,286 @@
+
+import asyncio
+import inspect
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+import httpx
+from app.core.config import settings
+from app.services.metrics import metrics
+from app.services.stt_executor import summarise_latency
+
+logger = logging.getLogger(__name__)
+
+
+OLLAMA_TIMEOUT = 120.0
+
+WARM_UP_TIMEOUT = 300.0
+
+LATENCY_WINDOW = 100
+
+COLD_LOAD_SECONDS = 1.0
+
+RETRY_BACKOFF_SECONDS = 0.5
+
+LLM_REQUESTS = metrics.counter("aura_llm_requests_total", "Ollama chat requests by outcome", ["outcome"])
+
+LLM_SECONDS = metrics.histogram("aura_llm_request_seconds", "Ollama chat latency, request to last token")
+
+LLM_FIRST_TOKEN_SECONDS = metrics.histogram("aura_llm_first_token_seconds", "Ollama time to first token")
+
+TokenCallback = Callable[[str], Union[None, Awaitable[None]]]
+
+
+#------This Function parses a truncated JSON document by closing whatever is still open----------
+def parse_partial_json(text: str) -> Optional[Dict[str, Any]]:
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if not stack:
+        candidate = text
+    else:
+        candidate = text.rstrip()
+        if in_string:
+            candidate = candidate[:-1] if escaped else candidate
+            candidate += '"'
+        candidate = candidate.rstrip()
+        if candidate.endswith(","):
+            candidate = candidate[:-1]
+        elif candidate.endswith(":"):
+            candidate += " null"
+        candidate += "".join(reversed(stack))
+
+    try:
+        parsed = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+#------This Class handles the shared, pooled connection to Ollama----------
+class OllamaClient:
+
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._latency_seconds: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._first_token_seconds: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._tokens_per_second: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "cold_loads": 0,
+        }
+        self.warm = False
+        self.warm_up_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=settings.ollama_url,
+                timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=5.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=4,
+                    max_connections=8,
+                    keepalive_expiry=300.0,
+                ),
+            )
+        return self._http_client
+
+    async def close(self):
+        if self._http_client and not self._http_client.is_closed:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def warm_up(self) -> bool:
+        started_at = time.perf_counter()
+        try:
+            client = await self._get_client()
+            resp = await client.post(
+                "/api/generate",
+                json={"model": settings.ollama_model, "keep_alive": settings.ollama_keep_alive},
+                timeout=WARM_UP_TIMEOUT,
+            )
+        except httpx.HTTPError as e:
+            self.last_error = f"Warm-up failed: {type(e).__name__}: {e}"
+            logger.warning(f"[LLM] {self.last_error}")
+            return False
+
+        if resp.status_code != 200:
+            self.last_error = f"Warm-up returned status {resp.status_code}"
+            logger.warning(f"[LLM] {self.last_error}")
+            return False
+
+        self.warm = True
+        self.warm_up_seconds = time.perf_counter() - started_at
+        logger.info(
+            f"[LLM] {settings.ollama_model} loaded in {self.warm_up_seconds:.1f}s "
+            f"(keep_alive={settings.ollama_keep_alive})"
+        )
+        return True
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Optional[str] = None,
+        timeout: float = OLLAMA_TIMEOUT,
+        max_retries: int = 2,
+        on_token: Optional[TokenCallback] = None,
+    ) -> tuple[Optional[Dict], Optional[str]]:
+        payload = {
+            "model": settings.ollama_model,
+            "messages": messages,
+            "stream": on_token is not None,
+            "keep_alive": settings.ollama_keep_alive,
+            "options": options or {},
+        }
+        if response_format:
+            payload["format"] = response_format
+
+        streamed = False
+
+        async def forward(token: str):
+            nonlocal streamed
+            streamed = True
+            result = on_token(token)
+            if inspect.isawaitable(result):
+                await result
+
+        self._counters["calls"] += 1
+        for attempt in range(max_retries + 1):
+            try:
+                data, error = await self._stream_chat(payload, timeout, forward if on_token else None)
+
+            except httpx.ConnectError:
+                error = f"Cannot connect to Ollama at {settings.ollama_url}"
+                if attempt < max_retries and not streamed:
+                    await self._back_off(error, attempt)
+                    continue
+                data = None
+
+            except httpx.TimeoutException:
+                error = f"Ollama request timed out after {timeout}s"
+                if attempt < max_retries and not streamed:
+                    await self._back_off(error, attempt)
+                    continue
+                data = None
+
+            except json.JSONDecodeError as e:
+                data, error = None, f"Invalid JSON from Ollama: {e}"
+
+            except Exception as e:
+                data, error = None, f"Ollama error: {type(e).__name__}: {e}"
+
+            if error:
+                self._counters["errors"] += 1
+                self.last_error = error
+            LLM_REQUESTS.labels("error" if error else "ok").inc()
+            return data, error
+
+        return None, "Max retries exceeded"
+
+    async def _back_off(self, error: str, attempt: int):
+        delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+        self._counters["retries"] += 1
+        logger.warning(f"[LLM] {error}, retrying in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+    async def _stream_chat(
+        self,
+        payload: Dict[str, Any],
+        timeout: float,
+        on_token: Optional[Callable[[str], Awaitable[None]]],
+    ) -> tuple[Optional[Dict], Optional[str]]:
+        client = await self._get_client()
+        started_at = time.perf_counter()
+        first_token_at: Optional[float] = None
+        parts: List[str] = []
+        final: Dict[str, Any] = {}
+
+        async with client.stream("POST", "/api/chat", json=payload, timeout=timeout) as resp:
+            if resp.status_code == 404:
+                return None, f"Model '{settings.ollama_model}' not found in Ollama"
+            if resp.status_code != 200:
+                return None, f"Ollama returned status {resp.status_code}"
+
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    return None, f"Ollama error: {chunk['error']}"
+
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(token)
+                    if on_token:
+                        await on_token(token)
+
+                if chunk.get("done"):
+                    final = chunk
+                    break
+
+        self._record(started_at, first_token_at, final)
+        final["message"] = {"role": "assistant", "content": "".join(parts)}
+        return final, None
+
+    def _record(self, started_at: float, first_token_at: Optional[float], final: Dict[str, Any]):
+        self._latency_seconds.append(time.perf_counter() - started_at)
+        LLM_SECONDS.observe(time.perf_counter() - started_at)
+        if first_token_at is not None:
+            self._first_token_seconds.append(first_token_at - started_at)
+            LLM_FIRST_TOKEN_SECONDS.observe(first_token_at - started_at)
+
+        eval_count = final.get("eval_count") or 0
+        eval_duration = final.get("eval_duration") or 0
+        if eval_count and eval_duration:
+            self._tokens_per_second.append(eval_count / (eval_duration / 1e9))
+
+        load_seconds = (final.get("load_duration") or 0) / 1e9
+        if load_seconds > COLD_LOAD_SECONDS:
+            self._counters["cold_loads"] += 1
+            logger.info(f"[LLM] {settings.ollama_model} was cold, load took {load_seconds:.1f}s")
+        self.warm = True
+
+    def get_stats(self) -> dict:
+        tokens_per_second = list(self._tokens_per_second)
+        return {
+            "model": settings.ollama_model,
+            "url": settings.ollama_url,
+            "keep_alive": settings.ollama_keep_alive,
+            "warm": self.warm,
+            "warm_up_seconds": round(self.warm_up_seconds, 2) if self.warm_up_seconds else None,
+            **self._counters,
+            "latency_ms": summarise_latency(self._latency_seconds),
+            "first_token_ms": summarise_latency(self._first_token_seconds),
+            "tokens_per_second": (
+                round(sum(tokens_per_second) / len(tokens_per_second), 1)
+                if tokens_per_second else None
+            ),
+            "last_error": self.last_error,
+        }
+
+
+
+ollama_client = OllamaClient()
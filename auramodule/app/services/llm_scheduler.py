@@ -0,0 +1,271 @@
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+from app.core.config import settings
+from app.services.metrics import metrics
+from app.services.stt_executor import summarise_latency
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_EXTRACTION = 1
+PRIORITY_SUMMARY = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_EXTRACTION: "extraction",
+    PRIORITY_SUMMARY: "summary",
+}
+
+LATENCY_WINDOW = 200
+
+LLM_QUEUE_DEPTH = metrics.gauge("aura_llm_queue_depth", "LLM jobs waiting for a slot", ["priority"])
+
+LLM_QUEUE_WAIT_SECONDS = metrics.histogram("aura_llm_queue_wait_seconds", "Time LLM jobs wait for a slot", ["priority"])
+
+
+#------This Class handles one queued LLM job----------
+class LlmJob:
+
+    def __init__(
+        self,
+        priority: int,
+        sequence: int,
+        fn: Callable[..., Awaitable[Any]],
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        coalesce_key: Optional[str] = None,
+        item: Any = None,
+        size: int = 0,
+    ):
+        self.priority = priority
+        self.sequence = sequence
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.coalesce_key = coalesce_key
+        self.item = item
+        self.size = size
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.perf_counter()
+        self.abandoned = False
+        self.task: Optional[asyncio.Task] = None
+        self.batch: List["LlmJob"] = [self]
+
+    def __lt__(self, other: "LlmJob") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+#------This Class handles prioritised, coalescing access to the local LLM----------
+class LlmScheduler:
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        max_batch_chars: Optional[int] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency or settings.llm_max_concurrency)
+        self.max_batch = max(1, max_batch or settings.llm_coalesce_max)
+        self.max_batch_chars = max_batch_chars or settings.llm_coalesce_max_chars
+        self._pending: List[LlmJob] = []
+        self._running: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "abandoned": 0,
+            "batches": 0,
+            "coalesced": 0,
+        }
+        self._wait_seconds: Dict[int, Deque[float]] = {
+            priority: deque(maxlen=LATENCY_WINDOW) for priority in PRIORITY_NAMES
+        }
+        self._run_seconds: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._wait_histograms = {
+            priority: LLM_QUEUE_WAIT_SECONDS.labels(name) for priority, name in PRIORITY_NAMES.items()
+        }
+        for name in PRIORITY_NAMES.values():
+            LLM_QUEUE_DEPTH.labels(name).set_function(lambda name=name: self.queue_depth()[name])
+
+    async def submit(self, priority: int, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        home = self._home_loop()
+        if home is not None:
+            return await self._hand_over(home, self.submit(priority, fn, *args, **kwargs))
+        return await self._enqueue(
+            LlmJob(priority, next(self._sequence), fn, args, kwargs)
+        )
+
+    async def submit_coalescing(
+        self,
+        priority: int,
+        key: str,
+        batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        item: Any,
+        size: int,
+    ) -> Any:
+        home = self._home_loop()
+        if home is not None:
+            return await self._hand_over(home, self.submit_coalescing(priority, key, batch_fn, item, size))
+        return await self._enqueue(
+            LlmJob(priority, next(self._sequence), batch_fn, coalesce_key=key, item=item, size=size)
+        )
+
+    def _home_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        loop = asyncio.get_running_loop()
+        home = self._loop
+        if home is None or home is loop or home.is_closed() or not home.is_running():
+            return None
+        return home
+
+    async def _hand_over(self, home: asyncio.AbstractEventLoop, coro: Awaitable[Any]) -> Any:
+        logger.debug("[LLM-SCHED] Handing job from a foreign event loop to the scheduler loop")
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, home))
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._dispatcher is None or self._dispatcher.done():
+            if self._loop is not None and self._loop is not loop and self._pending:
+                logger.warning(
+                    f"[LLM-SCHED] Scheduler loop stopped, dropping {len(self._pending)} queued jobs"
+                )
+            self._loop = loop
+            self._pending = []
+            self._running = set()
+            self._wake = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _enqueue(self, job: LlmJob) -> Any:
+        self._ensure_dispatcher()
+        heapq.heappush(self._pending, job)
+        self._counters["submitted"] += 1
+        self._wake.set()
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            self._abandon(job)
+            raise
+
+    def _abandon(self, job: LlmJob):
+        if job.future.done():
+            return
+        job.abandoned = True
+        job.future.cancel()
+        self._counters["abandoned"] += 1
+        if job.task and all(member.abandoned for member in job.batch):
+            job.task.cancel()
+            logger.debug(f"[LLM-SCHED] Cancelled running {PRIORITY_NAMES[job.priority]} job, requester left")
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._pending and len(self._running) < self.max_concurrency:
+                job = heapq.heappop(self._pending)
+                if job.abandoned:
+                    continue
+
+                batch = [job]
+                if job.coalesce_key:
+                    batch.extend(self._take_companions(job))
+                task = asyncio.create_task(self._run(batch))
+                for member in batch:
+                    member.task = task
+                    member.batch = batch
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+
+    def _take_companions(self, job: LlmJob) -> List[LlmJob]:
+        companions: List[LlmJob] = []
+        budget = self.max_batch_chars - job.size
+        for candidate in sorted(self._pending):
+            if len(companions) + 1 >= self.max_batch:
+                break
+            if (
+                candidate.abandoned
+                or candidate.coalesce_key != job.coalesce_key
+                or candidate.priority != job.priority
+                or candidate.size > budget
+            ):
+                continue
+            companions.append(candidate)
+            budget -= candidate.size
+
+        if companions:
+            self._pending = [pending for pending in self._pending if pending not in companions]
+            heapq.heapify(self._pending)
+        return companions
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if self._wake:
+            self._wake.set()
+
+    async def _run(self, batch: List[LlmJob]):
+        started_at = time.perf_counter()
+        for member in batch:
+            self._wait_seconds[member.priority].append(started_at - member.enqueued_at)
+            self._wait_histograms[member.priority].observe(started_at - member.enqueued_at)
+
+        head = batch[0]
+        try:
+            if head.coalesce_key:
+                results = await head.fn([member.item for member in batch])
+                if len(batch) > 1:
+                    self._counters["batches"] += 1
+                    self._counters["coalesced"] += len(batch)
+            else:
+                results = [await head.fn(*head.args, **head.kwargs)]
+        except asyncio.CancelledError:
+            for member in batch:
+                if not member.future.done():
+                    member.future.cancel()
+            raise
+        except Exception as e:
+            self._counters["failed"] += len(batch)
+            logger.warning(f"[LLM-SCHED] {PRIORITY_NAMES[head.priority]} job failed: {e}")
+            for member in batch:
+                if not member.future.done():
+                    member.future.set_exception(e)
+            return
+        finally:
+            self._run_seconds.append(time.perf_counter() - started_at)
+
+        for member, result in zip(batch, results):
+            if not member.future.done():
+                member.future.set_result(result)
+        self._counters["completed"] += len(batch)
+
+    def queue_depth(self) -> dict:
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for job in self._pending:
+            if not job.abandoned:
+                depth[PRIORITY_NAMES[job.priority]] += 1
+        return depth
+
+    def get_stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": len(self._running),
+            "queue_depth": self.queue_depth(),
+            **self._counters,
+            "wait_ms": {
+                PRIORITY_NAMES[priority]: summarise_latency(samples)
+                for priority, samples in self._wait_seconds.items()
+            },
+            "run_ms": summarise_latency(self._run_seconds),
+        }
+
+
+
+llm_scheduler = LlmScheduler()
@@ -0,0 +1,315 @@
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from app.core.config import settings
+from app.services.metrics import metrics
+from app.services.stt_executor import summarise_latency
+
+logger = logging.getLogger(__name__)
+
+
+LAG_WINDOW = 1200
+
+STALL_HISTORY = 20
+
+STACK_DEPTH = 25
+
+BUSY_THREADS_PER_STALL = 3
+
+THREAD_SAMPLE_SECONDS = 5.0
+
+PROC_TASK_DIR = "/proc/self/task"
+
+THREAD_CPU_AVAILABLE = os.path.isdir(PROC_TASK_DIR)
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+THREAD_ROLES = {
+    "MainThread": "event_loop",
+    "CameraCapture": "camera",
+    "MicrophoneCapture": "mic",
+    "ContinuousMicrophone": "mic",
+    "AudioCapture": "mic",
+    "SpeechExecutor": "transcription",
+    "WhisperLadder": "transcription",
+    "DiscoveryService": "discovery",
+    "LoopWatchdog": "watchdog",
+}
+
+LOOP_LAG_SECONDS = metrics.histogram("aura_event_loop_lag_seconds", "Delay between a scheduled loop wake-up and when it ran")
+
+LOOP_STALLS = metrics.counter("aura_event_loop_stalls_total", "Times the event loop was blocked past the stall threshold")
+
+THREAD_CPU_PERCENT = metrics.gauge("aura_thread_cpu_percent", "CPU used by each thread over the last sample window", ["thread"])
+
+
+#------This Function maps a thread name to the component it belongs to----------
+def thread_role(name: str) -> str:
+    role = THREAD_ROLES.get(name)
+    if role:
+        return role
+    if name.startswith("asyncio_") or name.startswith("ThreadPoolExecutor"):
+        return "executor"
+    return "other"
+
+
+#------This Function reads the user+system CPU seconds of one thread from /proc----------
+def _thread_cpu_seconds(native_id: int) -> Optional[float]:
+    try:
+        with open(f"{PROC_TASK_DIR}/{native_id}/stat", "rb") as stat_file:
+            data = stat_file.read()
+    except OSError:
+        return None
+    fields = data.rpartition(b")")[2].split()
+    try:
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (IndexError, ValueError):
+        return None
+
+
+#------This Function formats a frame's call stack, innermost call last----------
+def _format_stack(frame: Any) -> List[str]:
+    if frame is None:
+        return []
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=STACK_DEPTH)
+    ]
+
+
+#------This Class handles event-loop lag measurement, stall stack capture and per-thread CPU----------
+class LoopWatchdog:
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        stall_threshold: Optional[float] = None,
+        log_interval: Optional[float] = None,
+    ):
+        self.interval = interval or settings.watchdog_interval
+        self.stall_threshold = stall_threshold or settings.watchdog_stall_threshold
+        self.log_interval = log_interval if log_interval is not None else settings.watchdog_log_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._lag_seconds: Deque[float] = deque(maxlen=LAG_WINDOW)
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=STALL_HISTORY)
+        self._active_stall: Optional[Dict[str, Any]] = None
+        self._cpu_last: Dict[int, tuple] = {}
+        self._threads: List[Dict[str, Any]] = []
+        self._process_cpu_last = (sum(os.times()[:2]), time.monotonic())
+        self._process_cpu_percent: Optional[float] = None
+        self._stall_count = 0
+        self._max_lag = 0.0
+
+    def start(self):
+        if self._probe_task and not self._probe_task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop_event.clear()
+        self._probe_task = asyncio.create_task(self._probe())
+        self._thread = threading.Thread(target=self._watch, daemon=True, name="LoopWatchdog")
+        self._thread.start()
+        logger.info(
+            f"[WATCHDOG] Watching event loop (probe every {self.interval * 1000:.0f}ms, "
+            f"stall threshold {self.stall_threshold * 1000:.0f}ms, "
+            f"thread CPU {'on' if THREAD_CPU_AVAILABLE else 'unavailable'})"
+        )
+
+    async def stop(self):
+        self._stop_event.set()
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.interval * 4)
+        self._probe_task = None
+        self._thread = None
+
+    async def _probe(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lag_seconds.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            with self._lock:
+                self._last_tick = now
+                stall, self._active_stall = self._active_stall, None
+            if stall is not None:
+                stall["blocked_ms"] = round(lag * 1000, 1)
+                where = stall["loop_stack"][-1] if stall["loop_stack"] else "unknown"
+                logger.warning(
+                    f"[WATCHDOG] Event loop blocked for {lag:.2f}s in {stall['task']} at {where}"
+                )
+
+    def _watch(self):
+        next_sample = time.monotonic()
+        next_log = time.monotonic() + self.log_interval if self.log_interval > 0 else None
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                blocked_for = now - self._last_tick - self.interval
+                stalled = blocked_for > self.stall_threshold and self._active_stall is None
+            if stalled:
+                self._capture_stall(blocked_for)
+                next_sample = now + THREAD_SAMPLE_SECONDS
+            elif now >= next_sample:
+                self._sample_threads()
+                next_sample = now + THREAD_SAMPLE_SECONDS
+            if next_log is not None and now >= next_log:
+                self._log_summary()
+                next_log = now + self.log_interval
+
+    def _current_task_name(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except Exception:
+            task = None
+        if task is None:
+            return "callback"
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', type(coro).__name__)})"
+
+    def _capture_stall(self, blocked_for: float):
+        frames = sys._current_frames()
+        task_name = self._current_task_name()
+        threads = self._sample_threads()
+        busy = sorted(
+            (row for row in threads if row["ident"] != self._loop_thread_id and row["cpu_percent"]),
+            key=lambda row: row["cpu_percent"],
+            reverse=True,
+        )[:BUSY_THREADS_PER_STALL]
+        stall = {
+            "detected_at": time.time(),
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "task": task_name,
+            "loop_stack": _format_stack(frames.get(self._loop_thread_id)),
+            "busy_threads": [
+                {
+                    "name": row["name"],
+                    "role": row["role"],
+                    "cpu_percent": row["cpu_percent"],
+                    "stack": _format_stack(frames.get(row["ident"])),
+                }
+                for row in busy
+            ],
+        }
+        with self._lock:
+            self._active_stall = stall
+            self._stall_count += 1
+        self._stalls.append(stall)
+        LOOP_STALLS.inc()
+
+    def _sample_threads(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        rows: List[Dict[str, Any]] = []
+        seen = set()
+        for thread in threading.enumerate():
+            native_id = getattr(thread, "native_id", None)
+            cpu_seconds = _thread_cpu_seconds(native_id) if THREAD_CPU_AVAILABLE and native_id else None
+            cpu_percent = None
+            if cpu_seconds is not None:
+                seen.add(native_id)
+                previous = self._cpu_last.get(native_id)
+                if previous and now > previous[1]:
+                    cpu_percent = round((cpu_seconds - previous[0]) / (now - previous[1]) * 100, 1)
+                self._cpu_last[native_id] = (cpu_seconds, now)
+                THREAD_CPU_PERCENT.labels(thread.name).set(cpu_percent or 0.0)
+            rows.append({
+                "name": thread.name,
+                "role": thread_role(thread.name),
+                "ident": thread.ident,
+                "native_id": native_id,
+                "daemon": thread.daemon,
+                "cpu_seconds": round(cpu_seconds, 2) if cpu_seconds is not None else None,
+                "cpu_percent": cpu_percent,
+            })
+        for native_id in list(self._cpu_last):
+            if native_id not in seen:
+                del self._cpu_last[native_id]
+
+        process_cpu = sum(os.times()[:2])
+        previous_cpu, previous_at = self._process_cpu_last
+        if now > previous_at:
+            self._process_cpu_percent = round((process_cpu - previous_cpu) / (now - previous_at) * 100, 1)
+        self._process_cpu_last = (process_cpu, now)
+        self._threads = rows
+        return rows
+
+    def _cpu_by_role(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for row in self._threads:
+            if row["cpu_percent"] is not None:
+                totals[row["role"]] = round(totals.get(row["role"], 0.0) + row["cpu_percent"], 1)
+        return totals
+
+    def _log_summary(self):
+        lag = summarise_latency(self._lag_seconds)
+        roles = ", ".join(
+            f"{role} {percent:.0f}%"
+            for role, percent in sorted(self._cpu_by_role().items(), key=lambda item: -item[1])
+        )
+        logger.info(
+            f"[WATCHDOG] Loop lag avg={lag['avg']}ms p95={lag['p95']}ms max={lag['max']}ms, "
+            f"{self._stall_count} stalls; process CPU {self._process_cpu_percent}%"
+            + (f"; {roles}" if roles else "")
+        )
+
+    def get_stats(self) -> dict:
+        last_stall = self._stalls[-1] if self._stalls else None
+        return {
+            "running": bool(self._probe_task and not self._probe_task.done()),
+            "interval_ms": round(self.interval * 1000, 1),
+            "stall_threshold_ms": round(self.stall_threshold * 1000, 1),
+            "lag_ms": summarise_latency(self._lag_seconds),
+            "max_lag_ms": round(self._max_lag * 1000, 1),
+            "stalls": self._stall_count,
+            "last_stall": {
+                "detected_at": last_stall["detected_at"],
+                "blocked_ms": last_stall["blocked_ms"],
+                "task": last_stall["task"],
+            } if last_stall else None,
+            "thread_cpu_available": THREAD_CPU_AVAILABLE,
+            "process_cpu_percent": self._process_cpu_percent,
+            "cpu_percent_by_role": self._cpu_by_role(),
+        }
+
+    def get_report(self, include_stacks: bool = False) -> dict:
+        report = {
+            **self.get_stats(),
+            "threads": [
+                {key: value for key, value in row.items() if key != "ident"}
+                for row in self._threads
+            ],
+            "recent_stalls": list(self._stalls),
+        }
+        if include_stacks:
+            frames = sys._current_frames()
+            report["stacks"] = {
+                f"{thread.name} ({thread.native_id})": _format_stack(frames.get(thread.ident))
+                for thread in threading.enumerate()
+            }
+        return report
+
+
+
+loop_watchdog = LoopWatchdog()
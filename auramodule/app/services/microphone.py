@@ -3,120 +3,69 @@ import asyncio
 import logging
 import numpy as np
 import threading
-import wave
-import io
 import time
-import queue
 from typing import Optional, Callable, List
 from app.core.config import settings
+from app.services.conversation import conversation_summarizer
+from app.services.audio_capture import audio_capture, AudioSubscription, PYAUDIO_AVAILABLE
+from app.services.streaming_transcriber import StreamingTranscriber
+from app.services.vad import UtteranceSegmenter, create_vad
+from app.services.whisper_registry import whisper_registry, FASTER_WHISPER_AVAILABLE
+from app.services.whisper_ladder import whisper_ladder
 
 logger = logging.getLogger(__name__)
 
 
-try:
-    import pyaudio
-    PYAUDIO_AVAILABLE = True
-except ImportError:
-    PYAUDIO_AVAILABLE = False
-    logger.warning("[MIC] PyAudio not available - microphone service will run in demo mode only")
-
-
-try:
-    from faster_whisper import WhisperModel
-    FASTER_WHISPER_AVAILABLE = True
-except ImportError:
-    FASTER_WHISPER_AVAILABLE = False
-    logger.warning("[MIC] faster-whisper not available - continuous transcription disabled")
-
-
 #------This Class handles the Microphone Service----------
 class MicrophoneService:
 
     
     RATE = 16000  
     CHANNELS = 1  
-    CHUNK = 1024  
-    FORMAT = None  
-    SILENCE_THRESHOLD = 500  
-    SILENCE_DURATION = 2.0  
     MAX_BUFFER_SIZE = 100  
 
     def __init__(self):
-        self._audio = None
-        self._stream = None
+        self._subscription: Optional[AudioSubscription] = None
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._buffer: List[bytes] = []
+        self._buffer: List[np.ndarray] = []
         self._lock = threading.Lock()
-        self._on_chunk: Optional[Callable[[bytes], None]] = None
-        self._error_count = 0
-        self._max_consecutive_errors = 10
-        
-        
-        if PYAUDIO_AVAILABLE:
-            self.FORMAT = pyaudio.paInt16
+        self._on_chunk: Optional[Callable[[np.ndarray], None]] = None
+        self._segmenter: Optional[UtteranceSegmenter] = None
 
-    def start(self, on_chunk: Optional[Callable[[bytes], None]] = None):
+    def start(self, on_chunk: Optional[Callable[[np.ndarray], None]] = None):
         if self._running:
             logger.warning("[MIC] Service already running")
             return
 
         self._on_chunk = on_chunk
-        self._error_count = 0
         
         
         if settings.demo_mode or not PYAUDIO_AVAILABLE:
             mode = "demo mode" if settings.demo_mode else "pyaudio unavailable"
             logger.info(f"[MIC] Running in {mode} - simulating microphone")
             self._running = True
-            self._thread = threading.Thread(target=self._demo_capture_loop, daemon=True)
+            self._thread = threading.Thread(target=self._demo_capture_loop, daemon=True, name="MicrophoneCapture")
             self._thread.start()
             return
 
         
-        try:
-            self._audio = pyaudio.PyAudio()
-            self._stream = self._audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK,
-            )
-            logger.info(
-                f"[MIC] Audio stream opened: {self.RATE}Hz, "
-                f"{self.CHANNELS} channel(s), {self.CHUNK} chunk size"
-            )
-        except OSError as e:
-            logger.error(f"[MIC] Failed to open audio stream: {e}")
-            self._cleanup_audio()
-            return
-        except Exception as e:
-            logger.error(f"[MIC] Unexpected error opening audio: {type(e).__name__}: {e}")
-            self._cleanup_audio()
+        self._subscription = audio_capture.subscribe("utterance_segmenter")
+        if self._subscription is None:
+            logger.error("[MIC] Shared audio capture unavailable")
             return
 
+        self._segmenter = UtteranceSegmenter(create_vad(), self._handle_audio_chunk)
+        whisper_ladder.register_vad(self._segmenter.vad)
         self._running = True
-        self._thread = threading.Thread(target=self._record_loop, daemon=True)
+        self._thread = threading.Thread(target=self._record_loop, daemon=True, name="MicrophoneCapture")
         self._thread.start()
-        logger.info("[MIC] Capture thread started")
+        logger.info(f"[MIC] Capture thread started ({self._segmenter.vad.name} VAD)")
 
-    def _cleanup_audio(self):
-        if self._stream:
-            try:
-                if self._stream.is_active():
-                    self._stream.stop_stream()
-                self._stream.close()
-            except Exception as e:
-                logger.warning(f"[MIC] Error closing stream: {e}")
-            self._stream = None
-
-        if self._audio:
-            try:
-                self._audio.terminate()
-            except Exception as e:
-                logger.warning(f"[MIC] Error terminating audio: {e}")
-            self._audio = None
+    def _release_subscription(self):
+        if self._subscription:
+            self._subscription.close()
+            self._subscription = None
 
     @property
     def is_running(self) -> bool:
@@ -124,63 +73,19 @@ class MicrophoneService:
 
     def _record_loop(self):
         logger.info("[MIC] Recording loop started")
-        silence_start: Optional[float] = None
-        active_frames: List[bytes] = []
+        subscription = self._subscription
+        segmenter = self._segmenter
 
-        while self._running:
-            try:
-                data = self._stream.read(self.CHUNK, exception_on_overflow=False)
-            except OSError as e:
-                self._error_count += 1
-                logger.warning(f"[MIC] Error reading audio stream: {e}")
-                
-                if self._error_count >= self._max_consecutive_errors:
-                    logger.error(
-                        f"[MIC] Too many consecutive errors ({self._error_count}), stopping"
-                    )
-                    break
-                continue
-            except Exception as e:
-                self._error_count += 1
-                logger.error(f"[MIC] Unexpected error reading audio: {type(e).__name__}: {e}")
-                
-                if self._error_count >= self._max_consecutive_errors:
-                    break
-                continue
-
-            
-            self._error_count = 0
-
-            
-            try:
-                samples = np.frombuffer(data, dtype=np.int16)
-                volume = np.abs(samples).mean()
-            except Exception as e:
-                logger.warning(f"[MIC] Error processing audio samples: {e}")
-                continue
-
-            if volume > self.SILENCE_THRESHOLD:
-                silence_start = None
-                active_frames.append(data)
-            else:
-                if active_frames:
-                    if silence_start is None:
-                        silence_start = time.time()
-                    active_frames.append(data)
-
-                    if time.time() - silence_start >= self.SILENCE_DURATION:
-                        
-                        try:
-                            audio_bytes = self._frames_to_wav(active_frames)
-                            self._handle_audio_chunk(audio_bytes)
-                        except Exception as e:
-                            logger.error(f"[MIC] Error processing audio chunk: {e}")
-                        
-                        active_frames = []
-                        silence_start = None
+        while self._running and subscription.is_active:
+            for view in subscription.read_views(timeout=0.5):
+                try:
+                    segmenter.feed(view)
+                except Exception as e:
+                    logger.warning(f"[MIC] Error processing audio samples: {e}")
 
+        segmenter.reset()
         logger.info("[MIC] Recording loop ended")
-        self._cleanup_audio()
+        self._running = False
 
     def _demo_capture_loop(self):
         logger.info("[MIC] Demo capture loop started")
@@ -192,49 +97,45 @@ class MicrophoneService:
 
         logger.info("[MIC] Demo capture loop ended")
 
-    def _handle_audio_chunk(self, audio_bytes: bytes):
+    def _handle_audio_chunk(self, samples: np.ndarray):
         
         if self._on_chunk:
             try:
-                self._on_chunk(audio_bytes)
+                self._on_chunk(samples)
             except Exception as e:
                 logger.warning(f"[MIC] Error in audio callback: {e}")
 
         
         with self._lock:
-            self._buffer.append(audio_bytes)
+            self._buffer.append(samples)
             if len(self._buffer) > self.MAX_BUFFER_SIZE:
                 
                 self._buffer.pop(0)
                 logger.debug("[MIC] Buffer full, dropped oldest chunk")
 
-    def _frames_to_wav(self, frames: List[bytes]) -> bytes:
-        if not frames:
-            return b""
-            
-        buf = io.BytesIO()
-        try:
-            with wave.open(buf, "wb") as wf:
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(self._audio.get_sample_size(self.FORMAT))
-                wf.setframerate(self.RATE)
-                wf.writeframes(b"".join(frames))
-        except Exception as e:
-            logger.error(f"[MIC] Error creating WAV: {e}")
-            return b""
-        
-        return buf.getvalue()
-
-    def get_latest_chunk(self) -> Optional[bytes]:
+    def get_latest_chunk(self) -> Optional[np.ndarray]:
         with self._lock:
             if self._buffer:
                 return self._buffer.pop(0)
         return None
 
+    def get_pending_chunks(self, limit: int) -> List[np.ndarray]:
+        with self._lock:
+            chunks = self._buffer[:limit]
+            del self._buffer[:limit]
+        return chunks
+
     def get_buffer_size(self) -> int:
         with self._lock:
             return len(self._buffer)
 
+    def get_stats(self) -> dict:
+        return {
+            "running": self._running,
+            "buffered_utterances": self.get_buffer_size(),
+            "segmenter": self._segmenter.get_stats() if self._segmenter else None,
+        }
+
     def clear_buffer(self):
         with self._lock:
             self._buffer.clear()
@@ -249,7 +150,9 @@ class MicrophoneService:
             if self._thread.is_alive():
                 logger.warning("[MIC] Capture thread did not stop gracefully")
         
-        self._cleanup_audio()
+        self._release_subscription()
+        if self._segmenter:
+            whisper_ladder.unregister_vad(self._segmenter.vad)
         self.clear_buffer()
         logger.info("[MIC] Microphone stopped")
 
@@ -263,8 +166,6 @@ class ContinuousMicrophone:
     
     RATE = 16000  
     CHANNELS = 1  
-    CHUNK = 4096  
-    FORMAT = None  
     
     
     SUMMARIZATION_INTERVAL = 600  
@@ -272,24 +173,26 @@ class ContinuousMicrophone:
     
     def __init__(
         self,
-        on_summarize: Optional[Callable[[List[str]], None]] = None,
+        on_summarize: Optional[Callable[[List[str], int], None]] = None,
         event_loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_transcript: Optional[Callable[[str], None]] = None,
+        on_partial: Optional[Callable[[str], None]] = None,
     ):
-        self._audio = None
-        self._stream = None
+        self._subscription: Optional[AudioSubscription] = None
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._transcription_thread: Optional[threading.Thread] = None
         self._on_summarize = on_summarize
         self._event_loop = event_loop
+        self._on_transcript = on_transcript
+        self._on_partial = on_partial
         
         
         self._transcripts: List[str] = []
+        self._transcript_seq = 0
         self._transcripts_lock = threading.Lock()
         
         
-        self._audio_buffer: List[bytes] = []
-        self._audio_buffer_lock = threading.Lock()
+        self._transcriber: Optional[StreamingTranscriber] = None
         
         
         self._last_summarize_time = time.time()
@@ -298,17 +201,6 @@ class ContinuousMicrophone:
         
         self._whisper_model = None
         self._whisper_loaded = False
-        
-        
-        self._error_count = 0
-        self._max_consecutive_errors = 10
-        
-        
-        self._audio_queue: queue.Queue = queue.Queue()
-        
-        
-        if PYAUDIO_AVAILABLE:
-            self.FORMAT = pyaudio.paInt16
     
     def _load_whisper_model(self):
         if not FASTER_WHISPER_AVAILABLE:
@@ -319,14 +211,16 @@ class ContinuousMicrophone:
             return
             
         try:
-            logger.info(f"[CONTINUOUS_MIC] Loading faster-whisper model: {settings.whisper_model}")
-            self._whisper_model = WhisperModel(
-                settings.whisper_model,
-                device="auto",  
-                compute_type="float16",
+            self._whisper_model = whisper_registry.get_model(warm_up=True)
+            self._transcriber = StreamingTranscriber(
+                self._whisper_model,
+                on_final=self._store_transcript,
+                on_partial=self._on_partial,
             )
+            whisper_ladder.register_vad(self._transcriber.vad)
+            whisper_ladder.attach(self._transcriber, self._lag_seconds)
             self._whisper_loaded = True
-            logger.info("[CONTINUOUS_MIC] Whisper model loaded successfully")
+            logger.info(f"[CONTINUOUS_MIC] Using shared Whisper model: {self._whisper_model.size}")
         except Exception as e:
             logger.error(f"[CONTINUOUS_MIC] Failed to load whisper model: {e}")
             self._whisper_loaded = False
@@ -340,129 +234,78 @@ class ContinuousMicrophone:
         self._load_whisper_model()
         
         
-        self._error_count = 0
         self._last_summarize_time = time.time()
         self._transcripts.clear()
-        self._audio_buffer.clear()
         
         
         if settings.demo_mode or not PYAUDIO_AVAILABLE:
             mode = "demo mode" if settings.demo_mode else "pyaudio unavailable"
             logger.info(f"[CONTINUOUS_MIC] Running in {mode}")
             self._running = True
-            self._thread = threading.Thread(target=self._demo_recording_loop, daemon=True)
+            self._thread = threading.Thread(target=self._demo_recording_loop, daemon=True, name="ContinuousMicrophone")
             self._thread.start()
             return
         
         
-        try:
-            self._audio = pyaudio.PyAudio()
-            self._stream = self._audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK,
-            )
-            logger.info(
-                f"[CONTINUOUS_MIC] Audio stream opened: {self.RATE}Hz, "
-                f"{self.CHANNELS} channel(s), {self.CHUNK} chunk size"
-            )
-        except OSError as e:
-            logger.error(f"[CONTINUOUS_MIC] Failed to open audio stream: {e}")
-            self._cleanup_audio()
-            return
-        except Exception as e:
-            logger.error(f"[CONTINUOUS_MIC] Unexpected error opening audio: {type(e).__name__}: {e}")
-            self._cleanup_audio()
+        self._subscription = audio_capture.subscribe("continuous_transcriber")
+        if self._subscription is None:
+            logger.error("[CONTINUOUS_MIC] Shared audio capture unavailable")
             return
         
         self._running = True
         
         
-        self._thread = threading.Thread(target=self._recording_loop, daemon=True)
+        self._thread = threading.Thread(target=self._recording_loop, daemon=True, name="ContinuousMicrophone")
         self._thread.start()
         
-        
         if self._whisper_loaded:
-            self._transcription_thread = threading.Thread(
-                target=self._transcription_loop, daemon=True
-            )
-            self._transcription_thread.start()
+            whisper_ladder.start()
         
         logger.info("[CONTINUOUS_MIC] Continuous recording started")
     
-    def _cleanup_audio(self):
-        if self._stream:
-            try:
-                if self._stream.is_active():
-                    self._stream.stop_stream()
-                self._stream.close()
-            except Exception as e:
-                logger.warning(f"[CONTINUOUS_MIC] Error closing stream: {e}")
-            self._stream = None
-        
-        if self._audio:
-            try:
-                self._audio.terminate()
-            except Exception as e:
-                logger.warning(f"[CONTINUOUS_MIC] Error terminating audio: {e}")
-            self._audio = None
+    def _release_subscription(self):
+        if self._subscription:
+            self._subscription.close()
+            self._subscription = None
+    
+    def _lag_seconds(self) -> float:
+        subscription = self._subscription
+        if subscription is None:
+            return 0.0
+        return subscription.reader.lag_samples / self.RATE
     
     @property
     def is_running(self) -> bool:
         return self._running
+
+    @property
+    def transcription_ready(self) -> bool:
+        return self._whisper_loaded
     
     def _recording_loop(self):
         logger.info("[CONTINUOUS_MIC] Recording loop started")
-        chunk_duration = self.CHUNK / self.RATE  
-        
-        while self._running:
-            try:
-                data = self._stream.read(self.CHUNK, exception_on_overflow=False)
-            except OSError as e:
-                self._error_count += 1
-                logger.warning(f"[CONTINUOUS_MIC] Error reading audio stream: {e}")
-                
-                if self._error_count >= self._max_consecutive_errors:
-                    logger.error(
-                        f"[CONTINUOUS_MIC] Too many consecutive errors ({self._error_count}), stopping"
-                    )
-                    break
-                time.sleep(0.1)
-                continue
-            except Exception as e:
-                self._error_count += 1
-                logger.error(f"[CONTINUOUS_MIC] Unexpected error reading audio: {type(e).__name__}: {e}")
-                
-                if self._error_count >= self._max_consecutive_errors:
-                    break
-                continue
-            
+        subscription = self._subscription
+        if self._transcriber:
+            self._transcriber.reset()
+        
+        max_read = int(StreamingTranscriber.WINDOW_SECONDS * self.RATE)
+        while self._running and subscription.is_active:
+            views = subscription.read_views(max_samples=max_read, timeout=1.0)
+            for view in views:
+                self._total_recorded_seconds += view.size / self.RATE
             
-            self._error_count = 0
             
-            
-            with self._audio_buffer_lock:
-                self._audio_buffer.append(data)
-            
-            
-            if self._whisper_loaded:
-                try:
-                    self._audio_queue.put_nowait(data)
-                except queue.Full:
-                    logger.warning("[CONTINUOUS_MIC] Audio queue full, dropping chunk")
-            
-            
-            self._total_recorded_seconds += chunk_duration
+            if views and self._whisper_loaded:
+                self._transcriber.feed(views)
             
             
             current_time = time.time()
             if current_time - self._last_summarize_time >= self.SUMMARIZATION_INTERVAL:
                 self._trigger_summarization()
         
+        if self._whisper_loaded:
+            self._transcriber.flush()
         logger.info("[CONTINUOUS_MIC] Recording loop ended")
-        self._cleanup_audio()
     
     def _demo_recording_loop(self):
         logger.info("[CONTINUOUS_MIC] Demo recording loop started")
@@ -477,66 +320,21 @@ class ContinuousMicrophone:
         
         logger.info("[CONTINUOUS_MIC] Demo recording loop ended")
     
-    def _transcription_loop(self):
-        logger.info("[CONTINUOUS_MIC] Transcription loop started")
-        
-        
-        segment_buffer: List[bytes] = []
-        chunks_per_segment = 10
-        
-        while self._running:
-            try:
-                
-                try:
-                    data = self._audio_queue.get(timeout=1.0)
-                    segment_buffer.append(data)
-                except queue.Empty:
-                    
-                    if len(segment_buffer) < chunks_per_segment:
-                        continue
-                
-                
-                if len(segment_buffer) >= chunks_per_segment:
-                    try:
-                        pcm_bytes = b"".join(segment_buffer)
-                        segment_buffer = []
-
-                        audio_waveform = (
-                            np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-                        )
-                        if audio_waveform.size == 0:
-                            continue
-                        
-                        
-                        segments, info = self._whisper_model.transcribe(
-                            audio_waveform,
-                            language="en",
-                            beam_size=1,  
-                            vad_filter=True,  
-                        )
-                        
-                        
-                        text_parts = []
-                        for segment in segments:
-                            text_parts.append(segment.text.strip())
-                        
-                        if text_parts:
-                            transcript_text = " ".join(text_parts)
-                            if transcript_text:
-                                with self._transcripts_lock:
-                                    self._transcripts.append(transcript_text)
-                                    
-                                    if len(self._transcripts) > 100:
-                                        self._transcripts = self._transcripts[-50:]
-                                    logger.debug(f"[CONTINUOUS_MIC] Transcribed: {transcript_text[:50]}...")
-                    
-                    except Exception as e:
-                        logger.warning(f"[CONTINUOUS_MIC] Transcription error: {e}")
+    def _store_transcript(self, transcript_text: str):
+        with self._transcripts_lock:
+            self._transcripts.append(transcript_text)
+            self._transcript_seq += 1
+            seq = self._transcript_seq
             
-            except Exception as e:
-                logger.error(f"[CONTINUOUS_MIC] Transcription loop error: {e}")
+            if len(self._transcripts) > 100:
+                self._transcripts = self._transcripts[-50:]
+        logger.debug(f"[CONTINUOUS_MIC] Transcribed: {transcript_text[:50]}...")
+        
+        if self._event_loop:
+            conversation_summarizer.feed_threadsafe(transcript_text, self._event_loop, seq)
         
-        logger.info("[CONTINUOUS_MIC] Transcription loop ended")
+        if self._on_transcript:
+            self._on_transcript(transcript_text)
     
     def _trigger_summarization(self):
         logger.info("[CONTINUOUS_MIC] Triggering summarization...")
@@ -549,16 +347,13 @@ class ContinuousMicrophone:
             
             
             transcripts_to_summarize = self._transcripts.copy()
+            through_seq = self._transcript_seq
             self._transcripts.clear()
         
         
-        with self._audio_buffer_lock:
-            self._audio_buffer.clear()
-        
-        
         if self._on_summarize:
             try:
-                callback_result = self._on_summarize(transcripts_to_summarize)
+                callback_result = self._on_summarize(transcripts_to_summarize, through_seq)
                 if asyncio.iscoroutine(callback_result):
                     if self._event_loop and self._event_loop.is_running():
                         asyncio.run_coroutine_threadsafe(callback_result, self._event_loop)
@@ -578,29 +373,30 @@ class ContinuousMicrophone:
         with self._transcripts_lock:
             transcript_count = len(self._transcripts)
         
+        reader = self._subscription.reader if self._subscription else None
         return {
             "is_running": self._running,
             "total_recorded_seconds": self._total_recorded_seconds,
+            "lag_seconds": reader.lag_samples / self.RATE if reader else 0.0,
+            "dropped_seconds": reader.dropped_samples / self.RATE if reader else 0.0,
             "transcript_count": transcript_count,
             "whisper_loaded": self._whisper_loaded,
+            "transcriber": self._transcriber.get_stats() if self._transcriber else None,
+            "summarizer": conversation_summarizer.get_stats(),
             "time_since_last_summary": time.time() - self._last_summarize_time,
         }
     
     def stop(self):
         logger.info("[CONTINUOUS_MIC] Stopping continuous microphone...")
         self._running = False
+        whisper_ladder.stop()
         
         if self._thread:
             self._thread.join(timeout=5)
             if self._thread.is_alive():
                 logger.warning("[CONTINUOUS_MIC] Recording thread did not stop gracefully")
         
-        if self._transcription_thread:
-            self._transcription_thread.join(timeout=5)
-            if self._transcription_thread.is_alive():
-                logger.warning("[CONTINUOUS_MIC] Transcription thread did not stop gracefully")
-        
-        self._cleanup_audio()
+        self._release_subscription()
         logger.info("[CONTINUOUS_MIC] Continuous microphone stopped")
 
 
@@ -0,0 +1,152 @@
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+COMPONENT_CAMERA = "camera"
+COMPONENT_FACE = "face_recognition"
+COMPONENT_SPEECH = "speech"
+COMPONENT_LLM = "llm"
+COMPONENT_BACKEND = "backend"
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+STATE_DISABLED = "disabled"
+
+SETTLED_STATES = {STATE_READY, STATE_FAILED, STATE_DISABLED}
+
+COMPONENT_LOAD_SECONDS = metrics.gauge("aura_component_load_seconds", "Time each component took to become ready at startup", ["component"])
+
+
+#------This Class handles the readiness state of one startup component----------
+class ComponentState:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = STATE_PENDING
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.detail: Optional[str] = None
+
+    def get_status(self) -> dict:
+        status = {"state": self.state}
+        if self.started_at is not None:
+            end = self.finished_at if self.finished_at is not None else time.monotonic()
+            status["seconds"] = round(end - self.started_at, 2)
+        if self.detail:
+            status["detail"] = self.detail
+        return status
+
+
+#------This Class handles staged startup so the server can answer before models are loaded----------
+class ReadinessTracker:
+
+    def __init__(self):
+        self._components: Dict[str, ComponentState] = {}
+        self._lock = threading.Lock()
+        self._process_started_at = time.monotonic()
+        self._all_settled_at: Optional[float] = None
+
+    def register(self, *names: str):
+        with self._lock:
+            for name in names:
+                self._components.setdefault(name, ComponentState(name))
+
+    def _set(self, name: str, state: str, detail: Optional[str] = None):
+        with self._lock:
+            component = self._components.setdefault(name, ComponentState(name))
+            was_loading = component.state == STATE_LOADING
+            now = time.monotonic()
+            if state == STATE_LOADING:
+                component.started_at = now
+                component.finished_at = None
+            elif state in SETTLED_STATES:
+                if component.started_at is None:
+                    component.started_at = now
+                component.finished_at = now
+            component.state = state
+            component.detail = detail
+            if self._all_settled_at is None and all(
+                c.state in SETTLED_STATES for c in self._components.values()
+            ):
+                self._all_settled_at = now
+        if state == STATE_READY and was_loading:
+            COMPONENT_LOAD_SECONDS.labels(name).set(component.finished_at - component.started_at)
+
+    def mark_loading(self, name: str):
+        self._set(name, STATE_LOADING)
+
+    def mark_ready(self, name: str, detail: Optional[str] = None):
+        self._set(name, STATE_READY, detail)
+
+    def mark_failed(self, name: str, error: str):
+        self._set(name, STATE_FAILED, error)
+
+    def mark_disabled(self, name: str, reason: str):
+        self._set(name, STATE_DISABLED, reason)
+
+    def state(self, name: str) -> Optional[str]:
+        component = self._components.get(name)
+        return component.state if component else None
+
+    def is_ready(self, name: str) -> bool:
+        return self.state(name) in (None, STATE_READY)
+
+    def is_pending(self, name: str) -> bool:
+        return self.state(name) in (STATE_PENDING, STATE_LOADING)
+
+    def retry_after(self) -> int:
+        return max(1, int(round(settings.startup_retry_after)))
+
+    async def run(self, name: str, loader: Callable[..., Any], *args) -> Any:
+        self.mark_loading(name)
+        try:
+            if asyncio.iscoroutinefunction(loader):
+                result = await loader(*args)
+            else:
+                result = await asyncio.to_thread(loader, *args)
+        except Exception as e:
+            self.mark_failed(name, f"{type(e).__name__}: {e}")
+            logger.warning(f"[STARTUP] {name} failed to load: {type(e).__name__}: {e}")
+            return None
+        if result is False:
+            self.mark_failed(name, "loader reported failure")
+            logger.warning(f"[STARTUP] {name} not available")
+        else:
+            self.mark_ready(name)
+            logger.info(f"[STARTUP] {name} ready in {self._components[name].get_status()['seconds']}s")
+        return result
+
+    def get_status(self) -> dict:
+        with self._lock:
+            components = {name: c.get_status() for name, c in self._components.items()}
+            states = [c.state for c in self._components.values()]
+            settled_at = self._all_settled_at
+
+        if any(state not in SETTLED_STATES for state in states):
+            overall = "starting"
+        elif any(state == STATE_FAILED for state in states):
+            overall = "degraded"
+        else:
+            overall = "ready"
+        return {
+            "status": overall,
+            "uptime_seconds": round(time.monotonic() - self._process_started_at, 1),
+            "startup_seconds": (
+                round(settled_at - self._process_started_at, 2) if settled_at is not None else None
+            ),
+            "components": components,
+        }
+
+
+
+readiness = ReadinessTracker()
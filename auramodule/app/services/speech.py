@@ -1,77 +1,51 @@
 
+import asyncio
+import importlib.util
+import io
+import itertools
 import logging
-import tempfile
-import os
 import time
-from typing import Optional, Tuple
-from app.core.config import settings
+import wave
+from typing import Optional, Tuple, Union
+import numpy as np
+from app.services.stt_executor import stt_executor, record_decode, PRIORITY_INTERACTIVE
+from app.services.whisper_registry import whisper_registry, SharedWhisperModel, FASTER_WHISPER_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
-_whisper_model = None
-_model_load_error: Optional[str] = None
+COMPRESSED_AUDIO_AVAILABLE = FASTER_WHISPER_AVAILABLE and importlib.util.find_spec("av") is not None
+if not COMPRESSED_AUDIO_AVAILABLE:
+    logger.warning("[STT] PyAV not available, only WAV uploads can be decoded")
 
+SAMPLE_RATE = 16000
 
-#------This Function returns the Whisper Model----------
-def get_whisper_model():
-    global _whisper_model, _model_load_error
-    
-    if _model_load_error:
-        
-        raise RuntimeError(f"Whisper model failed to load: {_model_load_error}")
-    
-    if _whisper_model is not None:
-        return _whisper_model
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+MAX_COMPRESSED_UPLOAD_BYTES = 8 * 1024 * 1024
+
+MIN_AUDIO_SAMPLES = 512
+
+MAX_AUDIO_SECONDS = 1800
+
+WAV_MAGIC = b"RIFF"
+
+
+#------This Class handles the error raised when an upload is longer than we are willing to decode----------
+class AudioTooLongError(ValueError):
+    pass
+
+
+#------This Function returns the upload byte limit for the format the header announces----------
+def max_upload_bytes(header: bytes) -> int:
+    return MAX_UPLOAD_BYTES if header[:4] == WAV_MAGIC else MAX_COMPRESSED_UPLOAD_BYTES
 
-    try:
-        from faster_whisper import WhisperModel
-        
-        logger.info(f"[STT] Loading faster-whisper model: {settings.whisper_model}")
-        start_time = time.time()
-        
-        
-        device = "cuda"
-        compute_type = "int8"
-        
-        
-        try:
-            import torch
-            if not torch.cuda.is_available():
-                logger.warning("[STT] CUDA not available, falling back to CPU")
-                device = "cpu"
-                compute_type = "int8"
-            else:
-                logger.info(f"[STT] CUDA available: {torch.cuda.get_device_name(0)}")
-        except ImportError:
-            logger.warning("[STT] PyTorch not available, assuming CPU mode")
-            device = "cpu"
-            compute_type = "int8"
-
-        _whisper_model = WhisperModel(
-            settings.whisper_model,
-            device=device,
-            compute_type=compute_type,
-        )
-        
-        load_time = time.time() - start_time
-        logger.info(
-            f"[STT] Loaded faster-whisper model: {settings.whisper_model} "
-            f"({device}, {compute_type}) in {load_time:.2f}s"
-        )
-        
-        return _whisper_model
-        
-    except ImportError as e:
-        _model_load_error = f"faster-whisper not installed: {e}"
-        logger.error(f"[STT] {_model_load_error}")
-        raise RuntimeError(_model_load_error)
-        
-    except Exception as e:
-        _model_load_error = f"{type(e).__name__}: {e}"
-        logger.error(f"[STT] Failed to load Whisper model: {_model_load_error}")
-        raise RuntimeError(_model_load_error)
 
+#------This Function returns the shared Whisper Model----------
+def get_whisper_model() -> SharedWhisperModel:
+    return whisper_registry.get_model()
 
+
+#------This Function validates raw audio bytes from external callers----------
 def validate_audio(audio_bytes: bytes) -> Tuple[bool, Optional[str]]:
     if audio_bytes is None:
         return False, "Audio bytes is None"
@@ -87,43 +61,141 @@ def validate_audio(audio_bytes: bytes) -> Tuple[bool, Optional[str]]:
         return False, f"Audio too small: {len(audio_bytes)} bytes"
     
     
-    max_size = 50 * 1024 * 1024
-    if len(audio_bytes) > max_size:
-        return False, f"Audio too large: {len(audio_bytes)} bytes (max {max_size})"
+    limit = max_upload_bytes(audio_bytes)
+    if len(audio_bytes) > limit:
+        return False, f"Audio too large: {len(audio_bytes)} bytes (max {limit})"
     
     return True, None
 
 
-async def transcribe_audio(audio_bytes: bytes) -> str:
-    
-    is_valid, error = validate_audio(audio_bytes)
+#------This Function validates a mono float32 waveform before decoding----------
+def validate_waveform(waveform: np.ndarray) -> Tuple[bool, Optional[str]]:
+    if waveform is None:
+        return False, "Waveform is None"
+
+    if not isinstance(waveform, np.ndarray):
+        return False, f"Expected numpy array, got {type(waveform).__name__}"
+
+    if waveform.ndim != 1:
+        return False, f"Expected mono waveform, got shape {waveform.shape}"
+
+    if waveform.size < MIN_AUDIO_SAMPLES:
+        return False, f"Audio too short: {waveform.size} samples"
+
+    if waveform.size > MAX_AUDIO_SECONDS * SAMPLE_RATE:
+        return False, f"Audio too long: {waveform.size / SAMPLE_RATE:.0f}s (max {MAX_AUDIO_SECONDS}s)"
+
+    return True, None
+
+
+#------This Function converts 16-bit PCM samples to a float32 waveform----------
+def pcm_to_waveform(pcm: Union[bytes, np.ndarray]) -> np.ndarray:
+    if not isinstance(pcm, np.ndarray):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+    elif np.issubdtype(pcm.dtype, np.floating):
+        return pcm.astype(np.float32, copy=False)
+    elif pcm.dtype == np.int16:
+        samples = pcm
+    else:
+        raise ValueError(f"Unsupported PCM sample type: {pcm.dtype}")
+    return samples.astype(np.float32) / 32768.0
+
+
+#------This Function decodes WAV bytes in memory into a 16kHz mono waveform----------
+def wav_bytes_to_waveform(audio_bytes: bytes) -> np.ndarray:
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        frame_rate = wf.getframerate()
+        frame_count = wf.getnframes()
+        if frame_rate and frame_count / frame_rate > MAX_AUDIO_SECONDS:
+            raise AudioTooLongError(
+                f"Audio too long: {frame_count / frame_rate:.0f}s (max {MAX_AUDIO_SECONDS}s)"
+            )
+        raw = wf.readframes(frame_count)
+
+    if sample_width != 2:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width * 8}-bit")
+
+    samples = np.frombuffer(raw, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+
+    waveform = pcm_to_waveform(samples)
+
+    if frame_rate != SAMPLE_RATE and waveform.size:
+        target_length = int(round(waveform.size * SAMPLE_RATE / frame_rate))
+        source_positions = np.linspace(0, waveform.size - 1, num=target_length)
+        waveform = np.interp(
+            source_positions, np.arange(waveform.size), waveform
+        ).astype(np.float32)
+
+    return waveform
+
+
+#------This Function decodes compressed audio to 16kHz mono, stopping once it passes the length limit----------
+def compressed_bytes_to_waveform(audio_bytes: bytes, max_seconds: Optional[float] = None) -> np.ndarray:
+    import av
+
+    max_seconds = max_seconds or MAX_AUDIO_SECONDS
+    max_samples = int(max_seconds * SAMPLE_RATE)
+    chunks = []
+    total = 0
+    with av.open(io.BytesIO(audio_bytes), mode="r", metadata_errors="ignore") as container:
+        if container.duration and container.duration / av.time_base > max_seconds:
+            raise AudioTooLongError(
+                f"Audio too long: {container.duration / av.time_base:.0f}s (max {max_seconds:.0f}s)"
+            )
+        if not container.streams.audio:
+            raise ValueError("Upload has no audio stream")
+
+        resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        frames = itertools.chain(container.decode(audio=0), [None])
+        for frame in frames:
+            for resampled in resampler.resample(frame):
+                samples = resampled.to_ndarray().reshape(-1)
+                total += samples.size
+                if total > max_samples:
+                    raise AudioTooLongError(
+                        f"Audio too long: over {max_seconds:.0f}s after decoding {total} samples"
+                    )
+                chunks.append(samples)
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return pcm_to_waveform(np.concatenate(chunks))
+
+
+#------This Function decodes WAV, Opus/OGG or FLAC bytes into a 16kHz mono waveform----------
+def audio_bytes_to_waveform(audio_bytes: bytes) -> np.ndarray:
+    if audio_bytes[:4] == WAV_MAGIC:
+        return wav_bytes_to_waveform(audio_bytes)
+    if not COMPRESSED_AUDIO_AVAILABLE:
+        raise ValueError("Compressed audio needs PyAV, which is not installed")
+    return compressed_bytes_to_waveform(audio_bytes)
+
+
+#------This Function runs Whisper on a waveform and blocks until done----------
+def transcribe_waveform_sync(waveform: np.ndarray, beam_size: int = 5) -> str:
+    is_valid, error = validate_waveform(waveform)
     if not is_valid:
         logger.warning(f"[STT] Invalid audio: {error}")
         return ""
 
-    
     try:
         model = get_whisper_model()
     except RuntimeError as e:
         logger.error(f"[STT] Model not available: {e}")
         return ""
 
-    
-    tmp_file: Optional[str] = None
     try:
-        
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_file = tmp.name
-        
-        logger.debug(f"[STT] Transcribing audio ({len(audio_bytes)} bytes)...")
+        logger.debug(f"[STT] Transcribing audio ({waveform.size} samples)...")
         start_time = time.time()
-        
-        
+
         segments, info = model.transcribe(
-            tmp_file,
+            waveform,
             language="en",
-            beam_size=5,
+            beam_size=beam_size,
             vad_filter=True,
             vad_parameters=dict(
                 min_silence_duration_ms=500,
@@ -131,47 +203,63 @@ async def transcribe_audio(audio_bytes: bytes) -> str:
             ),
         )
 
-        
         transcript_parts = []
         for seg in segments:
             text = seg.text.strip()
             if text:
                 transcript_parts.append(text)
-        
+
         transcript = " ".join(transcript_parts)
-        
+
         transcribe_time = time.time() - start_time
+        record_decode("single", transcribe_time, info.duration)
         logger.info(
             f"[STT] Transcribed {info.duration:.1f}s audio in {transcribe_time:.2f}s: "
             f"'{transcript[:50]}{'...' if len(transcript) > 50 else ''}'"
         )
-        
+
         return transcript
-        
-    except FileNotFoundError as e:
-        logger.error(f"[STT] Temp file error: {e}")
-        return ""
-        
+
     except Exception as e:
         logger.error(f"[STT] Transcription error: {type(e).__name__}: {e}")
         return ""
-        
-    finally:
-        
-        if tmp_file and os.path.exists(tmp_file):
-            try:
-                os.unlink(tmp_file)
-            except Exception as e:
-                logger.warning(f"[STT] Failed to delete temp file: {e}")
+
+
+#------This Function transcribes a float32 waveform on the speech worker----------
+async def transcribe_waveform(waveform: np.ndarray, priority: int = PRIORITY_INTERACTIVE) -> str:
+    return await stt_executor.run(priority, transcribe_waveform_sync, waveform)
+
+
+#------This Function transcribes raw 16kHz 16-bit PCM samples----------
+async def transcribe_pcm(
+    pcm: Union[bytes, np.ndarray], priority: int = PRIORITY_INTERACTIVE
+) -> str:
+    return await transcribe_waveform(pcm_to_waveform(pcm), priority)
+
+
+#------This Function transcribes WAV or compressed audio bytes that already passed validate_audio----------
+async def transcribe_audio(audio_bytes: bytes) -> str:
+    try:
+        waveform = await asyncio.to_thread(audio_bytes_to_waveform, audio_bytes)
+    except AudioTooLongError:
+        raise
+    except Exception as e:
+        logger.error(f"[STT] Could not decode audio: {e}")
+        return ""
+
+    return await transcribe_waveform(waveform)
 
 
 def is_model_loaded() -> bool:
-    return _whisper_model is not None
+    return whisper_registry.is_loaded()
 
 
 def get_model_status() -> dict:
+    size, device, compute_type = whisper_registry.resolve_key()
     return {
-        "model": settings.whisper_model,
-        "loaded": _whisper_model is not None,
-        "error": _model_load_error,
+        "model": size,
+        "device": device,
+        "compute_type": compute_type,
+        "loaded": whisper_registry.is_loaded(),
+        "error": whisper_registry.get_load_error(),
     }
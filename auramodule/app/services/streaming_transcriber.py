@@ -0,0 +1,258 @@
+
+import logging
+import re
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+from app.services.stt_executor import stt_executor, record_decode, PRIORITY_BACKGROUND
+from app.services.vad import VoiceActivityDetector, create_vad
+from app.services.whisper_registry import SharedWhisperModel
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_RATE = 16000
+
+PROMPT_CHARS = 200
+
+
+#------This Function strips punctuation and case from a word for overlap matching----------
+def _normalise_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word).lower()
+
+
+#------This Class handles sliding-window Whisper transcription of a live stream----------
+class StreamingTranscriber:
+
+    WINDOW_SECONDS = 8.0
+    MIN_WINDOW_SECONDS = 2.0
+    OVERLAP_SECONDS = 1.0
+    MIN_PAUSE_SECONDS = 0.3
+
+    def __init__(
+        self,
+        model: SharedWhisperModel,
+        on_final: Optional[Callable[[str], None]] = None,
+        on_partial: Optional[Callable[[str], None]] = None,
+        beam_size: int = 1,
+        vad: Optional[VoiceActivityDetector] = None,
+    ):
+        self.model = model
+        self.beam_size = beam_size
+        self.vad = vad or create_vad()
+        self._on_final = on_final
+        self._on_partial = on_partial
+
+        self._window = np.zeros(int(self.WINDOW_SECONDS * SAMPLE_RATE), dtype=np.float32)
+        self._staging = np.zeros(self._window.size, dtype=np.float32)
+        self._filled = 0
+        self._window_start_seconds = 0.0
+        self._committed_until = 0.0
+        self._committed_words: List[str] = []
+        self._previous_text = ""
+        self._partial_text = ""
+        self._speech_flags: List[bool] = []
+
+        self._windows_decoded = 0
+        self._audio_seconds_decoded = 0.0
+        self._decode_seconds = 0.0
+        self._last_real_time_factor = 0.0
+        self._words_deduplicated = 0
+
+    def set_model(self, model: SharedWhisperModel, beam_size: int):
+        self.model = model
+        self.beam_size = beam_size
+
+    @property
+    def partial_text(self) -> str:
+        return self._partial_text
+
+    def reset(self):
+        self._filled = 0
+        self._speech_flags = []
+        self.vad.reset()
+        self._window_start_seconds = 0.0
+        self._committed_until = 0.0
+        self._committed_words = []
+        self._previous_text = ""
+        self._partial_text = ""
+
+    def _stage(self, views: Sequence[np.ndarray]) -> np.ndarray:
+        total = sum(view.size for view in views)
+        if self._staging.size < total:
+            self._staging = np.zeros(total, dtype=np.float32)
+        offset = 0
+        for view in views:
+            np.multiply(
+                view, 1.0 / 32768.0,
+                out=self._staging[offset:offset + view.size],
+                casting="unsafe",
+            )
+            offset += view.size
+        return self._staging[:total]
+
+    def feed(self, views: Sequence[np.ndarray]):
+        samples = self._stage(views)
+        offset = 0
+        while offset < samples.size:
+            take = min(self._window.size - self._filled, samples.size - offset)
+            self._window[self._filled:self._filled + take] = samples[offset:offset + take]
+            self._filled += take
+            offset += take
+
+            if self._filled >= self._window.size:
+                self._decode_window(self._filled, aligned=False)
+
+        min_samples = int(self.MIN_WINDOW_SECONDS * SAMPLE_RATE)
+        if self._filled >= min_samples:
+            cut = self._find_pause_cut(min_samples)
+            if cut is not None:
+                self._decode_window(cut, aligned=True)
+
+    def flush(self):
+        if self._filled >= self.vad.frame_samples:
+            self._decode_window(self._filled, aligned=True)
+
+    def _scan_speech(self) -> List[bool]:
+        frame_samples = self.vad.frame_samples
+        for index in range(len(self._speech_flags), self._filled // frame_samples):
+            frame = self._window[index * frame_samples:(index + 1) * frame_samples]
+            self._speech_flags.append(self.vad.is_speech(frame))
+        return self._speech_flags
+
+    def _find_pause_cut(self, min_samples: int) -> Optional[int]:
+        speech_flags = self._scan_speech()
+        if not any(speech_flags):
+            self._advance_window(self._filled)
+            return None
+
+        frame_samples = self.vad.frame_samples
+        pause_frames = int(self.MIN_PAUSE_SECONDS * SAMPLE_RATE / frame_samples)
+        min_frame = min_samples // frame_samples
+        quiet_run = 0
+        for index in range(len(speech_flags) - 1, min_frame - 1, -1):
+            if speech_flags[index]:
+                if quiet_run >= pause_frames:
+                    return (index + 1 + quiet_run // 2) * frame_samples
+                quiet_run = 0
+            else:
+                quiet_run += 1
+        return None
+
+    def _advance_window(self, consumed: int, keep: int = 0):
+        keep = min(keep, consumed)
+        if keep:
+            self._window[:keep] = self._window[consumed - keep:consumed]
+        remaining = self._filled - consumed
+        if remaining:
+            self._window[keep:keep + remaining] = self._window[consumed:self._filled]
+        self._window_start_seconds += (consumed - keep) / SAMPLE_RATE
+        self._filled = keep + remaining
+
+        shift = consumed - keep
+        if shift % self.vad.frame_samples == 0:
+            self._speech_flags = self._speech_flags[shift // self.vad.frame_samples:]
+        else:
+            self._speech_flags = []
+
+    def _decode_window(self, cut: int, aligned: bool):
+        audio = self._window[:cut]
+        audio_seconds = cut / SAMPLE_RATE
+        overlap_samples = 0 if aligned else int(self.OVERLAP_SECONDS * SAMPLE_RATE)
+        stable_until = self._window_start_seconds + (cut - overlap_samples) / SAMPLE_RATE
+
+        start_time = time.time()
+        try:
+            segments, _ = stt_executor.submit(
+                PRIORITY_BACKGROUND,
+                self.model.transcribe,
+                audio,
+                language="en",
+                beam_size=self.beam_size,
+                word_timestamps=True,
+                condition_on_previous_text=False,
+                initial_prompt=self._previous_text[-PROMPT_CHARS:] or None,
+                vad_filter=True,
+            ).result()
+        except Exception as e:
+            logger.warning(f"[STREAM-STT] Window decode failed: {e}")
+            segments = []
+        decode_seconds = time.time() - start_time
+        record_decode("streaming", decode_seconds, audio_seconds)
+
+        self._windows_decoded += 1
+        self._audio_seconds_decoded += audio_seconds
+        self._decode_seconds += decode_seconds
+        self._last_real_time_factor = decode_seconds / audio_seconds if audio_seconds else 0.0
+
+        final_words, partial_words = self._split_new_words(segments, stable_until)
+        self._committed_until = max(self._committed_until, stable_until)
+        self._advance_window(cut, keep=overlap_samples)
+
+        if final_words:
+            final_text = " ".join(final_words)
+            self._committed_words = (self._committed_words + final_words)[-50:]
+            self._previous_text = (self._previous_text + " " + final_text).strip()[-PROMPT_CHARS:]
+            self._emit(self._on_final, final_text)
+
+        self._partial_text = " ".join(partial_words)
+        if self._partial_text:
+            self._emit(self._on_partial, self._partial_text)
+
+    def _split_new_words(
+        self, segments: Sequence, stable_until: float
+    ) -> Tuple[List[str], List[str]]:
+        timed_words: List[Tuple[float, str]] = []
+        for segment in segments:
+            for word in getattr(segment, "words", None) or []:
+                text = word.word.strip()
+                if not text:
+                    continue
+                midpoint = self._window_start_seconds + (word.start + word.end) / 2
+                timed_words.append((midpoint, text))
+
+        fresh = [(t, w) for t, w in timed_words if t > self._committed_until]
+        self._words_deduplicated += len(timed_words) - len(fresh)
+        fresh = self._drop_repeated_prefix(fresh)
+
+        final_words = [w for t, w in fresh if t <= stable_until]
+        partial_words = [w for t, w in fresh if t > stable_until]
+        return final_words, partial_words
+
+    def _drop_repeated_prefix(
+        self, fresh: List[Tuple[float, str]]
+    ) -> List[Tuple[float, str]]:
+        if not fresh or not self._committed_words:
+            return fresh
+
+        tail = [_normalise_word(w) for w in self._committed_words[-8:]]
+        head = [_normalise_word(w) for _, w in fresh[:8]]
+        for length in range(min(len(tail), len(head)), 0, -1):
+            if tail[-length:] == head[:length]:
+                self._words_deduplicated += length
+                return fresh[length:]
+        return fresh
+
+    def _emit(self, callback: Optional[Callable[[str], None]], text: str):
+        if not callback:
+            return
+        try:
+            callback(text)
+        except Exception as e:
+            logger.warning(f"[STREAM-STT] Transcript callback error: {e}")
+
+    def get_stats(self) -> dict:
+        average_rtf = (
+            self._decode_seconds / self._audio_seconds_decoded
+            if self._audio_seconds_decoded else 0.0
+        )
+        return {
+            "model": self.model.size if self.model else None,
+            "windows_decoded": self._windows_decoded,
+            "audio_seconds_decoded": round(self._audio_seconds_decoded, 1),
+            "real_time_factor": round(average_rtf, 3),
+            "last_real_time_factor": round(self._last_real_time_factor, 3),
+            "words_deduplicated": self._words_deduplicated,
+            "buffered_seconds": round(self._filled / SAMPLE_RATE, 2),
+            "partial": self._partial_text,
+        }
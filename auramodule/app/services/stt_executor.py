@@ -0,0 +1,265 @@
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+from app.core.config import settings
+from app.services.metrics import metrics, RATIO_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+LATENCY_WINDOW = 200
+
+STT_QUEUE_DEPTH = metrics.gauge("aura_stt_queue_depth", "Speech jobs waiting for the worker", ["priority"])
+
+STT_QUEUE_WAIT_SECONDS = metrics.histogram("aura_stt_queue_wait_seconds", "Time speech jobs wait for the worker", ["priority"])
+
+STT_DECODE_SECONDS = metrics.histogram("aura_stt_decode_seconds", "Whisper decode time", ["mode"])
+
+STT_REAL_TIME_FACTOR = metrics.histogram(
+    "aura_stt_real_time_factor",
+    "Whisper decode time divided by audio duration",
+    ["mode"],
+    RATIO_BUCKETS,
+)
+
+
+#------This Class handles the error raised when the speech queue rejects a job----------
+class SttQueueFullError(RuntimeError):
+    pass
+
+
+#------This Class handles the error raised when a job is submitted after the executor stopped----------
+class SttExecutorStoppedError(RuntimeError):
+    pass
+
+
+#------This Class handles one queued speech job----------
+class SttJob:
+
+    def __init__(self, priority: int, sequence: int, fn: Callable, args: tuple, kwargs: dict):
+        self.priority = priority
+        self.sequence = sequence
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+
+    def __lt__(self, other: "SttJob") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+#------This Class handles the dedicated speech worker thread and its priority queue----------
+class SpeechExecutor:
+
+    def __init__(self, max_queue: Optional[int] = None):
+        self.max_queue = max_queue or settings.stt_queue_size
+        self._queue: List[SttJob] = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stopped = False
+        self._current: Optional[SttJob] = None
+
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "evicted": 0,
+        }
+        self._wait_seconds: Dict[int, Deque[float]] = {
+            priority: deque(maxlen=LATENCY_WINDOW) for priority in PRIORITY_NAMES
+        }
+        self._run_seconds: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._wait_histograms = {
+            priority: STT_QUEUE_WAIT_SECONDS.labels(name) for priority, name in PRIORITY_NAMES.items()
+        }
+        for name in PRIORITY_NAMES.values():
+            STT_QUEUE_DEPTH.labels(name).set_function(lambda name=name: self.queue_depth()[name])
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._worker_loop, daemon=True, name="SpeechExecutor"
+            )
+            self._thread.start()
+        logger.info(f"[STT-EXEC] Speech worker started (queue size {self.max_queue})")
+
+    def stop(self, timeout: float = 5.0):
+        with self._condition:
+            self._stopped = True
+            if not self._running:
+                return
+            self._running = False
+            pending, self._queue = self._queue, []
+            self._condition.notify_all()
+
+        for job in pending:
+            if job.future.cancel():
+                self._counters["cancelled"] += 1
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning("[STT-EXEC] Speech worker did not stop gracefully")
+        self._thread = None
+        logger.info("[STT-EXEC] Speech worker stopped")
+
+    def submit(self, priority: int, fn: Callable, *args, **kwargs) -> Future:
+        with self._condition:
+            job = SttJob(priority, next(self._sequence), fn, args, kwargs)
+            if self._stopped:
+                self._counters["rejected"] += 1
+                job.future.set_exception(SttExecutorStoppedError("Speech worker has been stopped"))
+                return job.future
+            if not self._running:
+                self.start()
+            self._counters["submitted"] += 1
+
+            if len(self._queue) >= self.max_queue:
+                worst = max(self._queue)
+                if worst.priority <= priority:
+                    self._counters["rejected"] += 1
+                    job.future.set_exception(SttQueueFullError(
+                        f"Speech queue full ({len(self._queue)} jobs)"
+                    ))
+                    logger.warning(
+                        f"[STT-EXEC] Rejected {PRIORITY_NAMES.get(priority, priority)} job, queue full"
+                    )
+                    return job.future
+
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                self._counters["evicted"] += 1
+                worst.future.set_exception(SttQueueFullError(
+                    "Evicted by a higher-priority speech job"
+                ))
+
+            heapq.heappush(self._queue, job)
+            self._condition.notify()
+        return job.future
+
+    async def run(self, priority: int, fn: Callable, *args, **kwargs) -> Any:
+        future = self.submit(priority, fn, *args, **kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self.cancel(future)
+            raise
+
+    def cancel(self, future: Future) -> bool:
+        with self._condition:
+            for job in self._queue:
+                if job.future is future:
+                    self._queue.remove(job)
+                    heapq.heapify(self._queue)
+                    break
+        cancelled = future.cancel()
+        if cancelled:
+            self._counters["cancelled"] += 1
+        return cancelled
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                job = heapq.heappop(self._queue)
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            job.started_at = time.time()
+            self._current = job
+            self._wait_seconds[job.priority].append(job.started_at - job.submitted_at)
+            self._wait_histograms[job.priority].observe(job.started_at - job.submitted_at)
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                self._counters["failed"] += 1
+                logger.error(f"[STT-EXEC] Speech job failed: {type(e).__name__}: {e}")
+                job.future.set_exception(e)
+            else:
+                self._counters["completed"] += 1
+                job.future.set_result(result)
+            finally:
+                self._run_seconds.append(time.time() - job.started_at)
+                self._current = None
+
+    def queue_depth(self) -> Dict[str, int]:
+        with self._condition:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for job in self._queue:
+                depth[PRIORITY_NAMES.get(job.priority, str(job.priority))] += 1
+        return depth
+
+    def get_stats(self) -> dict:
+        current = self._current
+
+        return {
+            "running": self._running,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth(),
+            "busy": current is not None,
+            "current_job_seconds": (
+                round(time.time() - current.started_at, 2)
+                if current and current.started_at else None
+            ),
+            **self._counters,
+            "wait_ms": {
+                PRIORITY_NAMES[priority]: summarise_latency(samples)
+                for priority, samples in self._wait_seconds.items()
+            },
+            "run_ms": summarise_latency(self._run_seconds),
+        }
+
+
+#------This Function records one Whisper decode and its real-time factor----------
+def record_decode(mode: str, decode_seconds: float, audio_seconds: float):
+    STT_DECODE_SECONDS.labels(mode).observe(decode_seconds)
+    if audio_seconds > 0:
+        STT_REAL_TIME_FACTOR.labels(mode).observe(decode_seconds / audio_seconds)
+
+
+#------This Function summarises a window of latency samples in milliseconds----------
+def summarise_latency(samples: Deque[float]) -> dict:
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p95": 0.0, "max": 0.0}
+
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p95": round(ordered[p95_index] * 1000, 1),
+        "max": round(ordered[-1] * 1000, 1),
+    }
+
+
+
+stt_executor = SpeechExecutor()
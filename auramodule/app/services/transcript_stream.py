@@ -0,0 +1,83 @@
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from app.services.ws_broadcaster import ws_broadcaster
+
+logger = logging.getLogger(__name__)
+
+
+#------This Class handles pushing transcript events to subscribed clients----------
+class TranscriptStream:
+
+    def __init__(self):
+        self._subscribers: Dict[Any, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._published = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribers(self) -> List[Any]:
+        return list(self._subscribers)
+
+    def is_subscribed(self, ws: Any) -> bool:
+        return ws in self._subscribers
+
+    def subscribe(self, ws: Any) -> bool:
+        if ws in self._subscribers:
+            return False
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        ws_broadcaster.register(ws)
+        self._subscribers[ws] = time.time()
+        logger.info(f"[STREAM] Client subscribed ({len(self._subscribers)} total)")
+        return True
+
+    def unsubscribe(self, ws: Any) -> bool:
+        subscribed_at = self._subscribers.pop(ws, None)
+        if subscribed_at is None:
+            return False
+        logger.info(
+            f"[STREAM] Client unsubscribed after {time.time() - subscribed_at:.0f}s "
+            f"({len(self._subscribers)} remaining)"
+        )
+        return True
+
+    def publish(self, message: Dict[str, Any]):
+        if self._loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._fan_out(message)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fan_out, message)
+
+    def _fan_out(self, message: Dict[str, Any]):
+        if not self._subscribers:
+            return
+        self._published += 1
+        for ws in list(self._subscribers):
+            if not ws_broadcaster.is_registered(ws):
+                self._subscribers.pop(ws, None)
+        ws_broadcaster.send_many(self._subscribers, message)
+
+    def get_stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self._published,
+        }
+
+
+
+transcript_stream = TranscriptStream()
@@ -0,0 +1,227 @@
+
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_RATE = 16000
+
+ENERGY_RATIOS = (2.0, 2.5, 3.0, 4.0)
+MIN_BAND_RATIOS = (0.5, 0.6, 0.7, 0.8)
+MAX_FLATNESS = (0.6, 0.5, 0.4, 0.3)
+SILERO_THRESHOLDS = (0.35, 0.5, 0.65, 0.8)
+
+
+#------This Class handles the common interface of voice activity detectors----------
+class VoiceActivityDetector:
+
+    name = "base"
+    frame_samples = 480
+
+    def __init__(self, aggressiveness: int = 2):
+        self.aggressiveness = max(0, min(3, aggressiveness))
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+#------This Class handles energy plus spectral-shape voice detection----------
+class EnergySpectralVad(VoiceActivityDetector):
+
+    name = "energy"
+    frame_samples = 480
+    ABSOLUTE_FLOOR = 0.004
+    SPEECH_BAND_HZ = (80.0, 4000.0)
+
+    def __init__(self, aggressiveness: int = 2):
+        super().__init__(aggressiveness)
+        self._window = np.hanning(self.frame_samples).astype(np.float32)
+        frequencies = np.fft.rfftfreq(self.frame_samples, 1.0 / SAMPLE_RATE)
+        low, high = self.SPEECH_BAND_HZ
+        self._band_mask = (frequencies >= low) & (frequencies <= high)
+        self.noise_floor = self.ABSOLUTE_FLOOR / 2
+
+    def reset(self):
+        self.noise_floor = self.ABSOLUTE_FLOOR / 2
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        energy_threshold = max(
+            self.ABSOLUTE_FLOOR, self.noise_floor * ENERGY_RATIOS[self.aggressiveness]
+        )
+
+        speech = False
+        if rms > energy_threshold:
+            power = np.abs(np.fft.rfft(frame * self._window)) ** 2 + 1e-12
+            total_power = float(power.sum())
+            band_ratio = float(power[self._band_mask].sum()) / total_power
+            flatness = float(np.exp(np.mean(np.log(power)))) / (total_power / power.size)
+            speech = (
+                band_ratio >= MIN_BAND_RATIOS[self.aggressiveness]
+                and flatness <= MAX_FLATNESS[self.aggressiveness]
+            )
+
+        if not speech:
+            self.noise_floor += 0.05 * (rms - self.noise_floor)
+        elif rms < self.noise_floor:
+            self.noise_floor = rms
+        return speech
+
+
+#------This Class handles the optional Silero neural VAD bundled with faster-whisper----------
+class SileroVad(VoiceActivityDetector):
+
+    name = "silero"
+    frame_samples = 512
+    CONTEXT_FRAMES = 8
+
+    def __init__(self, aggressiveness: int = 2):
+        super().__init__(aggressiveness)
+        from faster_whisper.vad import get_vad_model
+        self._model = get_vad_model()
+        self._history: Deque[np.ndarray] = deque(maxlen=self.CONTEXT_FRAMES)
+
+    def reset(self):
+        self._history.clear()
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        self._history.append(frame.astype(np.float32, copy=False))
+        probabilities = self._model(np.concatenate(self._history))
+        return float(np.ravel(probabilities)[-1]) >= SILERO_THRESHOLDS[self.aggressiveness]
+
+
+#------This Function builds the configured voice activity detector----------
+def create_vad(backend: Optional[str] = None, aggressiveness: Optional[int] = None) -> VoiceActivityDetector:
+    backend = (backend or settings.vad_backend or "energy").lower()
+    aggressiveness = settings.vad_aggressiveness if aggressiveness is None else aggressiveness
+
+    if backend == "silero":
+        try:
+            return SileroVad(aggressiveness)
+        except Exception as e:
+            logger.warning(f"[VAD] Silero VAD unavailable ({e}), using energy VAD")
+
+    return EnergySpectralVad(aggressiveness)
+
+
+#------This Class handles splitting a live stream into utterances----------
+class UtteranceSegmenter:
+
+    START_FRAMES = 2
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        on_utterance: Callable[[np.ndarray], None],
+        pre_roll_seconds: Optional[float] = None,
+        end_of_utterance_seconds: Optional[float] = None,
+        min_utterance_seconds: float = 0.4,
+        max_utterance_seconds: float = 30.0,
+    ):
+        self.vad = vad
+        self._on_utterance = on_utterance
+        frame_seconds = vad.frame_samples / SAMPLE_RATE
+
+        pre_roll = settings.vad_pre_roll_seconds if pre_roll_seconds is None else pre_roll_seconds
+        end_timeout = (
+            settings.vad_end_of_utterance_seconds
+            if end_of_utterance_seconds is None else end_of_utterance_seconds
+        )
+        self._pre_roll: Deque[np.ndarray] = deque(maxlen=max(1, int(pre_roll / frame_seconds)))
+        self._end_frames = max(1, int(end_timeout / frame_seconds))
+        self._min_frames = int(min_utterance_seconds / frame_seconds)
+        self._max_frames = int(max_utterance_seconds / frame_seconds)
+
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._utterance: List[np.ndarray] = []
+        self._speech_run = 0
+        self._silence_run = 0
+        self._in_speech = False
+
+        self.utterances_emitted = 0
+        self.utterances_rejected = 0
+        self.speech_seconds = 0.0
+
+    def set_end_of_utterance(self, seconds: float):
+        self._end_frames = max(1, int(seconds * SAMPLE_RATE / self.vad.frame_samples))
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._utterance = []
+        self._pre_roll.clear()
+        self._speech_run = 0
+        self._silence_run = 0
+        self._in_speech = False
+        self.vad.reset()
+
+    def feed(self, samples: np.ndarray):
+        frame_samples = self.vad.frame_samples
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+        else:
+            samples = np.array(samples, dtype=np.int16, copy=True)
+
+        frame_count = samples.size // frame_samples
+        self._pending = samples[frame_count * frame_samples:].copy()
+        if not frame_count:
+            return
+
+        frames = samples[:frame_count * frame_samples].reshape(frame_count, frame_samples)
+        waveform = frames.astype(np.float32) / 32768.0
+        for index in range(frame_count):
+            self._accept_frame(frames[index], self.vad.is_speech(waveform[index]))
+
+    def _accept_frame(self, frame: np.ndarray, speech: bool):
+        if not self._in_speech:
+            self._pre_roll.append(frame)
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.START_FRAMES:
+                self._in_speech = True
+                self._utterance = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silence_run = 0
+            return
+
+        self._utterance.append(frame)
+        self._silence_run = 0 if speech else self._silence_run + 1
+
+        if self._silence_run >= self._end_frames or len(self._utterance) >= self._max_frames:
+            self._finish_utterance()
+
+    def _finish_utterance(self):
+        trailing_silence = max(0, self._silence_run - max(1, self._end_frames // 3))
+        frames = self._utterance[:len(self._utterance) - trailing_silence]
+        self._utterance = []
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+        if len(frames) < self._min_frames:
+            self.utterances_rejected += 1
+            return
+
+        samples = np.concatenate(frames)
+        self.utterances_emitted += 1
+        self.speech_seconds += samples.size / SAMPLE_RATE
+        try:
+            self._on_utterance(samples)
+        except Exception as e:
+            logger.warning(f"[VAD] Utterance callback error: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "vad": self.vad.name,
+            "aggressiveness": self.vad.aggressiveness,
+            "in_speech": self._in_speech,
+            "end_of_utterance_seconds": self._end_frames * self.vad.frame_samples / SAMPLE_RATE,
+            "utterances_emitted": self.utterances_emitted,
+            "utterances_rejected": self.utterances_rejected,
+            "speech_seconds": round(self.speech_seconds, 1),
+        }
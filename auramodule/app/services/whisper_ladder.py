@@ -0,0 +1,229 @@
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from app.core.config import settings
+from app.services.stt_executor import stt_executor
+from app.services.whisper_registry import whisper_registry
+
+logger = logging.getLogger(__name__)
+
+
+MODEL_SIZES = ["large-v3", "large-v2", "medium", "small", "base", "tiny"]
+
+HISTORY_SIZE = 50
+
+
+#------This Class handles one rung of the Whisper degradation ladder----------
+class LadderTier:
+
+    def __init__(self, model: str, beam_size: int, vad_aggressiveness: int):
+        self.model = model
+        self.beam_size = max(1, beam_size)
+        self.vad_aggressiveness = max(0, min(3, vad_aggressiveness))
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}/beam{self.beam_size}/vad{self.vad_aggressiveness}"
+
+    def as_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "beam_size": self.beam_size,
+            "vad_aggressiveness": self.vad_aggressiveness,
+        }
+
+
+#------This Function builds the ladder from settings or from the configured model----------
+def build_ladder(spec: Optional[str] = None, model: Optional[str] = None) -> List[LadderTier]:
+    spec = settings.whisper_ladder if spec is None else spec
+    if spec:
+        tiers = []
+        for rung in spec.split(","):
+            size, beam_size, vad_level = rung.strip().split(":")
+            tiers.append(LadderTier(size, int(beam_size), int(vad_level)))
+        return tiers
+
+    model = model or settings.whisper_model
+    tiers = [
+        LadderTier(model, 3, 1),
+        LadderTier(model, 1, 2),
+    ]
+    if model in MODEL_SIZES:
+        for smaller in MODEL_SIZES[MODEL_SIZES.index(model) + 1:]:
+            tiers.append(LadderTier(smaller, 1, 3))
+    return tiers
+
+
+#------This Class handles stepping Whisper quality up and down with load----------
+class AdaptiveWhisperController:
+
+    CHECK_INTERVAL = 5.0
+    MIN_DWELL_SECONDS = 30.0
+    LAG_HIGH_SECONDS = 4.0
+    LAG_LOW_SECONDS = 1.0
+    RTF_HIGH = 0.9
+    RTF_LOW = 0.5
+    CPU_HIGH = 0.9
+    CPU_LOW = 0.6
+    CHECKS_BEFORE_DOWN = 2
+    CHECKS_BEFORE_UP = 6
+
+    def __init__(self, tiers: Optional[List[LadderTier]] = None):
+        self._tiers = tiers
+        self.tier_index = 0
+        self._transcriber = None
+        self._lag_source: Optional[Callable[[], float]] = None
+        self._vads: List = []
+        self._history: Deque[dict] = deque(maxlen=HISTORY_SIZE)
+        self._behind_checks = 0
+        self._headroom_checks = 0
+        self._last_switch = 0.0
+        self._last_signals: dict = {}
+        self._last_cpu = (time.time(), time.process_time())
+        self._running = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tiers(self) -> List[LadderTier]:
+        if self._tiers is None:
+            self._tiers = build_ladder()
+        return self._tiers
+
+    @property
+    def current_tier(self) -> LadderTier:
+        return self.tiers[self.tier_index]
+
+    def attach(self, transcriber, lag_source: Callable[[], float]):
+        self._transcriber = transcriber
+        self._lag_source = lag_source
+        if settings.whisper_adaptive:
+            self._apply(self.current_tier)
+
+    def register_vad(self, vad):
+        self._vads.append(vad)
+        if settings.whisper_adaptive:
+            vad.aggressiveness = self.current_tier.vad_aggressiveness
+
+    def unregister_vad(self, vad):
+        if vad in self._vads:
+            self._vads.remove(vad)
+
+    def start(self):
+        if self._running or not settings.whisper_adaptive:
+            return
+        self._running = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._control_loop, daemon=True, name="WhisperLadder")
+        self._thread.start()
+        logger.info(f"[LADDER] Adaptive control started at {self.current_tier.name}")
+
+    def stop(self):
+        self._running = False
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=3)
+        self._thread = None
+
+    def _control_loop(self):
+        while not self._stop.wait(self.CHECK_INTERVAL):
+            try:
+                self.evaluate()
+            except Exception as e:
+                logger.warning(f"[LADDER] Evaluation error: {e}")
+
+    def _cpu_fraction(self) -> float:
+        now, cpu_now = time.time(), time.process_time()
+        wall_then, cpu_then = self._last_cpu
+        self._last_cpu = (now, cpu_now)
+        elapsed = now - wall_then
+        if elapsed <= 0:
+            return 0.0
+        return (cpu_now - cpu_then) / (elapsed * (os.cpu_count() or 1))
+
+    def _read_signals(self) -> dict:
+        stats = self._transcriber.get_stats() if self._transcriber else {}
+        return {
+            "lag_seconds": round(self._lag_source(), 2) if self._lag_source else 0.0,
+            "real_time_factor": stats.get("last_real_time_factor", 0.0),
+            "cpu": round(self._cpu_fraction(), 2),
+            "stt_queue": stt_executor.queue_depth().get("background", 0),
+        }
+
+    def evaluate(self):
+        signals = self._read_signals()
+        self._last_signals = signals
+
+        behind = (
+            signals["lag_seconds"] > self.LAG_HIGH_SECONDS
+            or signals["real_time_factor"] > self.RTF_HIGH
+            or signals["stt_queue"] > 2
+        )
+        headroom = (
+            signals["lag_seconds"] < self.LAG_LOW_SECONDS
+            and signals["real_time_factor"] < self.RTF_LOW
+            and signals["cpu"] < self.CPU_LOW
+        )
+        if signals["cpu"] > self.CPU_HIGH and signals["lag_seconds"] > self.LAG_LOW_SECONDS:
+            behind = True
+
+        self._behind_checks = self._behind_checks + 1 if behind else 0
+        self._headroom_checks = self._headroom_checks + 1 if headroom else 0
+
+        if time.time() - self._last_switch < self.MIN_DWELL_SECONDS:
+            return
+
+        if self._behind_checks >= self.CHECKS_BEFORE_DOWN and self.tier_index < len(self.tiers) - 1:
+            self.switch_to(self.tier_index + 1, "behind", signals)
+        elif self._headroom_checks >= self.CHECKS_BEFORE_UP and self.tier_index > 0:
+            self.switch_to(self.tier_index - 1, "headroom", signals)
+
+    def switch_to(self, index: int, reason: str, signals: Optional[dict] = None):
+        with self._lock:
+            previous = self.current_tier
+            target = self.tiers[index]
+            try:
+                self._apply(target)
+            except Exception as e:
+                logger.error(f"[LADDER] Could not switch to {target.name}: {e}")
+                return
+
+            self.tier_index = index
+            self._last_switch = time.time()
+            self._behind_checks = 0
+            self._headroom_checks = 0
+            self._history.append({
+                "time": self._last_switch,
+                "from": previous.name,
+                "to": target.name,
+                "reason": reason,
+                "signals": signals or {},
+            })
+        logger.info(f"[LADDER] {previous.name} -> {target.name} ({reason})")
+
+    def _apply(self, tier: LadderTier):
+        if self._transcriber is not None:
+            model = whisper_registry.get_model(size=tier.model, warm_up=True)
+            self._transcriber.set_model(model, tier.beam_size)
+        for vad in self._vads:
+            vad.aggressiveness = tier.vad_aggressiveness
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": settings.whisper_adaptive,
+            "running": self._running,
+            "tier_index": self.tier_index,
+            "tier": self.current_tier.as_dict(),
+            "tiers": [tier.name for tier in self.tiers],
+            "signals": self._last_signals,
+            "history": list(self._history),
+        }
+
+
+
+whisper_ladder = AdaptiveWhisperController()
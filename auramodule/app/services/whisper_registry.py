@@ -0,0 +1,261 @@
+
+import importlib.util
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+FASTER_WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+if not FASTER_WHISPER_AVAILABLE:
+    logger.warning("[WHISPER] faster-whisper not available - transcription disabled")
+
+
+ModelKey = Tuple[str, str, str]
+
+CPU_COMPUTE_TYPES = {"int8", "int8_float32", "int16", "float32"}
+
+
+#------This Function reads the resident memory of the module process----------
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+#------This Class handles one loaded Whisper model shared across callers----------
+class SharedWhisperModel:
+
+    def __init__(self, key: ModelKey, model: Any, load_seconds: float, memory_bytes: int):
+        self.key = key
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.use_count = 0
+        self.last_used: Optional[float] = None
+        self.warmed_up = False
+        self._lock = threading.Lock()
+        self._batched_pipeline = None
+
+    @property
+    def size(self) -> str:
+        return self.key[0]
+
+    @property
+    def is_busy(self) -> bool:
+        return self._lock.locked()
+
+    def transcribe(self, audio: np.ndarray, **options) -> Tuple[List[Any], Any]:
+        with self._lock:
+            segments, info = self.model.transcribe(audio, **options)
+            segments = list(segments)
+            self.use_count += 1
+            self.last_used = time.time()
+        return segments, info
+
+    def transcribe_batched(self, audio: np.ndarray, **options) -> Tuple[List[Any], Any]:
+        with self._lock:
+            if self._batched_pipeline is None:
+                from faster_whisper import BatchedInferencePipeline
+                self._batched_pipeline = BatchedInferencePipeline(model=self.model)
+            segments, info = self._batched_pipeline.transcribe(audio, **options)
+            segments = list(segments)
+            self.use_count += 1
+            self.last_used = time.time()
+        return segments, info
+
+    def warm_up(self):
+        if self.warmed_up:
+            return
+
+        start_time = time.time()
+        silence = np.zeros(16000, dtype=np.float32)
+        try:
+            self.transcribe(silence, language="en", beam_size=1, vad_filter=False)
+            self.warmed_up = True
+            logger.info(
+                f"[WHISPER] Warmed up {self.size} in {time.time() - start_time:.2f}s"
+            )
+        except Exception as e:
+            logger.warning(f"[WHISPER] Warm-up failed for {self.size}: {e}")
+
+    def get_status(self) -> dict:
+        size, device, compute_type = self.key
+        return {
+            "model": size,
+            "device": device,
+            "compute_type": compute_type,
+            "load_seconds": round(self.load_seconds, 2),
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+            "use_count": self.use_count,
+            "last_used": self.last_used,
+            "warmed_up": self.warmed_up,
+            "busy": self.is_busy,
+        }
+
+
+#------This Class handles the registry of shared Whisper model instances----------
+class WhisperModelRegistry:
+
+    def __init__(self):
+        self._models: Dict[ModelKey, SharedWhisperModel] = {}
+        self._load_errors: Dict[ModelKey, str] = {}
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._cuda_available: Optional[bool] = None
+
+    def _has_cuda(self) -> bool:
+        if self._cuda_available is None:
+            try:
+                import ctranslate2
+                self._cuda_available = ctranslate2.get_cuda_device_count() > 0
+            except Exception:
+                self._cuda_available = False
+        return self._cuda_available
+
+    def resolve_device(self, device: Optional[str] = None) -> str:
+        requested = (device or settings.whisper_device or "auto").lower()
+        if requested == "auto":
+            return "cuda" if self._has_cuda() else "cpu"
+        if requested == "cuda" and not self._has_cuda():
+            logger.warning("[WHISPER] CUDA requested but not available, falling back to CPU")
+            return "cpu"
+        return requested
+
+    def resolve_compute_type(self, device: str, compute_type: Optional[str] = None) -> str:
+        requested = (compute_type or settings.whisper_compute_type or "auto").lower()
+        if requested == "auto":
+            return "int8_float16" if device == "cuda" else "int8"
+        if device == "cpu" and requested not in CPU_COMPUTE_TYPES:
+            logger.warning(
+                f"[WHISPER] compute_type '{requested}' is not efficient on CPU, using int8"
+            )
+            return "int8"
+        return requested
+
+    def resolve_key(
+        self,
+        size: Optional[str] = None,
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None,
+    ) -> ModelKey:
+        resolved_device = self.resolve_device(device)
+        return (
+            size or settings.whisper_model,
+            resolved_device,
+            self.resolve_compute_type(resolved_device, compute_type),
+        )
+
+    def get_model(
+        self,
+        size: Optional[str] = None,
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None,
+        warm_up: bool = False,
+    ) -> SharedWhisperModel:
+        key = self.resolve_key(size, device, compute_type)
+
+        with self._lock:
+            shared = self._models.get(key)
+            if shared is None:
+                if key in self._load_errors:
+                    raise RuntimeError(f"Whisper model failed to load: {self._load_errors[key]}")
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        if shared is None:
+            with key_lock:
+                shared = self._models.get(key) or self._load_model(key)
+
+        if warm_up:
+            shared.warm_up()
+        return shared
+
+    def _load_model(self, key: ModelKey) -> SharedWhisperModel:
+        size, device, compute_type = key
+
+        if not FASTER_WHISPER_AVAILABLE:
+            error = "faster-whisper not installed"
+            self._load_errors[key] = error
+            raise RuntimeError(error)
+
+        logger.info(f"[WHISPER] Loading faster-whisper model: {size} ({device}, {compute_type})")
+        start_time = time.time()
+        rss_before = _current_rss_bytes()
+
+        try:
+            from faster_whisper import WhisperModel
+            model = WhisperModel(size, device=device, compute_type=compute_type)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self._load_errors[key] = error
+            logger.error(f"[WHISPER] Failed to load Whisper model: {error}")
+            raise RuntimeError(error)
+
+        load_seconds = time.time() - start_time
+        memory_bytes = max(0, _current_rss_bytes() - rss_before)
+        shared = SharedWhisperModel(key, model, load_seconds, memory_bytes)
+
+        with self._lock:
+            self._models[key] = shared
+
+        logger.info(
+            f"[WHISPER] Loaded {size} ({device}, {compute_type}) in {load_seconds:.2f}s, "
+            f"~{memory_bytes / (1024 * 1024):.0f}MB"
+        )
+        return shared
+
+    def is_loaded(
+        self,
+        size: Optional[str] = None,
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None,
+    ) -> bool:
+        key = self.resolve_key(size, device, compute_type)
+        with self._lock:
+            return key in self._models
+
+    def get_load_error(
+        self,
+        size: Optional[str] = None,
+        device: Optional[str] = None,
+        compute_type: Optional[str] = None,
+    ) -> Optional[str]:
+        key = self.resolve_key(size, device, compute_type)
+        with self._lock:
+            return self._load_errors.get(key)
+
+    def unload(self, size: str, device: Optional[str] = None, compute_type: Optional[str] = None):
+        key = self.resolve_key(size, device, compute_type)
+        with self._lock:
+            shared = self._models.pop(key, None)
+        if shared:
+            logger.info(f"[WHISPER] Unloaded {size} ({key[1]}, {key[2]})")
+
+    def get_status(self) -> dict:
+        with self._lock:
+            models = [shared.get_status() for shared in self._models.values()]
+            errors = {"/".join(key): error for key, error in self._load_errors.items()}
+
+        return {
+            "models": models,
+            "total_memory_mb": round(sum(m["memory_mb"] for m in models), 1),
+            "errors": errors,
+        }
+
+
+
+whisper_registry = WhisperModelRegistry()
@@ -0,0 +1,221 @@
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from aiohttp import WSCloseCode
+from app.core.config import settings
+from app.services.metrics import metrics
+from app.services.stt_executor import summarise_latency
+from app.services.ws_codec import ENCODING_JSON, Payload, encode
+
+logger = logging.getLogger(__name__)
+
+
+COALESCED_TYPES = {"visible_people", "transcript_partial"}
+
+LAG_WINDOW = 200
+
+WS_QUEUED = metrics.gauge("aura_ws_outbound_queued", "Messages waiting in client outbound queues")
+
+WS_SENT = metrics.counter("aura_ws_messages_sent_total", "Messages written to WebSocket clients")
+
+WS_DROPPED = metrics.counter("aura_ws_messages_dropped_total", "Messages dropped from full client queues")
+
+WS_SLOW_DISCONNECTS = metrics.counter("aura_ws_slow_disconnects_total", "Clients closed for falling behind")
+
+WS_SEND_LAG_SECONDS = metrics.histogram("aura_ws_send_lag_seconds", "Time from enqueue to write for WebSocket messages")
+
+
+#------This Class handles one queued outbound message----------
+class OutboundMessage:
+
+    def __init__(self, payload: Payload, coalesce_key: Optional[str]):
+        self.payload = payload
+        self.coalesce_key = coalesce_key
+        self.enqueued_at = time.monotonic()
+
+
+#------This Class handles the bounded outbound queue and writer task of one client----------
+class ClientChannel:
+
+    def __init__(self, ws: Any, queue_size: int, encoding: str = ENCODING_JSON):
+        self.ws = ws
+        self.queue_size = queue_size
+        self.encoding = encoding
+        self.queue: Deque[OutboundMessage] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.lag_seconds: Deque[float] = deque(maxlen=LAG_WINDOW)
+        self.closing = False
+
+    def put(self, message: OutboundMessage):
+        if message.coalesce_key:
+            for index, queued in enumerate(self.queue):
+                if queued.coalesce_key == message.coalesce_key:
+                    message.enqueued_at = queued.enqueued_at
+                    self.queue[index] = message
+                    self.coalesced += 1
+                    return
+        if len(self.queue) >= self.queue_size:
+            self.queue.popleft()
+            self.dropped += 1
+            WS_DROPPED.inc()
+        self.queue.append(message)
+        self.ready.set()
+
+    def get_stats(self) -> dict:
+        oldest = self.queue[0].enqueued_at if self.queue else None
+        return {
+            "encoding": self.encoding,
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "bytes_sent": self.bytes_sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "head_lag_ms": round((time.monotonic() - oldest) * 1000, 1) if oldest else 0.0,
+            "lag_ms": summarise_latency(self.lag_seconds),
+            "connected_seconds": round(time.time() - self.connected_at, 1),
+        }
+
+
+#------This Class handles fan-out to WebSocket clients without letting one slow client stall the rest----------
+class WsBroadcaster:
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        max_lag_seconds: Optional[float] = None,
+    ):
+        self.queue_size = max(1, queue_size or settings.ws_send_queue_size)
+        self.send_timeout = send_timeout or settings.ws_send_timeout
+        self.max_lag_seconds = max_lag_seconds or settings.ws_max_lag_seconds
+        self._channels: Dict[Any, ClientChannel] = {}
+        self._counters = {
+            "broadcasts": 0,
+            "messages": 0,
+            "send_errors": 0,
+            "slow_disconnects": 0,
+        }
+        WS_QUEUED.set_function(lambda: sum(len(channel.queue) for channel in self._channels.values()))
+        WS_SLOW_DISCONNECTS.set_function(lambda: self._counters["slow_disconnects"])
+
+    def register(self, ws: Any, encoding: str = ENCODING_JSON) -> ClientChannel:
+        channel = self._channels.get(ws)
+        if channel is None:
+            channel = ClientChannel(ws, self.queue_size, encoding)
+            channel.task = asyncio.create_task(self._writer(channel))
+            self._channels[ws] = channel
+        return channel
+
+    def unregister(self, ws: Any):
+        channel = self._channels.pop(ws, None)
+        if channel and channel.task:
+            channel.task.cancel()
+
+    def is_registered(self, ws: Any) -> bool:
+        return ws in self._channels
+
+    def send(self, ws: Any, message: Dict[str, Any], coalesce_key: Optional[str] = None) -> bool:
+        return self.send_many([ws], message, coalesce_key) > 0
+
+    def send_many(
+        self,
+        targets: Iterable[Any],
+        message: Dict[str, Any],
+        coalesce_key: Optional[str] = None,
+    ) -> int:
+        channels = [self._channels[ws] for ws in targets if ws in self._channels]
+        if not channels:
+            return 0
+        if coalesce_key is None and message.get("type") in COALESCED_TYPES:
+            coalesce_key = message["type"]
+
+        payloads: Dict[str, Payload] = {}
+        for channel in channels:
+            if channel.closing:
+                continue
+            payload = payloads.get(channel.encoding)
+            if payload is None:
+                payload = payloads[channel.encoding] = encode(message, channel.encoding)
+            channel.put(OutboundMessage(payload, coalesce_key))
+        self._counters["messages"] += len(channels)
+        return len(channels)
+
+    def broadcast(self, message: Dict[str, Any], coalesce_key: Optional[str] = None) -> int:
+        self._counters["broadcasts"] += 1
+        return self.send_many(list(self._channels), message, coalesce_key)
+
+    async def _writer(self, channel: ClientChannel):
+        ws = channel.ws
+        try:
+            while True:
+                if not channel.queue:
+                    channel.ready.clear()
+                    await channel.ready.wait()
+                    continue
+                message = channel.queue.popleft()
+                if ws.closed:
+                    break
+
+                lag = time.monotonic() - message.enqueued_at
+                channel.lag_seconds.append(lag)
+                WS_SEND_LAG_SECONDS.observe(lag)
+                if lag > self.max_lag_seconds:
+                    await self._disconnect_slow(channel, f"message waited {lag:.1f}s")
+                    break
+                send = ws.send_bytes if isinstance(message.payload, bytes) else ws.send_str
+                try:
+                    await asyncio.wait_for(send(message.payload), timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    await self._disconnect_slow(channel, f"send blocked for {self.send_timeout:.1f}s")
+                    break
+                channel.sent += 1
+                WS_SENT.inc()
+                channel.bytes_sent += len(message.payload)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._counters["send_errors"] += 1
+            logger.warning(f"[WS-OUT] Failed to push to client: {type(e).__name__}: {e}")
+        finally:
+            channel.queue.clear()
+
+    async def _disconnect_slow(self, channel: ClientChannel, reason: str):
+        channel.closing = True
+        self._counters["slow_disconnects"] += 1
+        logger.warning(
+            f"[WS-OUT] Disconnecting slow client ({reason}, "
+            f"{channel.dropped} dropped, {len(channel.queue)} queued)"
+        )
+        try:
+            await asyncio.wait_for(
+                channel.ws.close(code=WSCloseCode.TRY_AGAIN_LATER, message=b"Slow consumer"),
+                timeout=self.send_timeout,
+            )
+        except Exception:
+            pass
+
+    def get_stats(self) -> dict:
+        clients: List[dict] = [channel.get_stats() for channel in self._channels.values()]
+        return {
+            "clients": len(clients),
+            "queue_size": self.queue_size,
+            "send_timeout": self.send_timeout,
+            "max_lag_seconds": self.max_lag_seconds,
+            **self._counters,
+            "dropped": sum(client["dropped"] for client in clients),
+            "max_head_lag_ms": max((client["head_lag_ms"] for client in clients), default=0.0),
+            "per_client": clients,
+        }
+
+
+
+ws_broadcaster = WsBroadcaster()
@@ -1,18 +1,42 @@
 
 import asyncio
+import hmac
 import json
 import logging
 import socket
 import time
-from typing import Optional, Set, Dict, Any
+from typing import Optional, Set, Dict, Any, List
 from aiohttp import web
 import aiohttp
 from app.services.camera import camera_service
 from app.services.face_recognition import identify_person, detect_and_crop_faces
-from app.services.speech import transcribe_audio
+from app.services.speech import (
+    pcm_to_waveform,
+    transcribe_audio,
+    validate_audio,
+    max_upload_bytes,
+    AudioTooLongError,
+    MAX_UPLOAD_BYTES,
+)
+from app.services.batch_transcriber import batch_transcriber
 from app.services.conversation import analyze_conversation
+from app.services.llm_client import ollama_client, parse_partial_json
+from app.services.llm_scheduler import llm_scheduler, PRIORITY_INTERACTIVE
+from app.services.analysis_cache import analysis_cache
+from app.services.fast_extractor import fast_extractor
 from app.services.microphone import mic_service
+from app.services.audio_capture import audio_capture
+from app.services.whisper_registry import whisper_registry
+from app.services.stt_executor import stt_executor
+from app.services.transcript_stream import transcript_stream
+from app.services.ws_broadcaster import ws_broadcaster
+from app.services.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.services.loop_watchdog import loop_watchdog
+from app.services.readiness import readiness, COMPONENT_CAMERA, COMPONENT_FACE, COMPONENT_SPEECH
+from app.services.ws_codec import decode, negotiate, supported_subprotocols
+from app.services.whisper_ladder import whisper_ladder
 from app.services.discovery import _get_local_ip
+from app.services.backend_client import get_backend_client
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -25,6 +49,14 @@ _client_last_activity: Dict[web.WebSocketResponse, float] = {}
 _session_auth: Dict[web.WebSocketResponse, Dict[str, str]] = {}
 
 
+_client_tasks: Dict[web.WebSocketResponse, Set[asyncio.Task]] = {}
+
+
+_server_loop: Optional[asyncio.AbstractEventLoop] = None
+_stream_analysis_buffer: List[str] = []
+_stream_analysis_task: Optional[asyncio.Task] = None
+
+
 _shutting_down = False
 _active_video_streams: Set[web.StreamResponse] = set()
 _latest_transcript: Dict[str, Any] = {
@@ -46,6 +78,18 @@ CONNECTION_TIMEOUT = settings.websocket_timeout
 
 PING_INTERVAL = 30.0
 
+STREAM_ANALYSIS_INTERVAL = 10.0
+
+ANALYSIS_PARTIAL_INTERVAL = 0.1
+
+JPEG_ENCODE_SECONDS = metrics.histogram("aura_jpeg_encode_seconds", "JPEG encode time per frame", ["endpoint"])
+JPEG_STREAM_SECONDS = JPEG_ENCODE_SECONDS.labels("video_feed")
+JPEG_SNAPSHOT_SECONDS = JPEG_ENCODE_SECONDS.labels("snapshot")
+
+metrics.gauge("aura_ws_clients", "Connected WebSocket clients").set_function(lambda: len(_connected_clients))
+
+metrics.gauge("aura_video_streams", "Open MJPEG video streams").set_function(lambda: len(_active_video_streams))
+
 
 #------This Function checks if auto face recognition should run----------
 def _should_run_auto_recognition() -> bool:
@@ -53,6 +97,7 @@ def _should_run_auto_recognition() -> bool:
         _auto_face_recognition_enabled 
         and not _shutting_down 
         and camera_service.is_running
+        and readiness.is_ready(COMPONENT_FACE)
     )
 
 
@@ -128,7 +173,7 @@ async def _run_auto_face_recognition():
                         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(current_time)),
                     }
                     
-                    await broadcast(notification)
+                    broadcast(notification)
                     logger.info(f"[AUTO-FACE] Broadcast: {person_name} identified")
             
             _last_detection_time = current_time
@@ -145,7 +190,7 @@ async def _run_auto_face_recognition():
                         "people": visible_people,
                         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(current_time)),
                     }
-                    await broadcast(status_update)
+                    broadcast(status_update)
                     
         except asyncio.CancelledError:
             break
@@ -202,6 +247,215 @@ def _validate_message(msg: dict) -> tuple[bool, Optional[str]]:
     return True, None
 
 
+#------This Function queues a reply on the client's outbound channel so only its writer task touches the socket----------
+def _send(ws: web.WebSocketResponse, message: dict) -> bool:
+    return ws_broadcaster.send(ws, message)
+
+
+#------This Function answers fast with 503 and Retry-After while a component is still loading----------
+def _not_ready_response(component: str) -> Optional[web.Response]:
+    if not readiness.is_pending(component):
+        return None
+    retry_after = readiness.retry_after()
+    return web.json_response(
+        {"error": "model_loading", "component": component, "retry_after": retry_after},
+        status=503,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+#------This Function builds the WebSocket reply for a command whose component is still loading----------
+def _not_ready_message(message_type: str, component: str) -> Optional[dict]:
+    if not readiness.is_pending(component):
+        return None
+    return {
+        "type": message_type,
+        "error": "model_loading",
+        "component": component,
+        "retry_after": readiness.retry_after(),
+    }
+
+
+#------This Function runs a per-client request without blocking its message loop----------
+def _spawn_client_task(ws: web.WebSocketResponse, coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    tasks = _client_tasks.setdefault(ws, set())
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+
+#------This Function cancels in-flight requests of a disconnected client----------
+def _cancel_client_tasks(ws: web.WebSocketResponse):
+    tasks = _client_tasks.pop(ws, set())
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        logger.info(f"[WS] Cancelled {len(tasks)} in-flight request(s) for disconnected client")
+
+
+#------This Function builds a token callback that streams partial analysis to one client----------
+def _analysis_partial_sender(ws: web.WebSocketResponse, transcript: str):
+    state = {"content": "", "sent_length": 0, "sent_at": 0.0, "fields": {}}
+
+    async def on_token(token: str):
+        state["content"] += token
+        now = time.monotonic()
+        if ws.closed or now - state["sent_at"] < ANALYSIS_PARTIAL_INTERVAL:
+            return
+
+        fields = parse_partial_json(state["content"])
+        if fields is not None:
+            state["fields"] = fields
+        if not _send(ws, {
+            "type": "analysis_partial",
+            "text": transcript,
+            "delta": state["content"][state["sent_length"]:],
+            "fields": state["fields"],
+        }):
+            return
+        state["sent_length"] = len(state["content"])
+        state["sent_at"] = now
+
+    return on_token
+
+
+#------This Function transcribes the buffered utterances for a client----------
+async def _send_transcript(ws: web.WebSocketResponse, auth: Dict[str, str]):
+    chunks = [
+        chunk for chunk in mic_service.get_pending_chunks(batch_transcriber.MAX_BATCH_SIZE)
+        if chunk.size
+    ]
+    if not chunks:
+        _send(ws, {"type": "transcript", "text": ""})
+        return
+
+    try:
+        waveforms = [pcm_to_waveform(chunk) for chunk in chunks]
+        if len(waveforms) == 1:
+            utterances = [await batch_transcriber.transcribe(waveforms[0])]
+        else:
+            utterances = await batch_transcriber.transcribe_many(waveforms)
+        transcript = " ".join(text for text in utterances if text)
+        if transcript:
+            analysis = await analyze_conversation(
+                transcript,
+                [],  
+                auth.get("patient_uid", ""),
+                auth.get("auth_token", ""),
+                priority=PRIORITY_INTERACTIVE,
+                on_token=_analysis_partial_sender(ws, transcript),
+            )
+            _latest_transcript["text"] = transcript
+            _latest_transcript["timestamp"] = time.time()
+            _latest_transcript["analysis"] = analysis or {}
+            transcript_stream.publish({
+                "type": "transcript",
+                "text": transcript,
+                "final": True,
+                "source": "utterance",
+                "analysis": analysis,
+                "timestamp": _latest_transcript["timestamp"],
+            })
+            _send(
+                ws,
+                {
+                    "type": "transcript",
+                    "text": transcript,
+                    "utterances": utterances,
+                    "speakers": [],
+                    "analysis": analysis,
+                }
+            )
+        else:
+            _send(
+                ws,
+                {"type": "transcript", "text": "", "speakers": []}
+            )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"[WS] Transcription error: {e}")
+        if not ws.closed:
+            _send(ws, {
+                "type": "transcript",
+                "error": "transcription_failed",
+                "message": str(e)
+            })
+
+
+#------This Function hands a finalised continuous transcript to the event loop----------
+def publish_transcript(text: str):
+    if _server_loop and not _server_loop.is_closed():
+        _server_loop.call_soon_threadsafe(_handle_final_transcript, text)
+
+
+#------This Function pushes a partial hypothesis to subscribed clients----------
+def publish_partial(text: str):
+    transcript_stream.publish({
+        "type": "transcript_partial",
+        "text": text,
+        "timestamp": time.time(),
+    })
+
+
+#------This Function records and pushes a finalised continuous transcript----------
+def _handle_final_transcript(text: str):
+    global _stream_analysis_task
+
+    timestamp = time.time()
+    _latest_transcript["text"] = text
+    _latest_transcript["timestamp"] = timestamp
+    transcript_stream.publish({
+        "type": "transcript",
+        "text": text,
+        "final": True,
+        "source": "continuous",
+        "timestamp": timestamp,
+    })
+
+    if not transcript_stream.has_subscribers:
+        return
+    _stream_analysis_buffer.append(text)
+    if _stream_analysis_task is None or _stream_analysis_task.done():
+        _stream_analysis_task = asyncio.create_task(_run_stream_analysis())
+
+
+#------This Function analyses buffered continuous transcripts for subscribers until the buffer stays empty----------
+async def _run_stream_analysis():
+    while True:
+        await asyncio.sleep(STREAM_ANALYSIS_INTERVAL)
+        if not _stream_analysis_buffer:
+            return
+
+        text = " ".join(_stream_analysis_buffer)
+        _stream_analysis_buffer.clear()
+
+        auth = next(
+            (_session_auth[ws] for ws in transcript_stream.subscribers() if _session_auth.get(ws)),
+            None,
+        )
+        if not auth:
+            continue
+
+        try:
+            analysis = await analyze_conversation(
+                text, [], auth.get("patient_uid", ""), auth.get("auth_token", ""),
+                store_journal=False,
+            )
+        except Exception as e:
+            logger.error(f"[STREAM] Analysis error: {e}")
+            continue
+
+        _latest_transcript["analysis"] = analysis or {}
+        transcript_stream.publish({
+            "type": "analysis",
+            "text": text,
+            "analysis": analysis,
+            "timestamp": time.time(),
+        })
+
+
 async def _cleanup_stale_connections():
     current_time = time.time()
     stale_clients = []
@@ -223,19 +477,24 @@ async def _cleanup_stale_connections():
 
 
 async def _ws_handler(request):
+    global _auto_face_recognition_enabled
+
     ws = web.WebSocketResponse(
         heartbeat=PING_INTERVAL,
         timeout=CONNECTION_TIMEOUT,
+        protocols=supported_subprotocols(),
     )
     await ws.prepare(request)
+    encoding, _ = negotiate([ws.ws_protocol or ""], request.query.get("encoding"))
     
     _connected_clients.add(ws)
     _client_last_activity[ws] = time.time()
     _session_auth[ws] = {}
+    ws_broadcaster.register(ws, encoding)
 
     client_ip = request.remote
     logger.info("=" * 60)
-    logger.info(f"[WS] CLIENT CONNECTED from {client_ip}")
+    logger.info(f"[WS] CLIENT CONNECTED from {client_ip} ({encoding})")
     logger.info(f"[WS] Total connected clients: {len(_connected_clients)}")
     logger.info("=" * 60)
 
@@ -246,17 +505,18 @@ async def _ws_handler(request):
             
             
             if _shutting_down:
-                await ws.send_json(
+                _send(
+                    ws,
                     {"type": "shutdown", "message": "Server shutting down"}
                 )
                 break
 
-            if raw_msg.type == aiohttp.WSMsgType.TEXT:
+            if raw_msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
                 try:
-                    msg = json.loads(raw_msg.data)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"[WS] Invalid JSON received: {e}")
-                    await ws.send_json({
+                    msg = decode(raw_msg.data, encoding)
+                except ValueError as e:
+                    logger.warning(f"[WS] Undecodable {encoding} message received: {e}")
+                    _send(ws, {
                         "type": "error",
                         "error": "invalid_json",
                         "message": "Message must be valid JSON"
@@ -267,7 +527,7 @@ async def _ws_handler(request):
                 is_valid, error_msg = _validate_message(msg)
                 if not is_valid:
                     logger.warning(f"[WS] Message validation failed: {error_msg}")
-                    await ws.send_json({
+                    _send(ws, {
                         "type": "error",
                         "error": "validation_error",
                         "message": error_msg
@@ -283,7 +543,7 @@ async def _ws_handler(request):
                     
                     if not token or len(token) < 10:
                         logger.warning("[WS] Invalid auth token rejected")
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "connected", 
                             "status": "error", 
                             "error": "invalid_token"
@@ -292,7 +552,7 @@ async def _ws_handler(request):
                     
                     if not patient:
                         logger.warning("[WS] Missing patient_uid rejected")
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "connected", 
                             "status": "error", 
                             "error": "missing_patient_uid"
@@ -311,21 +571,27 @@ async def _ws_handler(request):
                         await _start_auto_face_recognition_task()
                         logger.info("[AUTO-FACE] Started on first client connection")
                     
-                    await ws.send_json({"type": "connected", "status": "ok"})
+                    _send(ws, {"type": "connected", "status": "ok"})
 
                 elif cmd == "identify":
                     
                     auth = _session_auth.get(ws, {})
                     if not auth:
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "identify_result",
                             "error": "not_authenticated"
                         })
                         continue
+
+                    not_ready = _not_ready_message("identify_result", COMPONENT_FACE)
+                    if not_ready:
+                        _send(ws, not_ready)
+                        continue
                     
                     frame = camera_service.get_frame()
                     if frame is None:
-                        await ws.send_json(
+                        _send(
+                            ws,
                             {"type": "identify_result", "error": "no_frame"}
                         )
                         continue
@@ -334,10 +600,10 @@ async def _ws_handler(request):
                         results = await identify_person(
                             frame, auth.get("patient_uid", ""), auth.get("auth_token", "")
                         )
-                        await ws.send_json({"type": "identify_result", "faces": results})
+                        _send(ws, {"type": "identify_result", "faces": results})
                     except Exception as e:
                         logger.error(f"[WS] Face identification error: {e}")
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "identify_result",
                             "error": "identification_failed",
                             "message": str(e)
@@ -345,61 +611,57 @@ async def _ws_handler(request):
 
                 elif cmd == "start_listening":
                     mic_service.start()
-                    await ws.send_json({"type": "listening", "status": "started"})
+                    _send(ws, {"type": "listening", "status": "started"})
 
                 elif cmd == "stop_listening":
                     mic_service.stop()
-                    await ws.send_json({"type": "listening", "status": "stopped"})
+                    _send(ws, {"type": "listening", "status": "stopped"})
 
                 elif cmd == "get_transcript":
                     
                     auth = _session_auth.get(ws, {})
                     if not auth:
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "transcript",
                             "error": "not_authenticated"
                         })
                         continue
+
+                    not_ready = _not_ready_message("transcript", COMPONENT_SPEECH)
+                    if not_ready:
+                        _send(ws, not_ready)
+                        continue
                     
-                    chunk = mic_service.get_latest_chunk()
-                    if chunk:
-                        try:
-                            
-                            transcript = await transcribe_audio(chunk)
-                            if transcript:
-                                analysis = await analyze_conversation(
-                                    transcript,
-                                    [],  
-                                    auth.get("patient_uid", ""),
-                                    auth.get("auth_token", ""),
-                                )
-                                _latest_transcript["text"] = transcript
-                                _latest_transcript["timestamp"] = time.time()
-                                _latest_transcript["analysis"] = analysis or {}
-                                await ws.send_json(
-                                    {
-                                        "type": "transcript",
-                                        "text": transcript,
-                                        "speakers": [],
-                                        "analysis": analysis,
-                                    }
-                                )
-                            else:
-                                await ws.send_json(
-                                    {"type": "transcript", "text": "", "speakers": []}
-                                )
-                        except Exception as e:
-                            logger.error(f"[WS] Transcription error: {e}")
-                            await ws.send_json({
-                                "type": "transcript",
-                                "error": "transcription_failed",
-                                "message": str(e)
-                            })
-                    else:
-                        await ws.send_json({"type": "transcript", "text": ""})
+                    _spawn_client_task(ws, _send_transcript(ws, auth))
+
+                elif cmd == "subscribe_transcripts":
+                    
+                    if not _session_auth.get(ws):
+                        _send(ws, {
+                            "type": "subscribed",
+                            "stream": "transcripts",
+                            "error": "not_authenticated"
+                        })
+                        continue
+                    
+                    transcript_stream.subscribe(ws)
+                    _send(ws, {
+                        "type": "subscribed",
+                        "stream": "transcripts",
+                        "status": "ok",
+                        "latest": _latest_transcript,
+                    })
+
+                elif cmd == "unsubscribe_transcripts":
+                    transcript_stream.unsubscribe(ws)
+                    _send(ws, {
+                        "type": "unsubscribed",
+                        "stream": "transcripts",
+                    })
 
                 elif cmd == "status":
-                    await ws.send_json(
+                    _send(
+                        ws,
                         {
                             "type": "status",
                             "camera": camera_service.is_running,
@@ -409,7 +671,7 @@ async def _ws_handler(request):
                     )
 
                 elif cmd == "ping":
-                    await ws.send_json({"type": "pong"})
+                    _send(ws, {"type": "pong"})
 
                 elif cmd == "auto_face_recognition":
                     action = msg.get("action", "")
@@ -417,19 +679,19 @@ async def _ws_handler(request):
                     if action == "start":
                         _auto_face_recognition_enabled = True
                         await _start_auto_face_recognition_task()
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "auto_face_recognition",
                             "status": "started",
                             "interval": settings.auto_face_recognition_interval,
                         })
                     elif action == "stop":
                         _auto_face_recognition_enabled = False
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "auto_face_recognition",
                             "status": "stopped",
                         })
                     elif action == "status":
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "auto_face_recognition",
                             "enabled": _auto_face_recognition_enabled,
                             "interval": settings.auto_face_recognition_interval,
@@ -437,7 +699,7 @@ async def _ws_handler(request):
                             "known_people": list(_last_known_people.values()),
                         })
                     else:
-                        await ws.send_json({
+                        _send(ws, {
                             "type": "error",
                             "error": "invalid_action",
                             "message": "action must be 'start', 'stop', or 'status'"
@@ -449,7 +711,7 @@ async def _ws_handler(request):
                         name: data for name, data in _last_known_people.items()
                         if current_time - data.get("last_seen", 0) < 300
                     }
-                    await ws.send_json({
+                    _send(ws, {
                         "type": "known_people",
                         "people": list(recent_people.values()),
                         "count": len(recent_people),
@@ -457,7 +719,7 @@ async def _ws_handler(request):
 
                 else:
                     logger.warning(f"[WS] Unknown command: {cmd}")
-                    await ws.send_json({
+                    _send(ws, {
                         "type": "error",
                         "error": "unknown_command",
                         "command": cmd
@@ -483,6 +745,9 @@ async def _ws_handler(request):
         _connected_clients.discard(ws)
         _client_last_activity.pop(ws, None)
         _session_auth.pop(ws, None)
+        _cancel_client_tasks(ws)
+        transcript_stream.unsubscribe(ws)
+        ws_broadcaster.unregister(ws)
         
         if not _connected_clients and _auto_face_recognition_enabled:
             await _stop_auto_face_recognition_task()
@@ -496,33 +761,21 @@ async def _ws_handler(request):
     return ws
 
 
-async def broadcast(message: dict):
-    if _connected_clients:
-        payload = json.dumps(message)
-        stale_clients = []
-        for ws in list(_connected_clients):
-            try:
-                await ws.send_str(payload)
-            except Exception as e:
-                logger.warning(f"[WS] Failed to broadcast to client: {e}")
-                stale_clients.append(ws)
-        
-        
-        for ws in stale_clients:
-            _connected_clients.discard(ws)
-            _client_last_activity.pop(ws, None)
-            _session_auth.pop(ws, None)
-
-
-
+#------This Function queues a message for every connected client----------
+def broadcast(message: dict) -> int:
+    return ws_broadcaster.broadcast(message)
 
 
 async def _health_handler(request):
     local_ip = _get_local_ip()
+    startup = readiness.get_status()
     return web.json_response(
         {
             "service": "AURA_MODULE",
             "status": "alive",
+            "ready": startup["status"],
+            "startup_seconds": startup["startup_seconds"],
+            "components": startup["components"],
             "ip": local_ip,
             "hostname": socket.gethostname(),
             "ws_port": settings.ws_port,
@@ -537,6 +790,10 @@ async def _health_handler(request):
 
 async def _status_handler(request):
     camera_info = camera_service.get_camera_info()
+    try:
+        backend_status = get_backend_client().get_status()
+    except RuntimeError:
+        backend_status = None
 
     return web.json_response(
         {
@@ -549,18 +806,65 @@ async def _status_handler(request):
                 "backend": camera_info.get("backend", "unknown"),
                 "format": camera_info.get("format", "unknown"),
             },
-            "microphone": {"running": mic_service.is_running},
+            "microphone": {
+                "running": mic_service.is_running,
+                "segmenter": mic_service.get_stats()["segmenter"],
+                "capture": audio_capture.get_stats(),
+            },
+            "speech_executor": stt_executor.get_stats(),
+            "batch_transcriber": batch_transcriber.get_stats(),
+            "transcript_stream": transcript_stream.get_stats(),
+            "ws_outbound": ws_broadcaster.get_stats(),
+            "event_loop": loop_watchdog.get_stats(),
+            "startup": readiness.get_status(),
+            "llm": ollama_client.get_stats(),
+            "llm_scheduler": llm_scheduler.get_stats(),
+            "analysis_cache": analysis_cache.get_stats(),
+            "fast_extractor": fast_extractor.get_stats(),
             "connected_clients": len(_connected_clients),
             "models": {
                 "face_recognition": "buffalo_l",
                 "speech": settings.whisper_model,
+                "whisper": whisper_registry.get_status(),
+                "whisper_ladder": whisper_ladder.get_status(),
             },
             "backend_url": settings.backend_url,
+            "backend": backend_status,
         }
     )
 
 
+async def _metrics_handler(request):
+    return web.Response(
+        body=metrics.render().encode("utf-8"),
+        headers={"Content-Type": METRICS_CONTENT_TYPE},
+    )
+
+
+#------This Function checks the debug token on a request----------
+def _debug_authorized(request) -> bool:
+    presented = request.headers.get("X-Debug-Token", "")
+    authorization = request.headers.get("Authorization", "")
+    if not presented and authorization.lower().startswith("bearer "):
+        presented = authorization[7:].strip()
+    return bool(presented) and hmac.compare_digest(presented.encode("utf-8"), settings.debug_token.encode("utf-8"))
+
+
+async def _debug_profile_handler(request):
+    if not settings.debug_token:
+        return web.json_response({"error": "debug_disabled"}, status=404)
+    if not _debug_authorized(request):
+        return web.json_response({"error": "unauthorized"}, status=401)
+
+    include_stacks = request.query.get("stacks", "").lower() in ("1", "true", "yes")
+    return web.json_response(loop_watchdog.get_report(include_stacks=include_stacks))
+
+
 async def _extract_face_handler(request):
+    not_ready = _not_ready_response(COMPONENT_FACE)
+    if not_ready:
+        return not_ready
+
     try:
         data = await request.json()
         image_b64 = data.get("image_b64", "")
@@ -608,6 +912,10 @@ async def _extract_face_handler(request):
 async def _identify_person_handler(request):
     logger.info("[API] POST /identify_person - Face Recognition Request")
 
+    not_ready = _not_ready_response(COMPONENT_FACE)
+    if not_ready:
+        return not_ready
+
     try:
         data = await request.json()
     except json.JSONDecodeError:
@@ -705,6 +1013,10 @@ async def _identify_person_handler(request):
 
 
 async def _video_feed_handler(request):
+    not_ready = _not_ready_response(COMPONENT_CAMERA)
+    if not_ready:
+        return not_ready
+
     import cv2
 
     client_ip = request.remote
@@ -758,7 +1070,9 @@ async def _video_feed_handler(request):
                 no_frame_count = 0
 
             
+            encode_started = time.perf_counter()
             ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            JPEG_STREAM_SECONDS.observe(time.perf_counter() - encode_started)
             if not ret:
                 logger.warning("[STREAM] Failed to encode frame as JPEG")
                 continue
@@ -823,6 +1137,10 @@ async def _video_feed_handler(request):
 
 
 async def _snapshot_handler(request):
+    not_ready = _not_ready_response(COMPONENT_CAMERA)
+    if not_ready:
+        return not_ready
+
     import cv2
 
     frame = camera_service.get_frame()
@@ -830,7 +1148,9 @@ async def _snapshot_handler(request):
         return web.json_response({"error": "No frame available"}, status=503)
 
     
+    encode_started = time.perf_counter()
     ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    JPEG_SNAPSHOT_SECONDS.observe(time.perf_counter() - encode_started)
     if not ret:
         return web.json_response({"error": "Failed to encode frame"}, status=500)
 
@@ -857,6 +1177,32 @@ async def _latest_transcript_handler(request):
     )
 
 
+async def _transcribe_handler(request):
+    not_ready = _not_ready_response(COMPONENT_SPEECH)
+    if not_ready:
+        return not_ready
+
+    if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+        return web.json_response({"error": "audio_too_large"}, status=413)
+
+    audio = bytearray()
+    async for chunk in request.content.iter_chunked(64 * 1024):
+        audio.extend(chunk)
+        if len(audio) > max_upload_bytes(audio[:4]):
+            return web.json_response({"error": "audio_too_large"}, status=413)
+
+    audio_bytes = bytes(audio)
+    is_valid, error = validate_audio(audio_bytes)
+    if not is_valid:
+        return web.json_response({"error": "invalid_audio", "detail": error}, status=400)
+
+    try:
+        text = await transcribe_audio(audio_bytes)
+    except AudioTooLongError as e:
+        return web.json_response({"error": "audio_too_long", "detail": str(e)}, status=413)
+    return web.json_response({"text": text})
+
+
 def create_app() -> web.Application:
     app = web.Application()
     app.router.add_get("/health", _health_handler)
@@ -866,11 +1212,18 @@ def create_app() -> web.Application:
     app.router.add_get("/snapshot", _snapshot_handler)  
     app.router.add_post("/extract_face", _extract_face_handler)
     app.router.add_post("/identify_person", _identify_person_handler)
+    app.router.add_post("/transcribe", _transcribe_handler)
+    app.router.add_get("/metrics", _metrics_handler)
+    app.router.add_get("/debug/profile", _debug_profile_handler)
     app.router.add_get("/ws", _ws_handler)
     return app
 
 
 async def start_server():
+    global _server_loop
+
+    _server_loop = asyncio.get_running_loop()
+    transcript_stream.bind_loop(_server_loop)
     app = create_app()
     runner = web.AppRunner(app)
     await runner.setup()
@@ -902,6 +1255,8 @@ async def shutdown_streams():
     _connected_clients.clear()
     _client_last_activity.clear()
     _session_auth.clear()
+    for ws in list(_client_tasks):
+        _cancel_client_tasks(ws)
 
     
     for response in list(_active_video_streams):
@@ -0,0 +1,76 @@
+
+import json
+import wave
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from app.services.speech import wav_bytes_to_waveform
+
+SAMPLE_RATE = 16000
+
+
+#------This Function synthesises one voiced, speech-like utterance----------
+def synthesise_voiced(seconds: float, rng: np.random.Generator, level: float = 0.05) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 20))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(2, 5) * t) ** 2
+    return (level * voiced * envelope).astype(np.float32)
+
+
+#------This Function synthesises utterances of equal length for decoding benchmarks----------
+def synthesise_utterances(count: int, seconds: float, seed: int = 0) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [
+        synthesise_voiced(seconds, rng) + (0.005 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+        for _ in range(count)
+    ]
+
+
+#------This Function synthesises a conversation with known speech regions----------
+def synthesise_conversation(
+    duration: float, seed: int = 0, noise_level: float = 0.003
+) -> Tuple[np.ndarray, List[Tuple[float, float]]]:
+    rng = np.random.default_rng(seed)
+    audio = (noise_level * rng.standard_normal(int(duration * SAMPLE_RATE))).astype(np.float32)
+    speech: List[Tuple[float, float]] = []
+
+    position = rng.uniform(0.5, 1.5)
+    while True:
+        length = rng.uniform(1.0, 6.0)
+        if position + length > duration - 0.5:
+            break
+        start = int(position * SAMPLE_RATE)
+        utterance = synthesise_voiced(length, rng)
+        audio[start:start + utterance.size] += utterance
+        speech.append((round(position, 3), round(position + length, 3)))
+        position += length + rng.uniform(1.0, 3.0)
+
+    return audio, speech
+
+
+#------This Function writes a 16-bit mono WAV fixture and its speech regions----------
+def write_fixture(path: Path, audio: np.ndarray, speech: Optional[List[Tuple[float, float]]] = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm.tobytes())
+
+    if speech is not None:
+        path.with_suffix(".json").write_text(json.dumps({"speech": speech}, indent=2))
+
+
+#------This Function reads a WAV fixture as 16kHz int16 samples with optional speech regions----------
+def read_fixture(path: Path) -> Tuple[np.ndarray, Optional[List[Tuple[float, float]]]]:
+    waveform = wav_bytes_to_waveform(path.read_bytes())
+    samples = (np.clip(waveform, -1.0, 1.0) * 32767).astype(np.int16)
+
+    sidecar = path.with_suffix(".json")
+    speech = None
+    if sidecar.exists():
+        speech = [tuple(region) for region in json.loads(sidecar.read_text()).get("speech", [])]
+    return samples, speech
@@ -0,0 +1,320 @@
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURE_RATE = 16000
+
+
+#------This Class handles a PyAudio input stream replaying a WAV fixture in real time----------
+class FixtureStream:
+
+    def __init__(self, samples: np.ndarray, speed: float):
+        self.samples = samples
+        self.speed = speed
+        self.position = 0
+        self.started_at: Optional[float] = None
+        self.finished = threading.Event()
+
+    def delivery_time(self, seconds: float) -> float:
+        return self.started_at + seconds / self.speed
+
+    def read(self, num_frames: int, exception_on_overflow: bool = False) -> bytes:
+        if self.started_at is None:
+            self.started_at = time.time()
+
+        due = self.delivery_time((self.position + num_frames) / FIXTURE_RATE)
+        delay = due - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        chunk = self.samples[self.position:self.position + num_frames]
+        self.position += num_frames
+        if chunk.size < num_frames:
+            self.finished.set()
+            chunk = np.concatenate((chunk, np.zeros(num_frames - chunk.size, dtype=np.int16)))
+        return chunk.tobytes()
+
+    def is_active(self) -> bool:
+        return True
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+#------This Class handles the mocked PyAudio device handing out fixture streams----------
+class FixturePyAudio:
+
+    fixture: Optional[np.ndarray] = None
+    speed = 1.0
+    streams: List[FixtureStream] = []
+
+    def open(self, **kwargs) -> FixtureStream:
+        stream = FixtureStream(FixturePyAudio.fixture, FixturePyAudio.speed)
+        FixturePyAudio.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        pass
+
+
+mock_pyaudio = types.ModuleType("pyaudio")
+mock_pyaudio.PyAudio = FixturePyAudio
+mock_pyaudio.paInt16 = 8
+sys.modules["pyaudio"] = mock_pyaudio
+
+from app.core.config import settings
+from app.services.audio_capture import audio_capture
+from app.services.microphone import ContinuousMicrophone, MicrophoneService
+from app.services.stt_executor import stt_executor
+from app.services.whisper_registry import whisper_registry, _current_rss_bytes
+from benchmarks.audio_fixtures import read_fixture, synthesise_conversation, write_fixture
+
+
+#------This Class handles periodic sampling of queue growth and memory----------
+class PipelineSampler:
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples: List[dict] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        started_at = time.time()
+        while not self._stop.wait(self.interval):
+            capture = audio_capture.get_stats()
+            self.samples.append({
+                "t": round(time.time() - started_at, 2),
+                "rss_mb": round(_current_rss_bytes() / (1024 * 1024), 1),
+                "lag_seconds": {
+                    sub["name"]: round(sub["lag_samples"] / FIXTURE_RATE, 2)
+                    for sub in capture["subscribers"]
+                },
+                "stt_queue": sum(stt_executor.queue_depth().values()),
+            })
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {}
+        lags = [max(s["lag_seconds"].values(), default=0.0) for s in self.samples]
+        queue = [s["stt_queue"] for s in self.samples]
+        first_half = lags[:len(lags) // 2] or [0.0]
+        second_half = lags[len(lags) // 2:] or [0.0]
+        return {
+            "peak_rss_mb": max(s["rss_mb"] for s in self.samples),
+            "max_lag_seconds": max(lags),
+            "lag_growth_seconds": round(float(np.mean(second_half) - np.mean(first_half)), 2),
+            "max_stt_queue": max(queue),
+            "timeline": self.samples,
+        }
+
+
+#------This Function matches segmented utterances to the fixture's speech regions----------
+def segmentation_latency(
+    emitted: List[Tuple[float, int]],
+    speech: Optional[List[Tuple[float, float]]],
+    stream: FixtureStream,
+) -> dict:
+    result = {"utterances_emitted": len(emitted), "speech_regions": len(speech) if speech else None}
+    if not speech or stream.started_at is None:
+        return result
+
+    latencies = []
+    for emitted_at, _ in emitted:
+        audio_position = (emitted_at - stream.started_at) * stream.speed
+        ended = [end for _, end in speech if end <= audio_position]
+        if ended:
+            latencies.append(emitted_at - stream.delivery_time(max(ended)))
+
+    if latencies:
+        ordered = sorted(latencies)
+        result.update({
+            "latency_ms_avg": round(float(np.mean(ordered)) * 1000, 1),
+            "latency_ms_p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+            "latency_ms_max": round(ordered[-1] * 1000, 1),
+            "end_of_utterance_seconds": settings.vad_end_of_utterance_seconds,
+        })
+    return result
+
+
+#------This Function replays a fixture through the microphone services once----------
+def run_pipeline(
+    samples: np.ndarray,
+    speech: Optional[List[Tuple[float, float]]],
+    speed: float,
+    with_whisper: bool,
+    drain_seconds: float,
+) -> dict:
+    FixturePyAudio.fixture = samples
+    FixturePyAudio.speed = speed
+    FixturePyAudio.streams = []
+
+    emitted: List[Tuple[float, int]] = []
+    segmenter_service = MicrophoneService()
+    continuous = ContinuousMicrophone() if with_whisper else None
+    sampler = PipelineSampler()
+
+    rss_before = _current_rss_bytes()
+    segmenter_service.start(on_chunk=lambda chunk: emitted.append((time.time(), chunk.size)))
+    if continuous:
+        continuous.start()
+    sampler.start()
+
+    stream = FixturePyAudio.streams[0]
+    stream.finished.wait(timeout=samples.size / FIXTURE_RATE / speed + 30)
+
+    deadline = time.time() + drain_seconds
+    while continuous and time.time() < deadline:
+        capture = audio_capture.get_stats()
+        if all(sub["lag_samples"] < audio_capture.CHUNK for sub in capture["subscribers"]):
+            break
+        time.sleep(0.2)
+
+    capture = audio_capture.get_stats()
+    continuous_stats = continuous.get_stats() if continuous else None
+    sampler.stop()
+    if continuous:
+        continuous.stop()
+    segmenter_service.stop()
+
+    dropped = {
+        sub["name"]: sub["dropped_samples"] // audio_capture.CHUNK for sub in capture["subscribers"]
+    }
+    result = {
+        "audio_seconds": round(samples.size / FIXTURE_RATE, 1),
+        "speed": speed,
+        "segmentation": segmentation_latency(emitted, speech, stream),
+        "dropped_chunks": dropped,
+        "memory_delta_mb": round((_current_rss_bytes() - rss_before) / (1024 * 1024), 1),
+        "queues": sampler.summary(),
+    }
+
+    if continuous_stats:
+        transcriber = continuous_stats.get("transcriber") or {}
+        result["whisper"] = {
+            "loaded": continuous_stats["whisper_loaded"],
+            "real_time_factor": transcriber.get("real_time_factor"),
+            "last_real_time_factor": transcriber.get("last_real_time_factor"),
+            "windows_decoded": transcriber.get("windows_decoded"),
+            "transcripts": continuous_stats["transcript_count"],
+            "final_lag_seconds": round(continuous_stats["lag_seconds"], 2),
+        }
+    return result
+
+
+#------This Function benchmarks every requested model size and compute type----------
+def run_matrix(
+    samples: np.ndarray,
+    speech: Optional[List[Tuple[float, float]]],
+    models: List[str],
+    compute_types: List[str],
+    speed: float,
+    drain_seconds: float,
+) -> List[dict]:
+    results = []
+    for model in models:
+        for compute_type in compute_types:
+            settings.whisper_model = model
+            settings.whisper_compute_type = compute_type
+            settings.whisper_device = "cpu"
+
+            entry: Dict = {"model": model, "compute_type": compute_type}
+            try:
+                shared = whisper_registry.get_model(warm_up=True)
+                entry["load_seconds"] = round(shared.load_seconds, 2)
+                entry["model_memory_mb"] = round(shared.memory_bytes / (1024 * 1024), 1)
+            except RuntimeError as e:
+                entry["error"] = str(e)
+                results.append(entry)
+                continue
+
+            entry.update(run_pipeline(samples, speech, speed, True, drain_seconds))
+            results.append(entry)
+            whisper_registry.unload(model, "cpu", compute_type)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live audio pipeline on WAV fixtures")
+    parser.add_argument("--wav", type=Path, default=None, help="16-bit WAV fixture (optional .json sidecar with speech regions)")
+    parser.add_argument("--generate", type=Path, default=None, help="Write a synthetic fixture to this path and use it")
+    parser.add_argument("--duration", type=float, default=60.0, help="Length of the synthetic fixture in seconds")
+    parser.add_argument("--models", default="tiny,base", help="Comma-separated Whisper sizes")
+    parser.add_argument("--compute-types", default="int8", help="Comma-separated compute types")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed relative to real time")
+    parser.add_argument("--drain-seconds", type=float, default=30.0, help="Time allowed to catch up after the fixture ends")
+    parser.add_argument("--segmentation-only", action="store_true", help="Skip Whisper and measure VAD segmentation only")
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    settings.demo_mode = False
+
+    if args.wav:
+        samples, speech = read_fixture(args.wav)
+        source = str(args.wav)
+    else:
+        audio, speech = synthesise_conversation(args.duration)
+        if args.generate:
+            write_fixture(args.generate, audio, speech)
+        samples = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        source = str(args.generate) if args.generate else "synthetic"
+
+    report = {
+        "fixture": source,
+        "host": {
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "vad": {
+            "backend": settings.vad_backend,
+            "aggressiveness": settings.vad_aggressiveness,
+        },
+    }
+
+    if args.segmentation_only:
+        report["pipeline"] = run_pipeline(samples, speech, args.speed, False, 0.0)
+    else:
+        report["runs"] = run_matrix(
+            samples,
+            speech,
+            [m.strip() for m in args.models.split(",") if m.strip()],
+            [c.strip() for c in args.compute_types.split(",") if c.strip()],
+            args.speed,
+            args.drain_seconds,
+        )
+
+    stt_executor.stop()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
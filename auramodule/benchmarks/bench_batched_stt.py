@@ -0,0 +1,95 @@
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.services.batch_transcriber import BatchTranscriber
+from app.services.speech import SAMPLE_RATE, transcribe_waveform_sync, wav_bytes_to_waveform
+from app.services.whisper_registry import whisper_registry
+from benchmarks.audio_fixtures import synthesise_utterances
+
+
+#------This Function loads WAV utterances from a directory----------
+def load_wav_utterances(directory: Path, count: int) -> List[np.ndarray]:
+    waveforms = []
+    for path in sorted(directory.glob("*.wav"))[:count]:
+        waveforms.append(wav_bytes_to_waveform(path.read_bytes()))
+    return waveforms
+
+
+#------This Function times sequential and batched decoding of the same utterances----------
+def run_benchmark(waveforms: List[np.ndarray], beam_size: int, repeats: int) -> dict:
+    audio_seconds = sum(w.size for w in waveforms) / SAMPLE_RATE
+    batcher = BatchTranscriber(beam_size=beam_size)
+
+    transcribe_waveform_sync(waveforms[0], beam_size)
+
+    sequential_times = []
+    batched_times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        sequential_texts = [transcribe_waveform_sync(w, beam_size) for w in waveforms]
+        sequential_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        batched_texts = batcher.transcribe_batch_sync(waveforms)
+        batched_times.append(time.perf_counter() - start_time)
+
+    sequential_seconds = min(sequential_times)
+    batched_seconds = min(batched_times)
+    return {
+        "utterances": len(waveforms),
+        "audio_seconds": round(audio_seconds, 1),
+        "beam_size": beam_size,
+        "sequential_seconds": round(sequential_seconds, 3),
+        "batched_seconds": round(batched_seconds, 3),
+        "sequential_audio_seconds_per_second": round(audio_seconds / sequential_seconds, 2),
+        "batched_audio_seconds_per_second": round(audio_seconds / batched_seconds, 2),
+        "speedup": round(sequential_seconds / batched_seconds, 2),
+        "sequential_fallbacks": batcher.sequential_fallbacks,
+        "matching_transcripts": sum(
+            a.strip().lower() == b.strip().lower()
+            for a, b in zip(sequential_texts, batched_texts)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batched and sequential Whisper throughput")
+    parser.add_argument("--model", default=None, help="Whisper model size (defaults to WHISPER_MODEL)")
+    parser.add_argument("--wav-dir", type=Path, default=None, help="Directory of 16-bit WAV utterances")
+    parser.add_argument("--count", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=4.0, help="Length of synthetic utterances")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.wav_dir:
+        waveforms = load_wav_utterances(args.wav_dir, args.count)
+        source = str(args.wav_dir)
+    else:
+        waveforms = synthesise_utterances(args.count, args.seconds)
+        source = "synthetic"
+
+    if not waveforms:
+        print("No utterances to transcribe", file=sys.stderr)
+        sys.exit(1)
+
+    if args.model:
+        settings.whisper_model = args.model
+    settings.whisper_device = "cpu"
+    model = whisper_registry.get_model(warm_up=True)
+    result = run_benchmark(waveforms, args.beam_size, args.repeats)
+    result.update({"model": model.size, "device": model.key[1], "source": source})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+
+HEAVY_MODULES = ("cv2", "insightface", "onnxruntime", "faster_whisper", "ctranslate2", "av", "tokenizers")
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import app.ws_server\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"print(json.dumps({{'seconds': elapsed, 'heavy_loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+
+#------This Function finds a free local TCP port----------
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+#------This Function measures a cold import of the server module in a fresh interpreter----------
+def measure_import(runs: int) -> dict:
+    samples = []
+    heavy_loaded = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(probe["seconds"])
+        heavy_loaded = probe["heavy_loaded"]
+    return {"best_seconds": round(min(samples), 3), "heavy_modules_loaded": heavy_loaded}
+
+
+#------This Function loads the Whisper model the way the microphone does----------
+def load_whisper():
+    from app.services.whisper_registry import whisper_registry
+    whisper_registry.get_model(warm_up=True)
+
+
+#------This Function loads the InsightFace model----------
+def load_face():
+    from app.services.face_recognition import get_face_app
+    get_face_app()
+
+
+#------This Function runs the server the staged or sequential way and keeps serving----------
+async def run_child(mode: str, models: bool):
+    from app.ws_server import start_server
+    from app.services.readiness import readiness, COMPONENT_FACE, COMPONENT_SPEECH
+
+    loaders = {COMPONENT_SPEECH: load_whisper, COMPONENT_FACE: load_face} if models else {}
+    readiness.register(*loaders)
+
+    if mode == "sequential":
+        for name, loader in loaders.items():
+            await readiness.run(name, loader)
+        runner = await start_server()
+    else:
+        runner = await start_server()
+        await asyncio.gather(*(readiness.run(name, loader) for name, loader in loaders.items()))
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+#------This Function polls /health once----------
+def fetch_health(port: int) -> Optional[dict]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1.0) as response:
+            return json.load(response)
+    except (OSError, urllib.error.URLError, ValueError):
+        return None
+
+
+#------This Function measures time to first /health response and to all components settled----------
+def measure_startup(mode: str, models: bool, timeout: float) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "HTTP_PORT": str(port),
+        "WS_PORT": str(port),
+        "WATCHDOG_ENABLED": "false",
+    }
+    command = [sys.executable, str(Path(__file__).resolve()), "--child", mode]
+    if models:
+        command.append("--models")
+
+    started_at = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_response = None
+    settled = None
+    health = None
+    try:
+        while time.perf_counter() - started_at < timeout and process.poll() is None:
+            health = fetch_health(port)
+            if health is None:
+                time.sleep(0.02)
+                continue
+            elapsed = time.perf_counter() - started_at
+            if first_response is None:
+                first_response = elapsed
+            if health.get("ready") != "starting":
+                settled = elapsed
+                break
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "mode": mode,
+        "first_response_seconds": round(first_response, 3) if first_response is not None else None,
+        "all_settled_seconds": round(settled, 3) if settled is not None else None,
+        "components": (health or {}).get("components", {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure module boot-to-first-response, staged vs sequential")
+    parser.add_argument("--models", action="store_true", help="also load Whisper and InsightFace")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--child", choices=("staged", "sequential"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child(args.child, args.models))
+        return
+
+    results = {
+        "import": measure_import(args.runs),
+        "startup": [measure_startup(mode, args.models, args.timeout) for mode in ("sequential", "staged")],
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import ws_codec
+
+
+#------This Function builds the messages the module sends most often----------
+def typical_messages() -> Dict[str, Dict[str, Any]]:
+    people = [
+        {
+            "name": name,
+            "relationship": relationship,
+            "confidence": confidence,
+            "last_seen": 1760000000.123 + index,
+            "person_id": f"65f1c0a2b3d4e5f6a7b8c9d{index}",
+            "bbox": [412 + index * 40, 188, 596 + index * 40, 402],
+        }
+        for index, (name, relationship, confidence) in enumerate([
+            ("Sarah", "daughter", 0.912),
+            ("Dr. Mehta", "doctor", 0.774),
+            ("Tom", "grandson", 0.688),
+        ])
+    ]
+    return {
+        "visible_people": {"type": "visible_people", "people": people, "timestamp": "2026-10-18T10:15:02"},
+        "identify_result": {"type": "identify_result", "faces": people},
+        "transcript_partial": {"type": "transcript_partial", "text": "remind me to take my pills after", "timestamp": 1760000001.5},
+        "transcript": {
+            "type": "transcript",
+            "text": "Sarah is coming over tomorrow at three and remind me to take my donepezil after lunch.",
+            "final": True,
+            "source": "continuous",
+            "timestamp": 1760000002.25,
+        },
+        "analysis": {
+            "type": "analysis",
+            "text": "Sarah is coming over tomorrow at three and remind me to take my donepezil after lunch.",
+            "analysis": {
+                "events": [{"description": "Sarah visiting", "datetime": "2026-10-19T15:00:00", "person": "Sarah", "type": "visit"}],
+                "key_info": [{"fact": "Sarah (daughter) was mentioned", "person": "Sarah"}],
+                "reminders": [{"description": "Take donepezil", "datetime": "2026-10-18T13:00:00"}],
+                "mood": "neutral",
+                "summary": "Sarah visits tomorrow at 3pm; donepezil after lunch.",
+            },
+            "timestamp": 1760000003.0,
+        },
+    }
+
+
+#------This Function lists the encoders that can run here----------
+def codecs() -> List[Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]]:
+    available = [("json", json.dumps, json.loads)]
+    if ws_codec.ORJSON_AVAILABLE:
+        available.append(("orjson", ws_codec.orjson.dumps, ws_codec.orjson.loads))
+    if ws_codec.MSGPACK_AVAILABLE:
+        available.append((
+            "msgpack",
+            lambda message: ws_codec.msgpack.packb(message, use_bin_type=True),
+            lambda data: ws_codec.msgpack.unpackb(data, raw=False),
+        ))
+    return available
+
+
+#------This Function times one callable in microseconds per call----------
+def time_per_call(fn: Callable[[Any], Any], value: Any, iterations: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            fn(value)
+        best = min(best, time.perf_counter() - started_at)
+    return round(best / iterations * 1e6, 2)
+
+
+#------This Function measures encode/decode cost and wire size per message and encoder----------
+def run_benchmark(iterations: int) -> dict:
+    results: Dict[str, Dict[str, dict]] = {}
+    for name, message in typical_messages().items():
+        results[name] = {}
+        for codec_name, dumps, loads in codecs():
+            payload = dumps(message)
+            wire = payload.encode("utf-8") if isinstance(payload, str) else payload
+            assert loads(payload) == message
+            results[name][codec_name] = {
+                "bytes": len(wire),
+                "encode_us": time_per_call(dumps, message, iterations),
+                "decode_us": time_per_call(loads, payload, iterations),
+            }
+
+    totals: Dict[str, dict] = {}
+    for per_codec in results.values():
+        for codec_name, numbers in per_codec.items():
+            total = totals.setdefault(codec_name, {"bytes": 0, "encode_us": 0.0, "decode_us": 0.0})
+            for key in total:
+                total[key] = round(total[key] + numbers[key], 2)
+    baseline = totals["json"]
+    for total in totals.values():
+        total["bytes_vs_json"] = round(total["bytes"] / baseline["bytes"], 3)
+        total["encode_speedup"] = round(baseline["encode_us"] / total["encode_us"], 2)
+        total["decode_speedup"] = round(baseline["decode_us"] / total["decode_us"], 2)
+
+    return {"iterations": iterations, "messages": results, "totals": totals}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WebSocket message encoders on typical module messages")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import av
+from aiohttp.test_utils import TestClient, TestServer
+from app.services import speech
+from app.services.speech import AudioTooLongError, compressed_bytes_to_waveform
+
+ENCODE_RATE = 48000
+
+REAL_RESAMPLER = av.audio.resampler.AudioResampler
+
+
+#------This Function encodes a tone as Ogg/Opus, the format the app uploads----------
+def encode_opus(seconds: int) -> bytes:
+    buffer = io.BytesIO()
+    tone = (0.1 * np.sin(2 * np.pi * 220 * np.arange(ENCODE_RATE) / ENCODE_RATE) * 32767).astype(np.int16)
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=ENCODE_RATE)
+        stream.layout = "mono"
+        stream.bit_rate = 16000
+        for second in range(seconds):
+            frame = av.AudioFrame.from_ndarray(tone.reshape(1, -1), format="s16", layout="mono")
+            frame.sample_rate = ENCODE_RATE
+            frame.pts = second * ENCODE_RATE
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+#------This Class handles counting how much audio the decoder actually produced----------
+class CountingResampler:
+
+    decoded_samples = 0
+
+    def __init__(self, *args, **kwargs):
+        self._resampler = REAL_RESAMPLER(*args, **kwargs)
+
+    def resample(self, frame):
+        frames = self._resampler.resample(frame)
+        CountingResampler.decoded_samples += sum(out.samples for out in frames)
+        return frames
+
+
+#------This Function decodes one upload with a length cap and reports what happened----------
+def run_decode(name: str, audio_bytes: bytes, max_seconds: float, expect_rejected: bool) -> dict:
+    CountingResampler.decoded_samples = 0
+    try:
+        waveform = compressed_bytes_to_waveform(audio_bytes, max_seconds=max_seconds)
+        rejected, detail = False, f"{waveform.size / speech.SAMPLE_RATE:.1f}s decoded"
+    except AudioTooLongError as e:
+        rejected, detail = True, str(e)
+    decoded_seconds = CountingResampler.decoded_samples / speech.SAMPLE_RATE
+    return {
+        "case": name,
+        "rejected": rejected,
+        "decoded_seconds": round(decoded_seconds, 2),
+        "detail": detail,
+        "ok": rejected == expect_rejected and decoded_seconds <= max_seconds + 1,
+    }
+
+
+#------This Function posts uploads to /transcribe and checks they are refused before any decode----------
+async def run_endpoint(opus: bytes) -> list:
+    from app.ws_server import create_app
+
+    results = []
+    async with TestClient(TestServer(create_app())) as client:
+        CountingResampler.decoded_samples = 0
+        response = await client.post("/transcribe", data=opus)
+        body = await response.json()
+        results.append({
+            "case": "endpoint rejects over-length opus",
+            "status": response.status,
+            "body": body,
+            "decoded_seconds": CountingResampler.decoded_samples / speech.SAMPLE_RATE,
+            "ok": response.status == 413 and body.get("error") == "audio_too_long"
+            and CountingResampler.decoded_samples == 0,
+        })
+
+        oversized = b"OggS" + bytes(speech.MAX_COMPRESSED_UPLOAD_BYTES)
+        response = await client.post("/transcribe", data=oversized)
+        body = await response.json()
+        results.append({
+            "case": "endpoint rejects oversized compressed upload",
+            "status": response.status,
+            "body": body,
+            "ok": response.status == 413 and body.get("error") == "audio_too_large",
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that /transcribe refuses over-length audio before decoding it")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="length cap used in place of MAX_AUDIO_SECONDS")
+    args = parser.parse_args()
+
+    av.audio.resampler.AudioResampler = CountingResampler
+    speech.MAX_AUDIO_SECONDS = args.max_seconds
+    limit = int(args.max_seconds)
+
+    short = encode_opus(limit // 2)
+    long = encode_opus(limit * 2)
+    chained = encode_opus(limit - 2) + encode_opus(limit - 2)
+
+    results = [
+        run_decode("short opus decodes", short, args.max_seconds, expect_rejected=False),
+        run_decode("long opus rejected from its header", long, args.max_seconds, expect_rejected=True),
+        run_decode("chained opus rejected while decoding", chained, args.max_seconds, expect_rejected=True),
+    ]
+    results[1]["ok"] = results[1]["ok"] and results[1]["decoded_seconds"] == 0
+    results.extend(asyncio.run(run_endpoint(long)))
+
+    print(json.dumps({"max_seconds": args.max_seconds, "results": results}, indent=2))
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from app.services import audio_capture as capture_module
+from app.services.audio_capture import AudioCaptureEngine
+from app.services.readiness import readiness, COMPONENT_SPEECH, STATE_FAILED, STATE_READY
+
+
+#------This Class handles a fake microphone that fails reads, then fails to open, then recovers----------
+class FlakyDevice:
+
+    paInt16 = 8
+
+    def __init__(self, failing_reads: int, failing_opens: int):
+        self.failing_reads = failing_reads
+        self.failing_opens = failing_opens
+        self.opens = 0
+        self.outage = threading.Event()
+
+    def PyAudio(self):
+        return self
+
+    def terminate(self):
+        pass
+
+    def open(self, **kwargs):
+        self.opens += 1
+        if self.opens > 1 and self.failing_opens > 0:
+            self.failing_opens -= 1
+            raise OSError("device unavailable")
+        return FlakyStream(self, kwargs["frames_per_buffer"])
+
+
+#------This Class handles one fake PyAudio input stream----------
+class FlakyStream:
+
+    def __init__(self, device: FlakyDevice, chunk: int):
+        self.device = device
+        self.chunk = chunk
+
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        time.sleep(0.005)
+        if self.device.opens == 1 and self.device.failing_reads > 0:
+            self.device.failing_reads -= 1
+            if self.device.failing_reads == 0:
+                self.device.outage.set()
+            raise OSError("input overflowed")
+        return np.full(frames, 100, dtype=np.int16).tobytes()
+
+    def is_active(self) -> bool:
+        return True
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def main():
+    device = FlakyDevice(failing_reads=10, failing_opens=2)
+    capture_module.pyaudio = device
+    capture_module.PYAUDIO_AVAILABLE = True
+    capture_module.REOPEN_BACKOFF_SECONDS = 0.05
+    readiness.register(COMPONENT_SPEECH)
+    readiness.mark_ready(COMPONENT_SPEECH)
+
+    engine = AudioCaptureEngine()
+    subscription = engine.subscribe("check")
+    device.outage.wait(timeout=5)
+    time.sleep(0.02)
+    during = readiness.state(COMPONENT_SPEECH)
+    during_stats = engine.get_stats()
+
+    deadline = time.time() + 5
+    received = 0
+    while time.time() < deadline and received < engine.CHUNK * 4:
+        received += sum(view.size for view in subscription.read_views(timeout=0.2))
+    after = readiness.state(COMPONENT_SPEECH)
+    stats = engine.get_stats()
+    subscription.close()
+
+    checks = {
+        "not_ready_during_outage": during == STATE_FAILED and during_stats["capturing"] is False,
+        "subscriber_kept_open": received >= engine.CHUNK * 4,
+        "ready_after_reopen": after == STATE_READY and stats["capturing"] is True,
+        "backed_off_through_failed_opens": stats["reopen_attempts"] == 3 and stats["reopens"] == 1,
+    }
+    report = {
+        "ok": all(checks.values()),
+        "checks": checks,
+        "stats": {key: stats[key] for key in ("reopening", "reopen_attempts", "reopens")},
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
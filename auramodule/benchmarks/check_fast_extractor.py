@@ -0,0 +1,123 @@
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.conversation import EXTRACTION_PROMPT, call_ollama
+from app.services.fast_extractor import FastExtractor, TIER_LLM, TIER_SIMPLE
+from app.services.llm_client import ollama_client
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "extraction_cases.json"
+
+
+#------This Function compares one fast-path result with its label----------
+def check_case(extractor: FastExtractor, case: dict) -> dict:
+    started_at = time.perf_counter()
+    tier, result = extractor.classify(case["text"])
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    outcome = {
+        "text": case["text"],
+        "expected_tier": case["tier"],
+        "tier": tier,
+        "tier_ok": tier == case["tier"],
+        "elapsed_ms": round(elapsed_ms, 3),
+    }
+    if result is not None:
+        outcome["result"] = result
+    if tier == TIER_SIMPLE and case["tier"] == TIER_SIMPLE:
+        found_when = [item["datetime"] for item in result["events"] + result["reminders"]]
+        people = sorted(info["person"] for info in result["key_info"])
+        outcome["fields_ok"] = (
+            len(result["events"]) == case["events"]
+            and len(result["reminders"]) == case["reminders"]
+            and found_when == [case["when"]]
+            and people == sorted(case.get("people", []))
+        )
+    return outcome
+
+
+#------This Function asks the LLM for the same transcript to compare against the fast path----------
+async def llm_counts(text: str) -> Optional[Dict[str, int]]:
+    prompt = EXTRACTION_PROMPT.format(system_time=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"))
+    data, error = await call_ollama(prompt, text)
+    if error or not data:
+        return None
+    try:
+        extracted = json.loads(data.get("message", {}).get("content", ""))
+    except json.JSONDecodeError:
+        return None
+    return {
+        "events": len(extracted.get("events", []) or []),
+        "reminders": len(extracted.get("reminders", []) or []),
+    }
+
+
+#------This Function compares fast-path answers with the LLM path----------
+async def compare_with_llm(outcomes: List[dict]) -> dict:
+    compared = 0
+    agreed = 0
+    for outcome in outcomes:
+        if outcome["tier"] == TIER_LLM:
+            continue
+        counts = await llm_counts(outcome["text"])
+        if counts is None:
+            continue
+        fast = outcome["result"]
+        fast_counts = {"events": len(fast["events"]), "reminders": len(fast["reminders"])}
+        outcome["llm"] = counts
+        compared += 1
+        if sum(counts.values()) == sum(fast_counts.values()):
+            agreed += 1
+    await ollama_client.close()
+    return {
+        "compared": compared,
+        "item_count_agreement": round(agreed / compared, 3) if compared else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the rule-based extractor against labelled transcripts")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--llm", action="store_true", help="Also compare fast-path answers with Ollama")
+    parser.add_argument("--verbose", action="store_true", help="Include every case in the report")
+    args = parser.parse_args()
+
+    fixtures = json.loads(args.fixtures.read_text())
+    extractor = FastExtractor()
+    extractor.remember_people(fixtures.get("gallery", []))
+
+    outcomes = [check_case(extractor, case) for case in fixtures["cases"]]
+    simple = [o for o in outcomes if "fields_ok" in o]
+    wrongly_fast = [o for o in outcomes if o["expected_tier"] == TIER_LLM and o["tier"] != TIER_LLM]
+
+    report = {
+        "cases": len(outcomes),
+        "tier_accuracy": round(sum(o["tier_ok"] for o in outcomes) / len(outcomes), 3),
+        "field_accuracy": round(sum(o["fields_ok"] for o in simple) / len(simple), 3) if simple else None,
+        "should_have_escalated": [o["text"] for o in wrongly_fast],
+        "mismatches": [
+            {"text": o["text"], "expected": o["expected_tier"], "got": o["tier"]}
+            for o in outcomes if not o["tier_ok"] or o.get("fields_ok") is False
+        ],
+        "stats": extractor.get_stats(),
+        "max_elapsed_ms": max(o["elapsed_ms"] for o in outcomes),
+    }
+    if args.llm:
+        report["llm_comparison"] = asyncio.run(compare_with_llm(outcomes))
+    if args.verbose:
+        report["outcomes"] = outcomes
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if not wrongly_fast else 1)
+
+
+if __name__ == "__main__":
+    main()
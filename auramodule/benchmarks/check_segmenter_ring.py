@@ -0,0 +1,83 @@
+
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audio_ring import PcmRingBuffer
+from app.services.vad import EnergySpectralVad, UtteranceSegmenter, SAMPLE_RATE
+from benchmarks.audio_fixtures import synthesise_voiced
+
+RING_SECONDS = 1.0
+
+WRITE_SECONDS = 0.25
+
+
+#------This Function builds silence, a long utterance and silence as int16 PCM----------
+def build_source(speech_seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    silence = (0.002 * rng.standard_normal(int(SAMPLE_RATE))).astype(np.float32)
+    speech = synthesise_voiced(speech_seconds, rng, level=0.2)
+    audio = np.concatenate((silence, speech, silence, silence))
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+#------This Function finds where an emitted utterance starts in the source----------
+def locate(source: np.ndarray, utterance: np.ndarray, frame_samples: int) -> Optional[int]:
+    head = utterance[:frame_samples]
+    for offset in range(0, source.size - head.size + 1, frame_samples):
+        if np.array_equal(source[offset:offset + head.size], head):
+            return offset
+    return None
+
+
+#------This Function streams the source through a small ring so the writer laps the start of the utterance----------
+def run(speech_seconds: float) -> dict:
+    source = build_source(speech_seconds)
+    ring = PcmRingBuffer(int(RING_SECONDS * SAMPLE_RATE))
+    reader = ring.create_reader("segmenter")
+    vad = EnergySpectralVad(aggressiveness=1)
+    utterances: List[np.ndarray] = []
+    segmenter = UtteranceSegmenter(
+        vad,
+        utterances.append,
+        pre_roll_seconds=0.1,
+        end_of_utterance_seconds=0.3,
+        max_utterance_seconds=speech_seconds + 1.0,
+    )
+
+    step = int(WRITE_SECONDS * SAMPLE_RATE)
+    for start in range(0, source.size, step):
+        ring.write(source[start:start + step])
+        for view in reader.read_views():
+            segmenter.feed(view)
+
+    results = []
+    for utterance in utterances:
+        offset = locate(source, utterance, vad.frame_samples)
+        intact = offset is not None and np.array_equal(source[offset:offset + utterance.size], utterance)
+        results.append({
+            "seconds": round(utterance.size / SAMPLE_RATE, 2),
+            "offset_seconds": round(offset / SAMPLE_RATE, 2) if offset is not None else None,
+            "intact": bool(intact),
+        })
+    return {
+        "speech_seconds": speech_seconds,
+        "ring_seconds": RING_SECONDS,
+        "dropped_samples": reader.dropped_samples,
+        "utterances": results,
+        "ok": bool(results) and all(result["intact"] for result in results),
+    }
+
+
+def main():
+    runs = [run(seconds) for seconds in (0.6, 3.0)]
+    print(json.dumps({"runs": runs}, indent=2))
+    sys.exit(0 if all(result["ok"] for result in runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
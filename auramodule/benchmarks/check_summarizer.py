@@ -0,0 +1,88 @@
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import conversation
+from app.services.conversation import IncrementalSummarizer
+
+
+#------This Function stands in for Ollama and keeps every summarized line so coverage can be checked----------
+async def fake_summarization(
+    text: str, system_prompt: Optional[str] = None, instruction: str = ""
+) -> tuple[Optional[str], Optional[str]]:
+    if text.startswith("Summary so far:"):
+        older, newer = text[len("Summary so far:\n"):].split("\n\nNewer notes:\n", 1)
+        return f"{older} {newer}", None
+    return text, None
+
+
+#------This Function feeds transcripts and lets any scheduled fold finish----------
+async def feed_all(summarizer: IncrementalSummarizer, transcripts: List[str], first_seq: int):
+    for offset, text in enumerate(transcripts):
+        summarizer.feed(text, first_seq + offset)
+    await asyncio.sleep(0)
+    if summarizer._task:
+        await summarizer._task
+
+
+#------This Function checks the summary covers the expected transcripts and no others----------
+def covers(summary: Optional[str], expected: List[str], absent: List[str]) -> bool:
+    return bool(summary) and all(t in summary for t in expected) and not any(t in summary for t in absent)
+
+
+async def run_checks() -> dict:
+    conversation._call_summarization_ollama = fake_summarization
+    results = {}
+
+    summarizer = IncrementalSummarizer(block_chars=40, block_seconds=3600)
+    first = [f"first cycle line {i}" for i in range(6)]
+    await feed_all(summarizer, first, 1)
+    snapshot, through_seq = list(first), 6
+    late = "late line after the snapshot"
+    await feed_all(summarizer, [late], 7)
+    summary, error, partial = await summarizer.finalize(snapshot, through_seq)
+    results["late_transcript_kept_for_next_cycle"] = (
+        error is None and not partial
+        and summarizer.full_fallbacks == 0
+        and covers(summary, first, [late])
+        and [text for _, text in summarizer._pending] == [late]
+    )
+
+    second = [f"second cycle line {i}" for i in range(3)]
+    await feed_all(summarizer, second, 8)
+    summary, error, partial = await summarizer.finalize([late] + second, 10)
+    results["next_cycle_stays_incremental"] = (
+        error is None and summarizer.full_fallbacks == 0 and covers(summary, [late] + second, first)
+    )
+
+    truncated = IncrementalSummarizer(block_chars=40, block_seconds=3600)
+    lines = [f"truncated cycle line {i}" for i in range(120)]
+    await feed_all(truncated, lines, 1)
+    summary, error, partial = await truncated.finalize(lines[-50:], 120)
+    results["truncated_snapshot_stays_incremental"] = (
+        error is None and truncated.full_fallbacks == 0 and covers(summary, lines, [])
+    )
+
+    gapped = IncrementalSummarizer(block_chars=40, block_seconds=3600)
+    await feed_all(gapped, ["gap line 1"], 1)
+    await feed_all(gapped, ["gap line 3"], 3)
+    snapshot = ["gap line 1", "gap line 2", "gap line 3"]
+    summary, error, partial = await gapped.finalize(snapshot, 3)
+    results["missing_feed_falls_back"] = gapped.full_fallbacks == 1 and covers(summary, snapshot, [])
+
+    return {"ok": all(results.values()), "checks": results, "stats": summarizer.get_stats()}
+
+
+def main():
+    report = asyncio.run(run_checks())
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,12 @@ class Settings(BaseSettings):
     
     
     groq_api_key: str = ""
+
+
+    transcription_max_upload_mb: int = 25
+    local_whisper_enabled: bool = False
+    local_whisper_model: str = "base"
+    local_whisper_compute_type: str = "int8"
     
     
     secret_key: Optional[str] = None
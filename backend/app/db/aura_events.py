@@ -1,9 +1,10 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 logger = logging.getLogger(__name__)
 
@@ -21,40 +22,40 @@ class AuraEventsDB:
                 IndexModel([("patient_uid", ASCENDING)]),
                 IndexModel([("event_type", ASCENDING)]),
                 IndexModel([("timestamp", DESCENDING)]),
+                IndexModel([("idempotency_key", ASCENDING)], unique=True, sparse=True),
             ]
             await self.collection.create_indexes(indexes)
         except Exception as e:
             logger.error(f"Failed to create indexes: {e}")
             raise
 
+#------This Function inserts one event document---------
+    async def _insert_event(self, doc: dict, label: str) -> str:
+        try:
+            result = await self.collection.insert_one(doc)
+            return str(result.inserted_id)
+        except DuplicateKeyError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to log {label}: {e}")
+            raise
+
 #------This Function logs face detection events---------
     async def log_face_detection(
         self,
         patient_uid: str,
         module_id: str,
         detected_faces: List[dict],
+        idempotency_key: Optional[str] = None,
     ) -> str:
-        
-        if not isinstance(detected_faces, list):
-            raise ValueError("detected_faces must be a list")
-        
-        doc = {
-            "event_type": "face_detection",
-            "patient_uid": patient_uid,
-            "module_id": module_id,
-            "timestamp": datetime.utcnow(),
-            "data": {
-                "detected_faces": detected_faces,
-                "num_faces": len(detected_faces),
-            },
-        }
-        
-        try:
-            result = await self.collection.insert_one(doc)
-            return str(result.inserted_id)
-        except Exception as e:
-            logger.error(f"Failed to log face detection: {e}")
-            raise
+        doc = self.build_event_doc(
+            event_type="face_detection",
+            patient_uid=patient_uid,
+            module_id=module_id,
+            data={"detected_faces": detected_faces},
+            idempotency_key=idempotency_key,
+        )
+        return await self._insert_event(doc, "face detection")
 
 #------This Function logs conversation events---------
     async def log_conversation(
@@ -64,34 +65,16 @@ class AuraEventsDB:
         transcript: str,
         extracted_events: List[dict],
         mood: str = "",
+        idempotency_key: Optional[str] = None,
     ) -> str:
-        
-        if not isinstance(transcript, str):
-            raise ValueError("transcript must be a string")
-        
-        
-        if not isinstance(extracted_events, list):
-            raise ValueError("extracted_events must be a list")
-        
-        doc = {
-            "event_type": "conversation",
-            "patient_uid": patient_uid,
-            "module_id": module_id,
-            "timestamp": datetime.utcnow(),
-            "data": {
-                "transcript": transcript,
-                "extracted_events": extracted_events,
-                "mood": mood,
-                "num_events": len(extracted_events),
-            },
-        }
-        
-        try:
-            result = await self.collection.insert_one(doc)
-            return str(result.inserted_id)
-        except Exception as e:
-            logger.error(f"Failed to log conversation: {e}")
-            raise
+        doc = self.build_event_doc(
+            event_type="conversation",
+            patient_uid=patient_uid,
+            module_id=module_id,
+            data={"transcript": transcript, "extracted_events": extracted_events, "mood": mood},
+            idempotency_key=idempotency_key,
+        )
+        return await self._insert_event(doc, "conversation")
 
 #------This Function logs conversation summary---------
     async def log_conversation_summary(
@@ -100,28 +83,116 @@ class AuraEventsDB:
         module_id: str,
         summary: str,
         transcript_count: int = 0,
+        idempotency_key: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
     ) -> str:
-        if not isinstance(summary, str):
-            raise ValueError("summary must be a string")
+        doc = self.build_event_doc(
+            event_type="conversation_summary",
+            patient_uid=patient_uid,
+            module_id=module_id,
+            data={"summary": summary, "transcript_count": transcript_count},
+            idempotency_key=idempotency_key,
+            timestamp=timestamp,
+        )
+        return await self._insert_event(doc, "conversation summary")
+
+#------This Function builds an event document without inserting it---------
+    def build_event_doc(
+        self,
+        event_type: str,
+        patient_uid: str,
+        module_id: str,
+        data: dict,
+        idempotency_key: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> dict:
+        if event_type == "face_detection":
+            detected_faces = data.get("detected_faces", [])
+            if not isinstance(detected_faces, list):
+                raise ValueError("detected_faces must be a list")
+            payload = {
+                "detected_faces": detected_faces,
+                "num_faces": len(detected_faces),
+            }
+        elif event_type == "conversation":
+            transcript = data.get("transcript", "")
+            extracted_events = data.get("extracted_events", [])
+            if not isinstance(transcript, str):
+                raise ValueError("transcript must be a string")
+            if not isinstance(extracted_events, list):
+                raise ValueError("extracted_events must be a list")
+            payload = {
+                "transcript": transcript,
+                "extracted_events": extracted_events,
+                "mood": data.get("mood", ""),
+                "num_events": len(extracted_events),
+            }
+        elif event_type == "conversation_summary":
+            summary = data.get("summary")
+            if not isinstance(summary, str):
+                raise ValueError("summary must be a string")
+            payload = {
+                "summary": summary.strip(),
+                "transcript_count": int(data.get("transcript_count") or 0),
+            }
+            if data.get("partial"):
+                payload["partial"] = True
+        else:
+            raise ValueError(f"Unknown event type: {event_type}")
 
         doc = {
-            "event_type": "conversation_summary",
+            "event_type": event_type,
             "patient_uid": patient_uid,
             "module_id": module_id,
-            "timestamp": datetime.utcnow(),
-            "data": {
-                "summary": summary,
-                "transcript_count": transcript_count,
-            },
+            "timestamp": timestamp or datetime.utcnow(),
+            "data": payload,
         }
+        if idempotency_key:
+            doc["idempotency_key"] = idempotency_key
+        return doc
+
+#------This Function returns the idempotency keys that are already stored---------
+    async def find_existing_keys(self, keys: List[str]) -> Set[str]:
+        if not keys:
+            return set()
+        cursor = self.collection.find(
+            {"idempotency_key": {"$in": keys}},
+            {"idempotency_key": 1, "_id": 0},
+        )
+        docs = await cursor.to_list(length=len(keys))
+        return {doc["idempotency_key"] for doc in docs}
 
+#------This Function returns stored events by idempotency key---------
+    async def get_events_by_keys(self, keys: List[str]) -> List[dict]:
+        if not keys:
+            return []
+        cursor = self.collection.find({"idempotency_key": {"$in": keys}})
+        return await cursor.to_list(length=len(keys))
+
+#------This Function inserts many events in one unordered round trip---------
+    async def log_events_bulk(self, docs: List[dict]) -> List[Tuple[str, Optional[str]]]:
+        if not docs:
+            return []
+
+        failed = {}
         try:
-            result = await self.collection.insert_one(doc)
-            return str(result.inserted_id)
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") == 11000:
+                    failed[error["index"]] = ("duplicate", None)
+                else:
+                    failed[error["index"]] = ("failed", error.get("errmsg", "write error"))
+            logger.warning(f"Bulk event insert had {len(failed)} write errors")
         except Exception as e:
-            logger.error(f"Failed to log conversation summary: {e}")
+            logger.error(f"Failed to bulk log events: {e}")
             raise
 
+        return [
+            failed.get(index, ("stored", str(doc["_id"])))
+            for index, doc in enumerate(docs)
+        ]
+
 #------This Function retrieves events---------
     async def get_events(
         self,
@@ -37,6 +37,7 @@ from app.routes import (
 )
 from app.routes import settings as settings_router
 from app.services.cleanup_task import cleanup_stale_modules
+from app.services.transcription import close_http_client
 
 
 GREEN = "\033[92m"
@@ -214,6 +215,7 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    await close_http_client()
     await close_db()
     print(f"{RED}[SHUTDOWN] Application shutdown complete{RESET}")
 
@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import IndexModel, ASCENDING
 from pydantic import Field
 from typing import Optional, List
 from datetime import datetime
@@ -18,6 +19,14 @@ class JournalEntry(Document):
     ai_summary: str = ""  
     event_datetime: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    idempotency_key: Optional[str] = None
 
     class Settings:
         name = "journal_entries"
+        indexes = [
+            IndexModel(
+                [("idempotency_key", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"idempotency_key": {"$type": "string"}},
+            ),
+        ]
@@ -1,12 +1,15 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ValidationError, field_validator
 from typing import Optional, List
 import httpx
+import json
 import time
 import logging
 import re
+import zlib
 from datetime import datetime
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.core.firebase import get_current_user_uid
 from app.core.database import get_aura_modules_db, get_aura_events_db
 from app.db.aura_modules import AuraModulesDB
@@ -132,10 +135,21 @@ class IdentifyPersonResponse(BaseModel):
     message: Optional[str] = None
 
 
+IDEMPOTENCY_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
 class EventLogRequest(BaseModel):
     patient_uid: str
     event_type: str
     data: dict
+    idempotency_key: Optional[str] = None
+
+    @field_validator('idempotency_key')
+    @classmethod
+    def validate_idempotency_key(cls, v, info):
+        if v is not None and not IDEMPOTENCY_KEY_PATTERN.match(v):
+            raise ValueError('idempotency_key must be 8-64 characters of letters, digits, - or _')
+        return v
 
     @field_validator('data')
     @classmethod
@@ -147,6 +161,37 @@ class EventLogRequest(BaseModel):
         return v
 
 
+MAX_BULK_EVENTS = 500
+
+MAX_BULK_BODY_BYTES = 5 * 1024 * 1024
+
+
+class BulkEventItem(BaseModel):
+    idempotency_key: str
+    event_type: str
+    data: dict
+    occurred_at: Optional[float] = None
+
+    @field_validator('idempotency_key')
+    @classmethod
+    def validate_idempotency_key(cls, v, info):
+        if not IDEMPOTENCY_KEY_PATTERN.match(v):
+            raise ValueError('idempotency_key must be 8-64 characters of letters, digits, - or _')
+        return v
+
+
+class BulkEventLogRequest(BaseModel):
+    patient_uid: str
+    events: List[BulkEventItem]
+
+    @field_validator('events')
+    @classmethod
+    def validate_events(cls, v, info):
+        if len(v) > MAX_BULK_EVENTS:
+            raise ValueError(f'at most {MAX_BULK_EVENTS} events per request')
+        return v
+
+
 class UpdateNameRequest(BaseModel):
     name: str
 
@@ -193,6 +238,66 @@ def _validate_event_payload(body: EventLogRequest) -> None:
         )
 
 
+#------This Function builds the journal entry for a stored conversation summary---------
+def _summary_journal_entry(
+    patient_uid: str,
+    summary: str,
+    mood: str,
+    event_datetime: datetime,
+    idempotency_key: Optional[str] = None,
+) -> JournalEntry:
+    return JournalEntry(
+        patient_uid=patient_uid,
+        content=summary,
+        source="voice",
+        mood=mood or "",
+        speaker_tags=[],
+        extracted_events=[],
+        ai_summary=summary,
+        event_datetime=event_datetime,
+        idempotency_key=idempotency_key,
+    )
+
+
+#------This Function writes journal entries, skipping keyed entries that already exist---------
+async def _write_summary_journals(entries: List[JournalEntry]) -> None:
+    keys = [entry.idempotency_key for entry in entries if entry.idempotency_key]
+    existing = set()
+    if keys:
+        found = await JournalEntry.find({"idempotency_key": {"$in": keys}}).to_list()
+        existing = {entry.idempotency_key for entry in found}
+
+    missing = [entry for entry in entries if entry.idempotency_key not in existing]
+    if not missing:
+        return
+    try:
+        await JournalEntry.insert_many(missing, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+
+#------This Function builds journal entries for summary events that were already stored---------
+async def _journals_for_stored_summaries(
+    patient_uid: str,
+    aura_events_db: AuraEventsDB,
+    moods: dict,
+) -> List[JournalEntry]:
+    if not moods:
+        return []
+    return [
+        _summary_journal_entry(
+            patient_uid,
+            doc["data"]["summary"],
+            moods.get(doc["idempotency_key"], ""),
+            doc["timestamp"],
+            doc["idempotency_key"],
+        )
+        for doc in await aura_events_db.get_events_by_keys(list(moods))
+        if doc.get("event_type") == "conversation_summary" and doc.get("data", {}).get("summary")
+    ]
+
+
 #------This Function stores event and journal---------
 async def _store_event_and_journal(
     body: EventLogRequest,
@@ -207,48 +312,56 @@ async def _store_event_and_journal(
         )
 
     module_id = module["_id"]
+    mood = body.data.get("mood", "") or ""
 
-    if body.event_type == "face_detection":
-        event_id = await aura_events_db.log_face_detection(
-            patient_uid=body.patient_uid,
-            module_id=module_id,
-            detected_faces=body.data.get("detected_faces", []),
-        )
-    elif body.event_type == "conversation":
-        event_id = await aura_events_db.log_conversation(
-            patient_uid=body.patient_uid,
-            module_id=module_id,
-            transcript=body.data.get("transcript", ""),
-            extracted_events=body.data.get("extracted_events", []),
-            mood=body.data.get("mood", ""),
-        )
-    elif body.event_type == "conversation_summary":
-        summary = (body.data.get("summary") or "").strip()
-        transcript_count = int(body.data.get("transcript_count") or 0)
-        event_id = await aura_events_db.log_conversation_summary(
-            patient_uid=body.patient_uid,
-            module_id=module_id,
-            summary=summary,
-            transcript_count=transcript_count,
-        )
+    if body.idempotency_key:
+        stored = await aura_events_db.get_events_by_keys([body.idempotency_key])
+        if stored:
+            return await _duplicate_event(body, stored[0], aura_events_db, mood)
 
-        if summary:
-            journal_entry = JournalEntry(
+    try:
+        if body.event_type == "face_detection":
+            event_id = await aura_events_db.log_face_detection(
                 patient_uid=body.patient_uid,
-                content=summary,
-                source="voice",
-                mood=body.data.get("mood", "") or "",
-                speaker_tags=[],
-                extracted_events=[],
-                ai_summary=summary,
-                event_datetime=datetime.utcnow(),
+                module_id=module_id,
+                detected_faces=body.data.get("detected_faces", []),
+                idempotency_key=body.idempotency_key,
             )
-            await journal_entry.insert()
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unknown event type: {body.event_type}",
-        )
+        elif body.event_type == "conversation":
+            event_id = await aura_events_db.log_conversation(
+                patient_uid=body.patient_uid,
+                module_id=module_id,
+                transcript=body.data.get("transcript", ""),
+                extracted_events=body.data.get("extracted_events", []),
+                mood=mood,
+                idempotency_key=body.idempotency_key,
+            )
+        elif body.event_type == "conversation_summary":
+            summary = (body.data.get("summary") or "").strip()
+            timestamp = datetime.utcnow()
+            event_id = await aura_events_db.log_conversation_summary(
+                patient_uid=body.patient_uid,
+                module_id=module_id,
+                summary=summary,
+                transcript_count=int(body.data.get("transcript_count") or 0),
+                idempotency_key=body.idempotency_key,
+                timestamp=timestamp,
+            )
+
+            if summary:
+                await _write_summary_journals([
+                    _summary_journal_entry(body.patient_uid, summary, mood, timestamp, body.idempotency_key)
+                ])
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown event type: {body.event_type}",
+            )
+    except DuplicateKeyError:
+        stored = await aura_events_db.get_events_by_keys([body.idempotency_key])
+        if not stored:
+            raise
+        return await _duplicate_event(body, stored[0], aura_events_db, mood)
 
     return {
         "status": "logged",
@@ -257,6 +370,152 @@ async def _store_event_and_journal(
     }
 
 
+#------This Function answers a retried event and backfills its journal entry---------
+async def _duplicate_event(
+    body: EventLogRequest,
+    stored: dict,
+    aura_events_db: AuraEventsDB,
+    mood: str,
+) -> dict:
+    if stored.get("event_type") == "conversation_summary":
+        await _write_summary_journals(await _journals_for_stored_summaries(
+            body.patient_uid, aura_events_db, {body.idempotency_key: mood}
+        ))
+    return {
+        "status": "duplicate",
+        "event_id": str(stored["_id"]),
+        "event_type": stored.get("event_type", body.event_type),
+    }
+
+
+#------This Function reads a bulk event body, inflating gzip if the module compressed it---------
+async def _read_bulk_events(request: Request) -> BulkEventLogRequest:
+    raw = await request.body()
+    if len(raw) > MAX_BULK_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Event batch too large")
+
+    encoding = request.headers.get("content-encoding", "").lower()
+    if encoding == "gzip":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            raw = inflater.decompress(raw, MAX_BULK_BODY_BYTES)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+        if inflater.unconsumed_tail:
+            raise HTTPException(status_code=413, detail="Event batch too large")
+    elif encoding not in ("", "identity"):
+        raise HTTPException(status_code=415, detail=f"Unsupported content encoding: {encoding}")
+
+    try:
+        return BulkEventLogRequest.model_validate(json.loads(raw))
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+
+#------This Function stores a batch of events and journals with bulk writes---------
+async def _store_events_bulk(
+    body: BulkEventLogRequest,
+    aura_events_db: AuraEventsDB,
+    aura_modules_db: AuraModulesDB,
+) -> dict:
+    module = await aura_modules_db.get_module(body.patient_uid)
+    if not module:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Module not found for patient {body.patient_uid}",
+        )
+
+    module_id = module["_id"]
+    existing = await aura_events_db.find_existing_keys(
+        [event.idempotency_key for event in body.events]
+    )
+
+    results: List[dict] = []
+    pending: List[tuple[int, BulkEventItem]] = []
+    docs: List[dict] = []
+    seen = set()
+    now = datetime.utcnow()
+    for event in body.events:
+        result = {"idempotency_key": event.idempotency_key}
+        results.append(result)
+        if event.idempotency_key in existing or event.idempotency_key in seen:
+            result["status"] = "duplicate"
+            continue
+        seen.add(event.idempotency_key)
+
+        try:
+            _validate_event_payload(
+                EventLogRequest(patient_uid=body.patient_uid, event_type=event.event_type, data=event.data)
+            )
+            timestamp = now
+            if event.occurred_at is not None:
+                timestamp = min(datetime.utcfromtimestamp(event.occurred_at), now)
+            docs.append(aura_events_db.build_event_doc(
+                event_type=event.event_type,
+                patient_uid=body.patient_uid,
+                module_id=module_id,
+                data=event.data,
+                idempotency_key=event.idempotency_key,
+                timestamp=timestamp,
+            ))
+        except HTTPException as e:
+            result.update(status="rejected", detail=e.detail)
+            continue
+        except (ValueError, OverflowError, OSError) as e:
+            result.update(status="rejected", detail=str(e))
+            continue
+        pending.append((len(results) - 1, event))
+
+    journal_entries = []
+    for (index, event), doc, (status, value) in zip(
+        pending, docs, await aura_events_db.log_events_bulk(docs)
+    ):
+        results[index]["status"] = status
+        if status == "stored":
+            results[index]["event_id"] = value
+        elif status == "failed":
+            results[index]["detail"] = value
+
+        summary = doc["data"].get("summary")
+        if status == "stored" and event.event_type == "conversation_summary" and summary:
+            journal_entries.append(_summary_journal_entry(
+                body.patient_uid,
+                summary,
+                event.data.get("mood", ""),
+                doc["timestamp"],
+                event.idempotency_key,
+            ))
+
+    duplicate_moods = {
+        event.idempotency_key: event.data.get("mood", "") or ""
+        for event, result in zip(body.events, results)
+        if result["status"] == "duplicate" and event.event_type == "conversation_summary"
+    }
+    journal_entries.extend(
+        await _journals_for_stored_summaries(body.patient_uid, aura_events_db, duplicate_moods)
+    )
+    if journal_entries:
+        await _write_summary_journals(journal_entries)
+
+    counts = {"stored": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    logger.info(
+        f"Bulk ingest for {body.patient_uid}: {counts['stored']} stored, "
+        f"{counts['duplicate']} duplicate, {counts['rejected']} rejected, {counts['failed']} failed"
+    )
+    return {
+        "status": "logged",
+        "stored": counts["stored"],
+        "duplicates": counts["duplicate"],
+        "rejected": counts["rejected"],
+        "failed": counts["failed"],
+        "results": results,
+    }
+
+
 
 
 #------This Function registers a module---------
@@ -680,6 +939,50 @@ async def log_event_from_module(
         )
 
 
+@router.post("/log_events")
+async def log_events(
+    request: Request,
+    uid: str = Depends(get_current_user_uid),
+    aura_events_db: AuraEventsDB = Depends(get_aura_events_db),
+    aura_modules_db: AuraModulesDB = Depends(get_aura_modules_db),
+):
+    body = await _read_bulk_events(request)
+    if uid != body.patient_uid:
+        raise HTTPException(
+            status_code=403,
+            detail="You can only log events for your own module",
+        )
+
+    try:
+        return await _store_events_bulk(body, aura_events_db, aura_modules_db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to log events: {str(e)}",
+        )
+
+
+@router.post("/device/log_events")
+async def log_events_from_module(
+    request: Request,
+    aura_events_db: AuraEventsDB = Depends(get_aura_events_db),
+    aura_modules_db: AuraModulesDB = Depends(get_aura_modules_db),
+):
+    body = await _read_bulk_events(request)
+
+    try:
+        return await _store_events_bulk(body, aura_events_db, aura_modules_db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to log events: {str(e)}",
+        )
+
+
 @router.get("/events/{patient_uid}")
 async def get_events(
     patient_uid: str,
@@ -11,6 +11,7 @@ from app.models.orito_interaction import (
     OritoInteractionResponse,
     InteractionType,
 )
+from app.services.transcription import transcribe_upload, TranscriptionError
 import httpx
 
 logger = logging.getLogger(__name__)
@@ -518,64 +519,13 @@ async def transcribe_audio(
     temperature: float = Form(0.0),
     uid: str = Depends(get_current_user_uid)
 ):
-    if not settings.groq_api_key:
-        logger.error("GROQ_API_KEY not configured")
-        raise HTTPException(status_code=503, detail="AI service is not configured")
-
     if not audio.filename:
         raise HTTPException(status_code=400, detail="No audio file provided")
 
     try:
-        audio_content = await audio.read()
-        
-        files = {
-            "file": (audio.filename, audio_content, audio.content_type or "audio/m4a")
-        }
-        
-        data = {
-            "model": "whisper-large-v3",
-            "language": language,
-            "temperature": temperature,
-        }
-        
-        if prompt:
-            data["prompt"] = prompt
-        else:
-            data["prompt"] = (
-                "Aura health companion conversation. Accurately transcribe Indian English "
-                "and light Hinglish phrasing. Preserve medication names, family names, "
-                "and medical conditions exactly."
-            )
-
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{GROQ_API_URL}/audio/transcriptions",
-                headers={
-                    "Authorization": f"Bearer {settings.groq_api_key}",
-                },
-                files=files,
-                data=data
-            )
-
-        if response.status_code != 200:
-            logger.error(f"Groq Whisper API error: {response.status_code} - {response.text}")
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Transcription service error: {response.text}"
-            )
-
-        result = response.json()
-        return {
-            "text": result.get("text", ""),
-            "language": language
-        }
-
-    except httpx.TimeoutException:
-        logger.error("Timeout calling Groq Whisper API")
-        raise HTTPException(status_code=504, detail="Transcription timed out")
-    except httpx.RequestError as e:
-        logger.error(f"Request error calling Groq Whisper API: {str(e)}")
-        raise HTTPException(status_code=502, detail=f"Failed to connect to transcription service: {str(e)}")
+        return await transcribe_upload(audio, language, prompt, temperature)
+    except TranscriptionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         logger.exception("Unexpected error in transcription endpoint")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
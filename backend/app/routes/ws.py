@@ -1,16 +1,37 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from fastapi import HTTPException
-from typing import Dict
-import json
+from typing import Dict, Optional
 import asyncio
 from app.utils.access_control import check_patient_access
+from app.utils.ws_codec import ENCODING_JSON, decode, encode, negotiate
 
 router = APIRouter(tags=["websocket"])
 
 _connections: Dict[str, WebSocket] = {}
+_encodings: Dict[str, str] = {}
 _connections_lock = asyncio.Lock()
 
 
+#------This Function sends a message in the connection's negotiated encoding---------
+async def _send(ws: WebSocket, message: dict, encoding: str = ENCODING_JSON, payload=None):
+    if payload is None:
+        payload = encode(message, encoding)
+    if isinstance(payload, bytes):
+        await ws.send_bytes(payload)
+    else:
+        await ws.send_text(payload)
+
+
+#------This Function receives one text or binary frame---------
+async def _receive(ws: WebSocket):
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("bytes") is not None:
+        return message["bytes"]
+    return message.get("text") or ""
+
+
 #------This Function verifies token---------
 async def verify_token(websocket: WebSocket, token: str) -> str:
     from firebase_admin import auth as firebase_auth
@@ -24,7 +45,12 @@ async def verify_token(websocket: WebSocket, token: str) -> str:
 
 #------This Function handles websocket endpoint---------
 @router.websocket("/ws/{user_uid}")
-async def websocket_endpoint(ws: WebSocket, user_uid: str, token: str = Query(...)):
+async def websocket_endpoint(
+    ws: WebSocket,
+    user_uid: str,
+    token: str = Query(...),
+    encoding: Optional[str] = Query(None),
+):
     
     authenticated_uid = await verify_token(ws, token)
     
@@ -33,7 +59,8 @@ async def websocket_endpoint(ws: WebSocket, user_uid: str, token: str = Query(..
         await ws.close(code=4003, reason="Token mismatch")
         return
     
-    await ws.accept()
+    encoding, subprotocol = negotiate(ws.scope.get("subprotocols", []), encoding)
+    await ws.accept(subprotocol=subprotocol)
     
     
     async with _connections_lock:
@@ -44,22 +71,26 @@ async def websocket_endpoint(ws: WebSocket, user_uid: str, token: str = Query(..
             except Exception:
                 pass
         _connections[user_uid] = ws
+        _encodings[user_uid] = encoding
     
     try:
         while True:
-            data = await ws.receive_text()
+            data = await _receive(ws)
             
             
             try:
-                msg = json.loads(data)
-            except json.JSONDecodeError:
-                await ws.send_json({"type": "error", "message": "Invalid JSON"})
+                msg = decode(data, encoding)
+            except ValueError:
+                await _send(ws, {"type": "error", "message": "Invalid message encoding"}, encoding)
+                continue
+            if not isinstance(msg, dict):
+                await _send(ws, {"type": "error", "message": "Message must be an object"}, encoding)
                 continue
             
             msg_type = msg.get("type", "")
 
             if msg_type == "ping":
-                await ws.send_json({"type": "pong"})
+                await _send(ws, {"type": "pong"}, encoding)
 
             elif msg_type == "sos_alert":
                 patient_uid = msg.get("patient_uid", user_uid)
@@ -67,20 +98,19 @@ async def websocket_endpoint(ws: WebSocket, user_uid: str, token: str = Query(..
                 
                 has_access = await check_patient_access(user_uid, patient_uid)
                 if not has_access:
-                    await ws.send_json({"type": "error", "message": "Unauthorized: You don't have permission to send SOS for this patient"})
+                    await _send(ws, {"type": "error", "message": "Unauthorized: You don't have permission to send SOS for this patient"}, encoding)
                     continue
                 
                 await broadcast_to_caregivers(patient_uid, msg)
 
             elif msg_type == "aura_status":
-                await ws.send_json({"type": "ack", "status": "received"})
+                await _send(ws, {"type": "ack", "status": "received"}, encoding)
 
-    except WebSocketDisconnect:
-        async with _connections_lock:
-            _connections.pop(user_uid, None)
     except Exception:
         async with _connections_lock:
-            _connections.pop(user_uid, None)
+            if _connections.get(user_uid) is ws:
+                _connections.pop(user_uid, None)
+                _encodings.pop(user_uid, None)
 
 
 #------This Function broadcasts to caregivers---------
@@ -93,14 +123,19 @@ async def broadcast_to_caregivers(patient_uid: str, message: dict):
         {"linked_patients": patient_uid}
     ).to_list()
     
+    payloads = {}
     async with _connections_lock:
         for cg in caregivers:
             ws = _connections.get(cg.firebase_uid)
             if ws:
+                encoding = _encodings.get(cg.firebase_uid, ENCODING_JSON)
+                if encoding not in payloads:
+                    payloads[encoding] = encode(message, encoding)
                 try:
-                    await ws.send_json(message)
+                    await _send(ws, message, encoding, payloads[encoding])
                 except Exception:
                     _connections.pop(cg.firebase_uid, None)
+                    _encodings.pop(cg.firebase_uid, None)
 
 
 #------This Function sends message to user---------
@@ -109,6 +144,7 @@ async def send_to_user(user_uid: str, message: dict):
         ws = _connections.get(user_uid)
         if ws:
             try:
-                await ws.send_json(message)
+                await _send(ws, message, _encodings.get(user_uid, ENCODING_JSON))
             except Exception:
                 _connections.pop(user_uid, None)
+                _encodings.pop(user_uid, None)
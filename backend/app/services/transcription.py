@@ -0,0 +1,271 @@
+
+import asyncio
+import logging
+import os
+import secrets
+import threading
+from typing import AsyncIterator, BinaryIO, Optional
+
+import httpx
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+
+GROQ_TRANSCRIPTION_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
+GROQ_TRANSCRIPTION_MODEL = "whisper-large-v3"
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+AUDIO_CONTENT_TYPES = {
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".oga": "audio/ogg",
+    ".flac": "audio/flac",
+    ".webm": "audio/webm",
+    ".m4a": "audio/m4a",
+    ".mp4": "audio/mp4",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+}
+
+DEFAULT_PROMPT = (
+    "Aura health companion conversation. Accurately transcribe Indian English "
+    "and light Hinglish phrasing. Preserve medication names, family names, "
+    "and medical conditions exactly."
+)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+#------This Class handles transcription failures with the HTTP status to report---------
+class TranscriptionError(Exception):
+
+    def __init__(self, status_code: int, detail: str, retryable: bool = False):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retryable = retryable
+
+
+#------This Function returns the shared HTTP client for transcription uploads---------
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+#------This Function closes the shared HTTP client on shutdown---------
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+#------This Function resolves the content type of an uploaded audio file---------
+def resolve_content_type(filename: str, content_type: Optional[str]) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in AUDIO_CONTENT_TYPES:
+        return AUDIO_CONTENT_TYPES[extension]
+    if content_type and content_type.startswith("audio/"):
+        return content_type
+    raise TranscriptionError(
+        415,
+        f"Unsupported audio format '{extension or content_type}'. "
+        f"Use one of: {', '.join(sorted(AUDIO_CONTENT_TYPES))}",
+    )
+
+
+#------This Function streams a multipart form body without buffering the upload---------
+async def _multipart_stream(
+    head: bytes, upload: UploadFile, tail: bytes, max_bytes: int
+) -> AsyncIterator[bytes]:
+    yield head
+    sent = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        sent += len(chunk)
+        if sent > max_bytes:
+            raise TranscriptionError(413, f"Audio too large: over {max_bytes} bytes")
+        yield chunk
+    yield tail
+
+
+#------This Function measures a spooled upload without reading it into memory---------
+def _spooled_size(audio_file: BinaryIO) -> int:
+    audio_file.seek(0, os.SEEK_END)
+    size = audio_file.tell()
+    audio_file.seek(0)
+    return size
+
+
+#------This Function builds the multipart head and tail around the audio part---------
+def _multipart_envelope(boundary: str, fields: dict, filename: str, content_type: str):
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+            f"{value}\r\n"
+        )
+    safe_name = filename.replace("\"", "").replace("\r", "").replace("\n", "")
+    parts.append(
+        f"--{boundary}\r\n"
+        f"Content-Disposition: form-data; name=\"file\"; filename=\"{safe_name}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    )
+    return "".join(parts).encode("utf-8"), f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+#------This Function streams an upload to the Groq Whisper API---------
+async def transcribe_with_groq(
+    upload: UploadFile,
+    content_type: str,
+    language: str,
+    prompt: str,
+    temperature: float,
+) -> str:
+    boundary = f"aura-{secrets.token_hex(12)}"
+    fields = {
+        "model": GROQ_TRANSCRIPTION_MODEL,
+        "language": language,
+        "temperature": temperature,
+        "prompt": prompt,
+    }
+    head, tail = _multipart_envelope(boundary, fields, upload.filename, content_type)
+
+    headers = {
+        "Authorization": f"Bearer {settings.groq_api_key}",
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+    }
+    if upload.size is not None:
+        headers["Content-Length"] = str(len(head) + upload.size + len(tail))
+
+    try:
+        response = await get_http_client().post(
+            GROQ_TRANSCRIPTION_URL,
+            headers=headers,
+            content=_multipart_stream(
+                head, upload, tail, settings.transcription_max_upload_mb * 1024 * 1024
+            ),
+        )
+    except httpx.TimeoutException:
+        logger.error("Timeout calling Groq Whisper API")
+        raise TranscriptionError(504, "Transcription timed out", retryable=True)
+    except httpx.RequestError as e:
+        logger.error(f"Request error calling Groq Whisper API: {str(e)}")
+        raise TranscriptionError(
+            502, f"Failed to connect to transcription service: {str(e)}", retryable=True
+        )
+
+    if response.status_code != 200:
+        logger.error(f"Groq Whisper API error: {response.status_code} - {response.text}")
+        raise TranscriptionError(
+            response.status_code,
+            f"Transcription service error: {response.text}",
+            retryable=response.status_code == 429 or response.status_code >= 500,
+        )
+
+    return response.json().get("text", "")
+
+
+#------This Class handles on-server faster-whisper transcription as a fallback---------
+class LocalWhisper:
+
+    def __init__(self):
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._decode_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return settings.local_whisper_enabled and FASTER_WHISPER_AVAILABLE
+
+    def _get_model(self):
+        with self._load_lock:
+            if self._model is None:
+                logger.info(
+                    f"Loading local Whisper model '{settings.local_whisper_model}' "
+                    f"({settings.local_whisper_compute_type})"
+                )
+                self._model = WhisperModel(
+                    settings.local_whisper_model,
+                    device="cpu",
+                    compute_type=settings.local_whisper_compute_type,
+                )
+            return self._model
+
+    def transcribe_file(self, audio_file: BinaryIO, language: str, prompt: str, temperature: float) -> str:
+        model = self._get_model()
+        with self._decode_lock:
+            segments, _ = model.transcribe(
+                audio_file,
+                language=language,
+                initial_prompt=prompt,
+                temperature=temperature,
+                beam_size=5,
+                vad_filter=True,
+            )
+            return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+#------This Function transcribes an upload, falling back to local Whisper when the cloud is down---------
+async def transcribe_upload(
+    upload: UploadFile,
+    language: str = "en",
+    prompt: Optional[str] = None,
+    temperature: float = 0.0,
+) -> dict:
+    content_type = resolve_content_type(upload.filename, upload.content_type)
+    max_bytes = settings.transcription_max_upload_mb * 1024 * 1024
+    if upload.size is not None and upload.size > max_bytes:
+        raise TranscriptionError(
+            413, f"Audio too large: {upload.size} bytes (max {max_bytes})"
+        )
+
+    prompt = prompt or DEFAULT_PROMPT
+
+    if settings.groq_api_key:
+        try:
+            text = await transcribe_with_groq(upload, content_type, language, prompt, temperature)
+            return {"text": text, "language": language, "provider": "groq"}
+        except TranscriptionError as e:
+            if not (e.retryable and local_whisper.available):
+                raise
+            logger.warning(f"Groq transcription unavailable ({e.status_code}), using local Whisper")
+    elif not local_whisper.available:
+        logger.error("GROQ_API_KEY not configured")
+        raise TranscriptionError(503, "AI service is not configured")
+
+    await upload.seek(0)
+    if upload.size is None:
+        size = await asyncio.to_thread(_spooled_size, upload.file)
+        if size > max_bytes:
+            raise TranscriptionError(413, f"Audio too large: {size} bytes (max {max_bytes})")
+    try:
+        text = await asyncio.to_thread(
+            local_whisper.transcribe_file, upload.file, language, prompt, temperature
+        )
+    except Exception as e:
+        logger.exception("Local Whisper transcription failed")
+        raise TranscriptionError(502, f"Local transcription failed: {str(e)}")
+    return {"text": text, "language": language, "provider": "local"}
+
+
+
+local_whisper = LocalWhisper()
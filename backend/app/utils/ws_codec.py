@@ -0,0 +1,85 @@
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+SUBPROTOCOLS = {
+    "aura.msgpack": ENCODING_MSGPACK,
+    "aura.json": ENCODING_JSON,
+}
+
+Payload = Union[str, bytes]
+
+
+#------This Function converts values the fast encoders do not know natively---------
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+#------This Function serialises a message to JSON text---------
+def dumps_json(message: Any) -> str:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message, default=_to_builtin, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(message, default=_to_builtin)
+
+
+#------This Function encodes a message for a negotiated encoding---------
+def encode(message: Any, encoding: str = ENCODING_JSON) -> Payload:
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message, default=_to_builtin, use_bin_type=True)
+    return dumps_json(message)
+
+
+#------This Function decodes a text or binary frame---------
+def decode(data: Payload, encoding: str = ENCODING_JSON) -> Any:
+    if isinstance(data, bytes) and encoding == ENCODING_MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+#------This Function picks the encoding from offered subprotocols or a query value---------
+def negotiate(offered: Iterable[str], requested: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    for protocol in offered:
+        encoding = SUBPROTOCOLS.get(protocol.strip())
+        if encoding == ENCODING_MSGPACK and not MSGPACK_AVAILABLE:
+            continue
+        if encoding:
+            return encoding, protocol.strip()
+
+    if (requested or "").lower() == ENCODING_MSGPACK:
+        if MSGPACK_AVAILABLE:
+            return ENCODING_MSGPACK, None
+        logger.warning("Client asked for msgpack but it is not installed, using JSON")
+    return ENCODING_JSON, None